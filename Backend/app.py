@@ -1,12 +1,21 @@
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-import joblib
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 import numpy as np
-import ta # Import the 'ta' library
 import os # Import os module for path manipulation
+import logging
+import time
+from ohlcv_store import get_ohlcv, MARKET_HOLIDAYS # Local OHLCV store; only fetches date ranges not yet on disk
+from indicators import streaming_features, streaming_engine, get_state_store # Incremental indicator state per symbol
+from feature_store import get_feature_store # Materialized feature rows for completed trading days
+from singleflight import SingleFlight # Coalesces concurrent identical requests
+from prediction_cache import PredictionCache, model_version # LRU/TTL cache of /predict results
+from inference import load_model # Cached model arrays/booster and a DataFrame-free predict path
+from metrics import REGISTRY, REQUEST_SECONDS, STAGE_SECONDS, ERRORS, CONTENT_TYPE, stage # Stage timers, counters and /metrics
+from forecast import roll_forward, next_trading_day, MAX_HORIZON # Multi-day paths rolled forward from one indicator state
+import screener # Universe-wide screen on worker processes
+from warmup import warmup, WARMUP_MODE, WARM_SYMBOLS # Background warm-up and readiness state
 
 # Determine the absolute path to the directory where app.py is located (e.g., E:\my_python_envs\scripts\Backend)
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -25,9 +34,15 @@ app = Flask(__name__,
 
 CORS(app)
 
+# DataFrame debug dumps are logged at DEBUG; set STOCKSIGHT_LOG_LEVEL=DEBUG to see them
+logging.basicConfig(level=os.environ.get('STOCKSIGHT_LOG_LEVEL', 'INFO').upper())
+logger = logging.getLogger('stocksight')
+
 # Load your trained ROC prediction model
+# inference.load_model caches it in a fast-loading form the first time (see inference.py)
+MODEL_PATH = os.path.join(basedir, "roc_model3.pkl") # Ensure model path is correct relative to app.py
 try:
-    model = joblib.load(os.path.join(basedir, "roc_model3.pkl")) # Ensure model path is correct relative to app.py
+    model = load_model(MODEL_PATH, model_version(MODEL_PATH))
     print("Model 'roc_model3.pkl' loaded successfully.")
 except FileNotFoundError:
     print("Error: 'roc_model3.pkl' not found. Make sure the model file is in the same directory as app.py.")
@@ -36,12 +51,27 @@ except Exception as e:
     print(f"Error loading model: {e}")
     model = None
 
+# Part of every prediction cache key, so results from a previous model are never served
+MODEL_VERSION = os.environ.get('STOCKSIGHT_MODEL_VERSION') or (model.version if model is not None else 'none')
+
+# Prediction result cache: bounded by entries and/or bytes in memory, optionally
+# shared between worker processes through a directory (bounded by file count).
+# STOCKSIGHT_MARKET_HOLIDAYS lists NSE holidays (comma-separated YYYY-MM-DD) so
+# entries for the next session do not expire on a day the market is shut
+# (the OHLCV and feature stores read the same list).
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('STOCKSIGHT_PREDICTION_CACHE_ENTRIES', '10000')),
+    max_bytes=int(os.environ.get('STOCKSIGHT_PREDICTION_CACHE_BYTES', '0')),
+    directory=os.environ.get('STOCKSIGHT_PREDICTION_CACHE_DIR') or None,
+    max_disk_entries=int(os.environ.get('STOCKSIGHT_PREDICTION_CACHE_DISK_ENTRIES', '100000')),
+    holidays=MARKET_HOLIDAYS,
+)
+
 # Define ALL 18 required features - MUST match exactly what your model was trained on.
-required_features = [
-    'close_t-1', 'volume_t-1', 'sma_10', 'sma_50', 'rsi', 'macd',
-    'macd_signal', 'bollinger_high', 'bollinger_low', 'day_of_week', 'month',
-    'close_t-2', 'volume_t-2', 'close_t-3', 'volume_t-3', 'ema_10', 'atr', 'obv'
-]
+# The list and the feature engineering helpers live in features.py.
+from features import (required_features, LOOKBACK_DAYS, PREV_CLOSE_LOOKBACK_DAYS, to_yfinance_symbol,
+                      add_lag_features, add_technical_indicators, add_date_features,
+                      build_feature_rows)
 
 # --- Routes to serve frontend files from the 'Frontend' folder ---
 
@@ -75,86 +105,113 @@ def serve_js():
 #     return send_from_directory(app.static_folder, 'image.png')
 
 
+# Which implementation prepare_features() uses:
+# 'streaming' reads completed days from the feature table (feature_store.py) and scores
+# anything newer with the per-symbol indicator state (indicators.py),
+# 'ta' recomputes every indicator over the full lookback window with the 'ta' library.
+FEATURE_ENGINE = os.environ.get('STOCKSIGHT_FEATURE_ENGINE', 'streaming')
+
 # Utility: Generate features for a given stock and date
 def prepare_features(symbol, date_str):
+    """
+    Prepares the one-row feature DataFrame for prediction for a given symbol and date.
+    """
+    if FEATURE_ENGINE == 'ta':
+        return prepare_features_ta(symbol, date_str)
+
+    try:
+        yfinance_symbol = to_yfinance_symbol(symbol)
+
+        # Past trading days are an indexed read from the materialized feature table.
+        # Weekends and holidays fall through: their OBV window starts 250 days before the
+        # requested date rather than before the stored trading day.
+        with stage('feature_store'):
+            stored = get_feature_store().get_features(yfinance_symbol, date_str)
+        if stored is not None and stored[1].strftime("%Y-%m-%d") == date_str:
+            return pd.DataFrame([stored[0]], columns=required_features)
+
+        # Today (or dates before the table starts) go through the streaming engine
+        with stage('streaming_features'):
+            row = streaming_features(yfinance_symbol, date_str, get_ohlcv, get_state_store())
+        if row is None:
+            print(f"No sufficient data with all required features to prepare for {symbol} on {date_str}.")
+            return None
+        return pd.DataFrame([row], columns=required_features)
+
+    except Exception as e:
+        ERRORS.inc(stage='prepare_features')
+        print(f"Error in prepare_features for {symbol} on {date_str}: {e}")
+        import traceback
+        traceback.print_exc() # Print full traceback for prepare_features errors
+        return None
+
+def debug_frame(title, df, head=False, tail=False, dtypes=False):
+    """Logs a DataFrame snapshot at DEBUG level; formats nothing unless DEBUG is enabled."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    parts = [f"{title}: shape={df.shape}", f"columns={list(df.columns)}"]
+    if dtypes:
+        parts.append(f"dtypes:\n{df.dtypes}")
+    if head:
+        parts.append(f"head:\n{df.head()}")
+    if tail:
+        parts.append(f"tail:\n{df.tail()}")
+    logger.debug("\n".join(parts))
+
+def prepare_features_ta(symbol, date_str):
     """
     Fetches historical stock data, calculates technical indicators,
     and prepares features for prediction for a given symbol and date.
+    Reference implementation that recomputes the whole lookback window with 'ta'.
     """
     try:
         date = datetime.strptime(date_str, "%Y-%m-%d")
         # Fetch enough historical data to calculate all indicators (e.g., 60 days for SMA_50, ATR)
         # A period of 250 days should be sufficient for most indicators and lagged features.
-        start_date = date - timedelta(days=250) # Increased lookback to 250 days
+        start_date = date - timedelta(days=LOOKBACK_DAYS) # Increased lookback to 250 days
         end_date_str = (date + timedelta(days=1)).strftime("%Y-%m-%d") # Fetch up to the day AFTER the target date for 'yfinance'
 
-        # Adjust symbol for yfinance for Indian stocks (e.g., RELIANCE.NS)
-        if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
-            yfinance_symbol = f"{symbol}.NS"
-        else:
-            yfinance_symbol = symbol
+        yfinance_symbol = to_yfinance_symbol(symbol)
 
-        df = yf.download(yfinance_symbol, start=start_date.strftime("%Y-%m-%d"), end=end_date_str)
+        with stage('download'):
+            df = get_ohlcv(yfinance_symbol, start_date, end_date_str)
 
-        # --- DEBUGGING PRINTS (Initial df state) ---
-        print(f"\n--- Debugging yfinance.download() for {yfinance_symbol} from {start_date.strftime('%Y-%m-%d')} to {end_date_str} ---")
-        print("DataFrame Head (Raw):")
-        print(df.head())
-        print("DataFrame Columns (Before Flattening/Lowercasing):")
-        print(df.columns)
-        print("DataFrame Shape (Raw):", df.shape)
-        print("----------------------------------------------------------------------------------------------------")
-        # --- END DEBUGGING PRINTS ---
+        debug_frame(f"get_ohlcv() for {yfinance_symbol} from {start_date.strftime('%Y-%m-%d')} to {end_date_str} (raw)", df, head=True)
 
         if df.empty:
             print(f"No data found for {yfinance_symbol} from {start_date.strftime('%Y-%m-%d')} to {end_date_str}.")
             return None
 
-        # FIX: Handle MultiIndex columns returned by yfinance and flatten them
-        if isinstance(df.columns, pd.MultiIndex):
-            # Take the first level of the MultiIndex (e.g., 'Close' from ('Close', 'RELIANCE.NS'))
-            df.columns = [col[0].lower() if isinstance(col, tuple) else str(col).lower() for col in df.columns.values]
-        else:
-            # If not MultiIndex, just convert to lowercase strings
-            df.columns = [str(col).lower() for col in df.columns]
-
-        # --- DEBUGGING PRINTS (After column flattening) ---
-        print("DataFrame Columns (After Flattening/Lowercasing):")
-        print(df.columns)
-        print("DataFrame dtypes (After Flattening/Lowercasing):")
-        print(df.dtypes) # Check dtypes here
-        print("----------------------------------------------------------------------------------------------------")
-        # --- END DEBUGGING PRINTS ---
-
-
-        # Ensure 'close', 'high', 'low', 'open', and 'volume' columns exist before proceeding
-        # These are fundamental for all other calculations
-        if not all(col in df.columns for col in ['close', 'high', 'low', 'open', 'volume']):
-            print(f"Missing fundamental OHLCV columns in fetched data for {yfinance_symbol}. Columns found: {list(df.columns)}")
-            return None
+        with stage('flatten_columns'):
+            # FIX: Handle MultiIndex columns returned by yfinance and flatten them
+            if isinstance(df.columns, pd.MultiIndex):
+                # Take the first level of the MultiIndex (e.g., 'Close' from ('Close', 'RELIANCE.NS'))
+                df.columns = [col[0].lower() if isinstance(col, tuple) else str(col).lower() for col in df.columns.values]
+            else:
+                # If not MultiIndex, just convert to lowercase strings
+                df.columns = [str(col).lower() for col in df.columns]
+
+            debug_frame("After flattening/lowercasing", df, dtypes=True)
 
-        # Ensure fundamental OHLCV columns are numeric
-        for col in ['close', 'high', 'low', 'open', 'volume']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        df.dropna(subset=['close', 'high', 'low', 'open', 'volume'], inplace=True)
+            # Ensure 'close', 'high', 'low', 'open', and 'volume' columns exist before proceeding
+            # These are fundamental for all other calculations
+            if not all(col in df.columns for col in ['close', 'high', 'low', 'open', 'volume']):
+                print(f"Missing fundamental OHLCV columns in fetched data for {yfinance_symbol}. Columns found: {list(df.columns)}")
+                return None
+
+            # Ensure fundamental OHLCV columns are numeric
+            for col in ['close', 'high', 'low', 'open', 'volume']:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            df.dropna(subset=['close', 'high', 'low', 'open', 'volume'], inplace=True)
 
         if df.empty:
             print(f"DataFrame became empty after ensuring OHLCV are numeric and dropping NaNs.")
             return None
 
         # Calculate Lag Features (up to t-3 as per required_features)
-        df['close_t-1'] = df['close'].shift(1)
-        df['close_t-2'] = df['close'].shift(2)
-        df['close_t-3'] = df['close'].shift(3)
-        df['volume_t-1'] = df['volume'].shift(1)
-        df['volume_t-2'] = df['volume'].shift(2)
-        df['volume_t-3'] = df['volume'].shift(3)
-
-        print("DataFrame Columns (After Lag Features):")
-        print(df.columns)
-        print("DataFrame Tail (After Lag Features):")
-        print(df.tail())
-        print("----------------------------------------------------------------------------------------------------")
+        with stage('lag_features'):
+            add_lag_features(df)
+        debug_frame("After lag features", df, tail=True)
 
         # Technical Indicators (using 'ta' library logic from notebook)
         # Check if there's enough data for indicator calculation (e.g., for SMA_50, Bollinger, ATR)
@@ -162,58 +219,27 @@ def prepare_features(symbol, date_str):
         if len(df) < 50: # SMA_50 needs at least 50 data points, ATR/Bollinger need ~20
             print(f"Warning: Raw data length ({len(df)} rows) might be insufficient for all indicators for {yfinance_symbol}.")
 
-        df['sma_10'] = ta.trend.sma_indicator(df['close'], window=10)
-        df['sma_50'] = ta.trend.sma_indicator(df['close'], window=50)
-        df['rsi'] = ta.momentum.rsi(df['close'], window=14)
-        df['macd'] = ta.trend.macd(df['close'])
-        df['macd_signal'] = ta.trend.macd_signal(df['close'])
-        
-        bollinger = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-        df['bollinger_high'] = bollinger.bollinger_hband()
-        df['bollinger_low'] = bollinger.bollinger_lband()
-
-        df['obv'] = ta.volume.on_balance_volume(df['close'], df['volume'])
-        df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=14)
-        df['ema_10'] = ta.trend.ema_indicator(df['close'], window=10)
-
-
-        print("DataFrame Columns (After Technical Indicators):")
-        print(df.columns)
-        print("DataFrame Tail (After Technical Indicators):")
-        print(df.tail())
-        print("----------------------------------------------------------------------------------------------------")
-
-        # Date Features
-        df['day_of_week'] = df.index.dayofweek # index is datetime
-        df['month'] = df.index.month
-
-        print("DataFrame Columns (After Date Features):")
-        print(df.columns)
-        print("DataFrame Tail (After Date Features):")
-        print(df.tail())
-        print("----------------------------------------------------------------------------------------------------")
+        with stage('indicators'):
+            add_technical_indicators(df)
+            # Date Features
+            add_date_features(df)
+        debug_frame("After technical indicators and date features", df, tail=True)
 
         # Select the row for the prediction date
         target_date_dt = datetime.strptime(date_str, "%Y-%m-%d").date()
-        
-        # Crucially, we now drop NaNs *after* feature calculation, and only for the required features
-        # This will create a DataFrame with only the required columns and no NaNs in them.
-        df_with_features = df[required_features].dropna()
 
-        print("DataFrame Head (df_with_features after dropna()):")
-        print(df_with_features.head())
-        print("DataFrame Columns (df_with_features after dropna()):")
-        print(df_with_features.columns)
-        print("DataFrame Shape (df_with_features after dropna()):", df_with_features.shape)
-        print("----------------------------------------------------------------------------------------------------")
+        with stage('dropna_filter'):
+            # Crucially, we now drop NaNs *after* feature calculation, and only for the required features
+            # This will create a DataFrame with only the required columns and no NaNs in them.
+            df_with_features = df[required_features].dropna()
+            debug_frame("df_with_features after dropna()", df_with_features, head=True)
 
-        # Filter for dates <= target_date_dt and get the latest valid row
-        df_filtered_for_target = df_with_features[df_with_features.index.date <= target_date_dt].sort_index(ascending=False)
+            # Filter for dates <= target_date_dt and get the latest valid row
+            df_filtered_for_target = df_with_features[df_with_features.index.date <= target_date_dt].sort_index(ascending=False)
 
         if df_filtered_for_target.empty:
             print(f"No sufficient data with all required features to prepare for {symbol} on {date_str}.")
-            print(f"Columns in df_with_features before date filter: {list(df_with_features.columns)}")
-            print(f"Last few rows of df_with_features before date filter:\n{df_with_features.tail()}")
+            debug_frame("df_with_features before date filter", df_with_features, tail=True)
             return None
 
         features_row = df_filtered_for_target.iloc[0]
@@ -232,53 +258,58 @@ def prepare_features(symbol, date_str):
         return prepared_features
 
     except Exception as e:
-        print(f"Error in prepare_features for {symbol} on {date_str}: {e}")
+        ERRORS.inc(stage='prepare_features')
+        print(f"Error in prepare_features_ta for {symbol} on {date_str}: {e}")
         import traceback
         traceback.print_exc() # Print full traceback for prepare_features errors
         return None
 
-@app.route('/predict', methods=['POST'])
-def predict():
+# Concurrent identical /predict requests share one computation (see singleflight.py).
+# Set STOCKSIGHT_COALESCE=0 to compute every request separately.
+COALESCE_REQUESTS = os.environ.get('STOCKSIGHT_COALESCE', '1') != '0'
+prediction_flight = SingleFlight()
+
+def compute_prediction(company_symbol, prediction_date_str):
+    """
+    Runs the /predict pipeline for one (symbol, date) and returns
+    (response body, HTTP status). Shared by the Flask route and the ASGI app.
+    """
     if model is None:
-        return jsonify({'error': 'Model not loaded. Check server logs for details.'}), 500
+        return {'error': 'Model not loaded. Check server logs for details.'}, 500
 
     try:
-        data = request.get_json()
-        company_symbol = data['companySymbol'].strip().upper()
-        prediction_date_str = data['predictionDate']
-
         features = prepare_features(company_symbol, prediction_date_str)
 
         if features is None:
-            return jsonify({'error': f'Could not prepare features for {company_symbol} on {prediction_date_str}. '
-                                     'This could be due to invalid symbol, date, or insufficient historical data.'}), 400
+            return {'error': f'Could not prepare features for {company_symbol} on {prediction_date_str}. '
+                             'This could be due to invalid symbol, date, or insufficient historical data.'}, 400
 
         if list(features.columns) != required_features:
             print(f"Feature mismatch! Expected: {required_features}, Got: {list(features.columns)}")
-            return jsonify({'error': 'Feature mismatch. Server configuration error.'}), 500
+            return {'error': 'Feature mismatch. Server configuration error.'}, 500
 
-        prediction = model.predict(features)[0]
+        with stage('inference'):
+            prediction = model.predict(features.to_numpy(dtype=float))[0]
 
-        if not company_symbol.endswith('.NS') and not company_symbol.endswith('.BO'):
-            yfinance_symbol = f"{company_symbol}.NS"
-        else:
-            yfinance_symbol = company_symbol
+        yfinance_symbol = to_yfinance_symbol(company_symbol)
 
-        fetch_start_date = datetime.strptime(prediction_date_str, "%Y-%m-%d") - timedelta(days=10)
+        fetch_start_date = datetime.strptime(prediction_date_str, "%Y-%m-%d") - timedelta(days=PREV_CLOSE_LOOKBACK_DAYS)
         fetch_end_date = datetime.strptime(prediction_date_str, "%Y-%m-%d")
         
-        prev_day_data = yf.download(yfinance_symbol, start=fetch_start_date.strftime("%Y-%m-%d"), end=fetch_end_date.strftime("%Y-%m-%d"))
+        # Served from the local store: prepare_features() has already fetched this range
+        with stage('prev_close'):
+            prev_day_data = get_ohlcv(yfinance_symbol, fetch_start_date, fetch_end_date)
 
         if prev_day_data.empty:
-            return jsonify({'error': f'Could not retrieve previous day\'s closing price for {company_symbol}. Insufficient data for price conversion.'}), 400
+            return {'error': f'Could not retrieve previous day\'s closing price for {company_symbol}. Insufficient data for price conversion.'}, 400
 
         # Get the last available closing price before the prediction date
         # Filter for dates strictly before the prediction date, then get the last one
-        prev_day_close_price_series = prev_day_data[prev_day_data.index.date < datetime.strptime(prediction_date_str, "%Y-%m-%d").date()]['Close']
+        prev_day_close_price_series = prev_day_data[prev_day_data.index.date < datetime.strptime(prediction_date_str, "%Y-%m-%d").date()]['close']
         
         if prev_day_close_price_series.empty:
             # If no data strictly before, take the last available close up to the prediction date
-            prev_day_close_price = prev_day_data['Close'].iloc[-1]
+            prev_day_close_price = prev_day_data['close'].iloc[-1]
             print(f"Warning: No close price strictly before {prediction_date_str}. Using last available close on or before it: {prev_day_close_price}")
         else:
             prev_day_close_price = prev_day_close_price_series.iloc[-1]
@@ -289,13 +320,333 @@ def predict():
 
         estimated_price = float(prev_day_close_price) * (1 + prediction / 100) # Ensure it's float for calculation
 
-        return jsonify({'companySymbol': company_symbol, 'predictionDate': prediction_date_str, 'estimatedPrice': estimated_price})
+        return {'companySymbol': company_symbol, 'predictionDate': prediction_date_str, 'estimatedPrice': estimated_price}, 200
 
     except Exception as e:
+        ERRORS.inc(stage='predict')
         print(f"An error occurred during prediction: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': f'Error predicting stock price: {e}. Check server logs for details.'}), 500
+        return {'error': f'Error predicting stock price: {e}. Check server logs for details.'}, 500
+
+def cached_prediction(company_symbol, prediction_date_str):
+    """compute_prediction() behind the prediction cache; only successful results are cached."""
+    key = prediction_cache.key(to_yfinance_symbol(company_symbol), prediction_date_str, MODEL_VERSION)
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached, 200
+    result, status = compute_prediction(company_symbol, prediction_date_str)
+    if status == 200:
+        prediction_cache.put(key, result, prediction_date_str)
+    return result, status
+
+def echo_request(result, company_symbol, prediction_date_str):
+    """
+    'RELIANCE' and 'RELIANCE.NS' (or '2025-7-1' and '2025-07-01') share a cache
+    entry and an in-flight computation; echo back what this caller sent.
+    """
+    if 'companySymbol' in result:
+        result = dict(result, companySymbol=company_symbol, predictionDate=prediction_date_str)
+    return result
+
+def coalesced_prediction(company_symbol, prediction_date_str):
+    """cached_prediction() that joins an identical request already in flight."""
+    if not COALESCE_REQUESTS:
+        result, status = cached_prediction(company_symbol, prediction_date_str)
+    else:
+        key = (to_yfinance_symbol(company_symbol), prediction_date_str)
+        result, status = prediction_flight.do(key, cached_prediction, company_symbol, prediction_date_str)
+    return echo_request(result, company_symbol, prediction_date_str), status
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    try:
+        data = request.get_json()
+        company_symbol = data['companySymbol'].strip().upper()
+        prediction_date_str = data['predictionDate']
+    except (KeyError, TypeError, AttributeError) as e:
+        return jsonify({'error': f'Invalid request: {e}. Send "companySymbol" and "predictionDate".'}), 400
+
+    result, status = coalesced_prediction(company_symbol, prediction_date_str)
+    return jsonify(result), status
+
+@app.route('/predict/cache', methods=['GET'])
+def prediction_cache_stats():
+    """Hit/miss/eviction counters and size of the prediction cache."""
+    return jsonify(dict(prediction_cache.stats(), modelVersion=MODEL_VERSION))
+
+# Upper bound on (symbol, date) pairs per batch request
+MAX_BATCH_SIZE = 10000
+
+def parse_batch_request(data):
+    """
+    Expands a /predict/batch body into a list of (symbol, 'YYYY-MM-DD') pairs.
+    Accepts either {"requests": [{"companySymbol", "predictionDate"}, ...]}
+    or a grid {"companySymbols": [...], "startDate", "endDate"} over weekdays.
+    """
+    if 'requests' in data:
+        return [(item['companySymbol'].strip().upper(), item['predictionDate']) for item in data['requests']]
+
+    symbols = [symbol.strip().upper() for symbol in data['companySymbols']]
+    dates = [day.strftime("%Y-%m-%d") for day in pd.bdate_range(data['startDate'], data['endDate'])]
+    return [(symbol, date_str) for symbol in symbols for date_str in dates]
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Scores many (symbol, date) pairs in one request. Features are computed once
+    per symbol over the whole date window and all rows go through a single
+    model.predict call.
+    """
+    if model is None:
+        return jsonify({'error': 'Model not loaded. Check server logs for details.'}), 500
+
+    try:
+        pairs = parse_batch_request(request.get_json())
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        return jsonify({'error': f'Invalid batch request: {e}. Send "requests" or "companySymbols", "startDate" and "endDate".'}), 400
+
+    if not pairs:
+        return jsonify({'error': 'Batch request contains no (symbol, date) pairs.'}), 400
+    if len(pairs) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch request has {len(pairs)} pairs; the limit is {MAX_BATCH_SIZE}.'}), 400
+
+    try:
+        # Group pair positions by symbol so each symbol is fetched and featurized once
+        positions_by_symbol = {}
+        for position, (symbol, date_str) in enumerate(pairs):
+            positions_by_symbol.setdefault(symbol, []).append(position)
+
+        feature_matrix = np.full((len(pairs), len(required_features)), np.nan)
+        prev_closes = np.full(len(pairs), np.nan)
+        errors = {}
+
+        for symbol, positions in positions_by_symbol.items():
+            dates = {}
+            for p in positions:
+                try:
+                    dates[p] = datetime.strptime(pairs[p][1], "%Y-%m-%d")
+                except (TypeError, ValueError) as e: # e.g. a number instead of a date string
+                    errors[p] = f'Invalid date: {e}'
+            if not dates:
+                continue
+            positions = list(dates)
+            dates = list(dates.values())
+
+            with stage('download'):
+                ohlcv = get_ohlcv(to_yfinance_symbol(symbol),
+                                  min(dates) - timedelta(days=LOOKBACK_DAYS),
+                                  max(dates) + timedelta(days=1))
+            with stage('batch_features'):
+                symbol_features, symbol_prev_closes = build_feature_rows(ohlcv, dates)
+            feature_matrix[positions] = symbol_features
+            prev_closes[positions] = symbol_prev_closes
+
+        valid = ~np.isnan(feature_matrix).any(axis=1) & ~np.isnan(prev_closes)
+        predictions = np.full(len(pairs), np.nan)
+        if valid.any():
+            with stage('inference'):
+                predictions[valid] = model.predict(feature_matrix[valid])
+
+        results = []
+        for position, (symbol, date_str) in enumerate(pairs):
+            if valid[position]:
+                estimated_price = float(prev_closes[position]) * (1 + predictions[position] / 100)
+                results.append({'companySymbol': symbol, 'predictionDate': date_str, 'estimatedPrice': estimated_price})
+            else:
+                error = errors.get(position, 'Insufficient historical data to prepare features or previous close.')
+                results.append({'companySymbol': symbol, 'predictionDate': date_str, 'error': error})
+
+        return jsonify({'predictions': results, 'count': len(results), 'scored': int(valid.sum())})
+
+    except Exception as e:
+        ERRORS.inc(stage='predict_batch')
+        print(f"An error occurred during batch prediction: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error predicting stock prices: {e}. Check server logs for details.'}), 500
+
+# Days forecast by /predict/horizon when the request does not say
+DEFAULT_HORIZON = 5
+
+@app.route('/predict/horizon', methods=['POST'])
+def predict_horizon():
+    """
+    Forecasts a price path of "horizon" trading days starting at predictionDate
+    from a single feature computation (see forecast.py). The path starts from the
+    last real bar before predictionDate, so for a day that has not traded yet the
+    first step is the /predict price.
+    """
+    if model is None:
+        return jsonify({'error': 'Model not loaded. Check server logs for details.'}), 500
+
+    try:
+        data = request.get_json()
+        company_symbol = data['companySymbol'].strip().upper()
+        first_date = datetime.strptime(data['predictionDate'], "%Y-%m-%d").date()
+        horizon = int(data.get('horizon', DEFAULT_HORIZON))
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        return jsonify({'error': f'Invalid request: {e}. Send "companySymbol", "predictionDate" and optionally "horizon".'}), 400
+    if not 1 <= horizon <= MAX_HORIZON:
+        return jsonify({'error': f'"horizon" must be between 1 and {MAX_HORIZON}.'}), 400
+
+    try:
+        with stage('horizon_features'):
+            engine = streaming_engine(to_yfinance_symbol(company_symbol), first_date - timedelta(days=1),
+                                      get_ohlcv, get_state_store())
+        with stage('horizon_rollout'):
+            path = roll_forward(engine, model.predict, first_date, horizon, MARKET_HOLIDAYS) if engine.count else []
+        if not path:
+            return jsonify({'error': f'Could not prepare features for {company_symbol} before {first_date}. '
+                                     'This could be due to invalid symbol, date, or insufficient historical data.'}), 400
+
+        return jsonify({
+            'companySymbol': company_symbol,
+            'predictionDate': first_date.strftime("%Y-%m-%d"),
+            'horizon': horizon,
+            'lastClose': float(engine.closes[-1]),
+            'path': [{'date': day.strftime("%Y-%m-%d"), 'estimatedPrice': close, 'predictedRoc': roc}
+                     for day, roc, close in path],
+        })
+
+    except Exception as e:
+        ERRORS.inc(stage='predict_horizon')
+        print(f"An error occurred during horizon prediction: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error forecasting stock prices: {e}. Check server logs for details.'}), 500
+
+# Universe scored by /screen unless the request lists its own symbols (see screener.py)
+SCREEN_UNIVERSE = screener.load_universe()
+
+@app.route('/screen', methods=['GET', 'POST'])
+def screen():
+    """
+    Ranks every symbol of the universe by predicted ROC and returns the top k,
+    with the seconds spent per stage. Parameters (JSON body or query string):
+    "predictionDate" (default: next trading day), "topK" (default 20),
+    "rank" ('gain', 'loss' or 'abs') and "companySymbols" (default: the universe).
+    """
+    if model is None:
+        return jsonify({'error': 'Model not loaded. Check server logs for details.'}), 500
+
+    try:
+        data = request.get_json(silent=True) or request.args
+        symbols = data.get('companySymbols') or SCREEN_UNIVERSE
+        if isinstance(symbols, str):
+            symbols = symbols.split(',')
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+        prediction_date = data.get('predictionDate') or next_trading_day(datetime.now().date(), MARKET_HOLIDAYS).strftime("%Y-%m-%d")
+        datetime.strptime(prediction_date, "%Y-%m-%d")
+        top_k = int(data.get('topK', 20))
+        rank = data.get('rank', 'gain')
+        if rank not in screener.RANK_KEYS:
+            raise ValueError(f'"rank" must be one of {sorted(screener.RANK_KEYS)}')
+        if top_k < 1:
+            raise ValueError('"topK" must be at least 1')
+    except (TypeError, AttributeError, ValueError) as e:
+        return jsonify({'error': f'Invalid screen request: {e}.'}), 400
+
+    try:
+        result = screener.screen(symbols, prediction_date, model.predict, top_k=top_k, rank=rank)
+    except Exception as e:
+        ERRORS.inc(stage='screen')
+        print(f"An error occurred during the screen: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Error screening stocks: {e}. Check server logs for details.'}), 500
+
+    for name in ('features', 'inference', 'rank'):
+        STAGE_SECONDS.observe(result['timings'][name], stage=f'screen_{name}')
+    return jsonify({
+        'predictionDate': prediction_date,
+        'universe': len(symbols),
+        'scored': result['scored'],
+        'rank': rank,
+        'top': result['top'],
+        'errors': result['errors'],
+        'timingsMs': {name: round(seconds * 1000, 3) for name, seconds in result['timings'].items()},
+    })
+
+# --- Instrumentation ---
+
+@app.before_request
+def start_request_timer():
+    request.environ['stocksight.start'] = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    start = request.environ.get('stocksight.start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, status=response.status_code)
+    return response
+
+def collect_cache_metrics():
+    stats = prediction_cache.stats()
+    from ohlcv_store import get_store
+    segments = get_store().segments.stats() if get_store().segments is not None else {'hits': 0, 'misses': 0, 'builds': 0}
+    return [
+        ('stocksight_prediction_cache_hits_total', 'counter', 'Prediction cache hits (memory tier).', stats['hits']),
+        ('stocksight_prediction_cache_disk_hits_total', 'counter', 'Prediction cache hits (disk tier).', stats['disk_hits']),
+        ('stocksight_prediction_cache_misses_total', 'counter', 'Prediction cache misses.', stats['misses']),
+        ('stocksight_prediction_cache_evictions_total', 'counter', 'Prediction cache LRU evictions.', stats['evictions']),
+        ('stocksight_prediction_cache_expirations_total', 'counter', 'Prediction cache entries dropped at session close.', stats['expirations']),
+        ('stocksight_prediction_cache_disk_evictions_total', 'counter', 'Prediction cache files pruned from the disk tier.', stats['disk_evictions']),
+        ('stocksight_prediction_cache_entries', 'gauge', 'Entries in the in-memory prediction cache.', stats['entries']),
+        ('stocksight_prediction_cache_bytes', 'gauge', 'Bytes held by the in-memory prediction cache.', stats['bytes']),
+        ('stocksight_predict_coalesced_total', 'counter', 'Requests that joined an identical in-flight prediction.', prediction_flight.coalesced),
+        ('stocksight_ohlcv_fetches_total', 'counter', 'OHLCV downloads made by the local store.', get_store().fetch_count),
+        ('stocksight_shared_segment_hits_total', 'counter', 'OHLCV reads served from a shared segment.', segments['hits']),
+        ('stocksight_shared_segment_misses_total', 'counter', 'OHLCV reads that found no current shared segment.', segments['misses']),
+        ('stocksight_shared_segment_builds_total', 'counter', 'Shared segments built by this worker.', segments['builds']),
+        ('stocksight_feature_store_builds_total', 'counter', 'Feature tables built by this worker.', get_feature_store().builds),
+    ]
+
+REGISTRY.register_collector(collect_cache_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage timers, request latency, error counters and cache counters in Prometheus text format."""
+    return REGISTRY.render(), 200, {'Content-Type': CONTENT_TYPE}
+
+# --- Warm-up and health checks ---
+
+def warm_native_model():
+    # The compiled arrays already serve single rows; this pays the lightgbm import before the first batch does
+    if model is None:
+        raise RuntimeError("Model not loaded.")
+    model.load_native()
+
+def warm_data_caches():
+    from ohlcv_store import get_store
+    get_store()
+    get_state_store()
+    feature_store = get_feature_store()
+    # Build or extend the feature tables of STOCKSIGHT_WARM_SYMBOLS through the last completed day
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    for symbol in WARM_SYMBOLS:
+        feature_store.get_features(to_yfinance_symbol(symbol), yesterday)
+
+# By default this runs in the background while requests are already served;
+# /readyz turns 200 once every task has finished (see warmup.py for the modes).
+warmup.add('native_model', warm_native_model)
+warmup.add('data_caches', warm_data_caches)
+if WARMUP_MODE == 'sync':
+    warmup.run()
+elif WARMUP_MODE != 'off':
+    warmup.start()
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and answering."""
+    return jsonify({'status': 'ok', 'uptime_seconds': warmup.report()['uptime_seconds']})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: 200 once the model and data caches are warm, 503 before."""
+    report = warmup.report()
+    return jsonify(report), 200 if report['ready'] else 503
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as flask_module
+from features import to_yfinance_symbol
+from metrics import REQUEST_SECONDS
+from singleflight import AsyncSingleFlight
+
+# ASGI entry point for serving under an async server:
+#
+#     cd Backend && uvicorn asgi:application --host 0.0.0.0 --port 5000
+#
+# POST /predict is handled natively. The event loop never blocks on a download
+# or on the model: each computation runs on a thread pool, and concurrent
+# requests for the same (symbol, date) await a single in-flight computation.
+# Results go through the same prediction cache as the Flask route.
+# Every other route (frontend files, /predict/batch, CORS preflight) is passed
+# through to the Flask app unchanged.
+
+# Threads available for feature preparation and inference
+PREDICT_THREADS = int(os.environ.get('STOCKSIGHT_ASYNC_THREADS', '32'))
+
+_executor = ThreadPoolExecutor(max_workers=PREDICT_THREADS, thread_name_prefix="predict")
+prediction_flight = AsyncSingleFlight()
+wsgi_app = WsgiToAsgi(flask_module.app)
+
+
+async def _compute(company_symbol, prediction_date_str):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, flask_module.cached_prediction, company_symbol, prediction_date_str)
+
+
+async def predict(company_symbol, prediction_date_str):
+    """Async /predict: one computation per (symbol, date) in flight, shared by every caller."""
+    if not flask_module.COALESCE_REQUESTS:
+        result, status = await _compute(company_symbol, prediction_date_str)
+    else:
+        key = (to_yfinance_symbol(company_symbol), prediction_date_str)
+        result, status = await prediction_flight.do(key, _compute, company_symbol, prediction_date_str)
+    return flask_module.echo_request(result, company_symbol, prediction_date_str), status
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b"")
+        if not message.get('more_body'):
+            return body
+
+
+async def _send_json(send, payload, status):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            # Same header flask-cors adds to every Flask response
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _handle_predict(receive, send):
+    start = time.perf_counter()
+    body = await _read_body(receive)
+    if body is None:
+        return
+    try:
+        data = json.loads(body)
+        company_symbol = data['companySymbol'].strip().upper()
+        prediction_date_str = data['predictionDate']
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        result, status = {'error': f'Invalid request: {e}. Send "companySymbol" and "predictionDate".'}, 400
+    else:
+        result, status = await predict(company_symbol, prediction_date_str)
+    await _send_json(send, result, status)
+    REQUEST_SECONDS.observe(time.perf_counter() - start, route='/predict', status=status)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            _executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+    elif scope['type'] == 'http' and scope['path'] == '/predict' and scope['method'] == 'POST':
+        await _handle_predict(receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from features import LOOKBACK_DAYS, to_yfinance_symbol, build_feature_rows
+from inference import load_model
+from ohlcv_store import _to_date, get_ohlcv
+from prediction_cache import model_version
+
+# Walk-forward backtest of the ROC model over history.
+# Each symbol's OHLCV range is loaded once, the feature matrix for every trading
+# day is built in one pass (features.build_feature_rows, the same rows /predict
+# would use) and scored with a single model.predict call.
+#
+# Scored target: the model was trained on the next day's return, and day D's
+# features already contain D's close, so every metric scores a forecast of
+# D+1 made from D: forecast_price = close_D * (1 + ROC / 100) against close_D+1.
+# estimated_price is what /predict returns for D (previous close * (1 + ROC / 100));
+# it sees D's close and is kept only to check parity with the serving path.
+# Symbols run in parallel on a process pool.
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+MODEL_PATH = os.path.join(basedir, "roc_model3.pkl")
+
+RESULT_COLUMNS = ['symbol', 'date', 'prev_close', 'close', 'predicted_roc', 'estimated_price',
+                  'forecast_price', 'next_close', 'next_day_roc']
+
+_model = None
+
+
+def _get_model():
+    # Loaded once per worker process
+    global _model
+    if _model is None:
+        _model = load_model(MODEL_PATH, model_version(MODEL_PATH))
+    return _model
+
+
+def backtest_symbol(symbol, start, end):
+    """
+    Scores every trading day of `symbol` in [start, end]. Returns a DataFrame with
+    RESULT_COLUMNS; days without enough history or a previous close are left out,
+    days whose next close is not known yet have NaN next_close / next_day_roc.
+    """
+    start, end = _to_date(start), _to_date(end)
+    yfinance_symbol = to_yfinance_symbol(symbol)
+    # One extra week at the end so the last day still has a next-day return
+    ohlcv = get_ohlcv(yfinance_symbol, start - timedelta(days=LOOKBACK_DAYS), end + timedelta(days=8))
+    if ohlcv.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    closes = ohlcv['close'].to_numpy(dtype=float)
+    in_range = (ohlcv.index.date >= start) & (ohlcv.index.date <= end)
+    dates = ohlcv.index[in_range]
+    features, prev_closes = build_feature_rows(ohlcv, dates)
+    valid = ~np.isnan(features).any(axis=1) & ~np.isnan(prev_closes)
+    if not valid.any():
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    predicted_roc = _get_model().predict(features[valid])
+
+    positions = np.flatnonzero(in_range)[valid]
+    next_closes = np.append(closes, np.nan)[positions + 1]
+
+    close = closes[positions]
+    return pd.DataFrame({
+        'symbol': symbol,
+        'date': dates[valid],
+        'prev_close': prev_closes[valid],
+        'close': close,
+        'predicted_roc': predicted_roc,
+        'estimated_price': prev_closes[valid] * (1 + predicted_roc / 100),
+        'forecast_price': close * (1 + predicted_roc / 100),
+        'next_close': next_closes,
+        'next_day_roc': (next_closes / close - 1) * 100,
+    }, columns=RESULT_COLUMNS)
+
+
+def summarize(results):
+    """Next-day forecast metrics for a frame of backtest rows (days without a next close are skipped)."""
+    results = results.dropna(subset=['next_close'])
+    if results.empty:
+        return {'days': 0, 'mae': np.nan, 'mape': np.nan, 'hit_rate': np.nan, 'roc_mae': np.nan}
+    error = results['forecast_price'] - results['next_close']
+    return {
+        'days': len(results),
+        'mae': float(error.abs().mean()),
+        'mape': float((error.abs() / results['next_close']).mean() * 100),
+        # Share of days where the forecast moved the same way as the next close
+        'hit_rate': float((np.sign(results['predicted_roc']) == np.sign(results['next_day_roc'])).mean() * 100),
+        'roc_mae': float((results['predicted_roc'] - results['next_day_roc']).abs().mean()),
+    }
+
+
+def run_backtest(symbols, start, end, workers=None, initializer=None, initargs=()):
+    """
+    Backtests `symbols` over [start, end] on a process pool and returns
+    (results, summary): all scored rows and a per-symbol metrics frame with an 'ALL' row.
+    `initializer(*initargs)` runs in each worker, e.g. to point it at offline stores.
+    """
+    if workers == 1:
+        if initializer:
+            initializer(*initargs)
+        frames = [backtest_symbol(symbol, start, end) for symbol in symbols]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            frames = list(pool.map(backtest_symbol, symbols, [start] * len(symbols), [end] * len(symbols)))
+
+    frames = [frame for frame in frames if not frame.empty]
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESULT_COLUMNS)
+    summary = {symbol: summarize(results[results['symbol'] == symbol]) for symbol in symbols}
+    summary['ALL'] = summarize(results)
+    return results, pd.DataFrame.from_dict(summary, orient='index')
+
+
+if __name__ == '__main__':
+    # e.g. `python backtest.py --start 2023-01-01 --end 2024-12-31 --output backtest.csv`
+    import argparse
+    import time
+
+    top_20 = [
+        "RELIANCE", "HDFCBANK", "ICICIBANK", "INFY", "TCS", "ITC", "LT", "AXISBANK",
+        "KOTAKBANK", "SBIN", "HCLTECH", "SUNPHARMA", "BAJFINANCE", "TITAN",
+        "HINDUNILVR", "M&M", "ASIANPAINT", "MARUTI", "NESTLEIND", "WIPRO"
+    ]
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of roc_model3.pkl.")
+    parser.add_argument('--symbols', nargs='+', default=top_20)
+    parser.add_argument('--start', required=True)
+    parser.add_argument('--end', required=True)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument('--output', help="write every scored day to this CSV file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results, summary = run_backtest(args.symbols, args.start, args.end, workers=args.workers)
+    print(summary.to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"\nScored {len(results)} symbol-days in {time.perf_counter() - started:.2f} s")
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Wrote {args.output}")
@@ -0,0 +1,201 @@
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from features import required_features
+from indicators import IndicatorEngine
+
+# Out-of-core training dataset from the candle archive (NseDatafetcher.py output).
+#
+# Each symbol's daily candles are streamed one archive month at a time through
+# the same IndicatorEngine that serving uses (indicators.py), so warm-up state
+# simply carries over from one chunk to the next and memory stays at one month
+# of candles plus O(1) indicator state, however long the history. Minute
+# candles can be the source as well; each month is then resampled to daily
+# bars on the way (resample.py).
+#
+# Every bar with all features defined becomes one row: the required_features
+# values as of that bar's close and the target the model was trained on, the
+# next trading day's return in percent. The last bar has no target yet and is
+# left out.
+#
+# Layout, columnar and appended chunk by chunk like feature_store.py:
+#   <root>/<SYMBOL>/dates.i8     int64 days since 1970-01-01 (IST trading date)
+#   <root>/<SYMBOL>/features.f8  float64, rows x len(required_features)
+#   <root>/<SYMBOL>/target.f8    float64, next-day ROC in percent
+#   <root>/<SYMBOL>/meta.json    row count, columns, source and date range
+# A symbol is built in a temporary directory and renamed into place when done;
+# a build that fails partway removes its temporary directory.
+#
+# candle_store.py and resample.py live at the repository root, next to
+# NseDatafetcher.py; they are imported where the archive is read, so the
+# caller (the command line below, a training script) puts the root on sys.path.
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+TARGET = 'roc_next_day'
+N_FEATURES = len(required_features)
+EPOCH = date(1970, 1, 1)
+
+
+class _SymbolWriter:
+    """Appends rows to one symbol's dataset files; holds at most one chunk in memory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.files = {name: open(os.path.join(directory, name), "wb")
+                      for name in ('dates.i8', 'features.f8', 'target.f8')}
+        self.rows = 0
+        self.first_day = self.last_day = None
+
+    def append(self, days, features, target):
+        if not days:
+            return
+        self.files['dates.i8'].write(np.asarray(days, dtype='<i8').tobytes())
+        self.files['features.f8'].write(np.asarray(features, dtype='<f8').reshape(-1, N_FEATURES).tobytes())
+        self.files['target.f8'].write(np.asarray(target, dtype='<f8').tobytes())
+        self.rows += len(days)
+        self.first_day = days[0] if self.first_day is None else self.first_day
+        self.last_day = days[-1]
+
+    def abort(self):
+        for f in self.files.values():
+            f.close()
+
+    def close(self, meta):
+        for f in self.files.values():
+            f.close()
+        meta = dict(meta, rows=self.rows, columns=required_features, target=TARGET,
+                    first_date=(EPOCH + timedelta(days=self.first_day)).isoformat() if self.rows else None,
+                    last_date=(EPOCH + timedelta(days=self.last_day)).isoformat() if self.rows else None)
+        with open(os.path.join(self.directory, 'meta.json'), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+
+def daily_chunks(store, symbol, source='1d'):
+    """
+    Yields (IST day numbers, (5, n) open/high/low/close/volume) per archive month.
+    With source='1m' each month of minute candles is resampled to sessions first.
+    """
+    from candle_store import IST_OFFSET_SECONDS
+    from resample import resample
+
+    for timestamps, values in store.iter_slices(symbol, source):
+        if source != '1d':
+            timestamps, values = resample(timestamps, values, 1440)
+        yield (np.asarray(timestamps) + IST_OFFSET_SECONDS) // 86400, values
+
+
+def build_symbol(archive_root, output_root, symbol, source='1d'):
+    """Builds one symbol's dataset from the archive; returns the number of rows."""
+    from candle_store import CandleStore
+
+    store = CandleStore(archive_root)
+    final_dir = os.path.join(output_root, symbol)
+    tmp_dir = f"{final_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    writer = _SymbolWriter(tmp_dir)
+    engine = IndicatorEngine()
+    # The latest ready bar waits here until the next close gives it a target
+    pending = None
+
+    try:
+        for days, values in daily_chunks(store, symbol, source):
+            out_days, out_features, out_target = [], [], []
+            for day, open_, high, low, close, volume in zip(days.tolist(), *values.tolist()):
+                if pending is not None:
+                    out_days.append(pending[0])
+                    out_features.append(pending[1])
+                    out_target.append((close / pending[2] - 1) * 100)
+                    pending = None
+                engine.update(EPOCH + timedelta(days=day), open_, high, low, close, volume)
+                row = engine.feature_row()
+                if not any(value != value for value in row):  # no NaN
+                    pending = (day, row, close)
+            writer.append(out_days, out_features, out_target)
+        writer.close({'symbol': symbol, 'source': source})
+    except BaseException:
+        # Leave the previous dataset, if any, and no half-written directory behind
+        writer.abort()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+    return writer.rows
+
+
+def build_dataset(archive_root, output_root, symbols=None, source='1d', workers=None):
+    """
+    Builds the dataset for `symbols` (default: every symbol in the archive) on a
+    process pool, one symbol per task. Returns {symbol: rows}.
+    """
+    if symbols is None:
+        symbols = sorted(name for name in os.listdir(archive_root)
+                         if os.path.isdir(os.path.join(archive_root, name, source)))
+    os.makedirs(output_root, exist_ok=True)
+    args = ([archive_root] * len(symbols), [output_root] * len(symbols), symbols, [source] * len(symbols))
+    if workers == 1:
+        rows = list(map(build_symbol, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(build_symbol, *args))
+    return dict(zip(symbols, rows))
+
+
+def load_symbol(output_root, symbol):
+    """(dates as datetime64[D], features, target) for one symbol, memory-mapped read-only."""
+    directory = os.path.join(output_root, symbol)
+    with open(os.path.join(directory, 'meta.json'), encoding="utf-8") as f:
+        rows = json.load(f)['rows']
+    if rows == 0:
+        return np.empty(0, dtype='datetime64[D]'), np.empty((0, N_FEATURES)), np.empty(0)
+    days = np.memmap(os.path.join(directory, 'dates.i8'), dtype='<i8', mode='r', shape=(rows,))
+    features = np.memmap(os.path.join(directory, 'features.f8'), dtype='<f8', mode='r', shape=(rows, N_FEATURES))
+    target = np.memmap(os.path.join(directory, 'target.f8'), dtype='<f8', mode='r', shape=(rows,))
+    return days.astype('datetime64[D]'), features, target
+
+
+def load_dataset(output_root, symbols=None):
+    """
+    Concatenates symbols into training arrays: (X, y, dates, symbol per row).
+    X columns are in required_features order, ready for model.fit(X, y).
+    """
+    if symbols is None:
+        symbols = sorted(name for name in os.listdir(output_root)
+                         if os.path.exists(os.path.join(output_root, name, 'meta.json')))
+    parts = [(symbol, *load_symbol(output_root, symbol)) for symbol in symbols]
+    X = np.concatenate([p[2] for p in parts]) if parts else np.empty((0, N_FEATURES))
+    y = np.concatenate([p[3] for p in parts]) if parts else np.empty(0)
+    dates = np.concatenate([p[1] for p in parts]) if parts else np.empty(0, dtype='datetime64[D]')
+    row_symbols = np.concatenate([np.full(len(p[1]), p[0], dtype=object) for p in parts]) if parts else np.empty(0, dtype=object)
+    return X, y, dates, row_symbols
+
+
+if __name__ == '__main__':
+    # e.g. `python feature_pipeline.py ../groww_3year_data training_data --source 1d`
+    import argparse
+    import sys
+    import time
+
+    sys.path.append(os.path.dirname(basedir))
+
+    parser = argparse.ArgumentParser(description="Build the training feature dataset from the candle archive.")
+    parser.add_argument('archive', help="candle archive root (NseDatafetcher.py --output)")
+    parser.add_argument('output', help="dataset root")
+    parser.add_argument('--symbols', nargs='+', default=None)
+    parser.add_argument('--source', default='1d', choices=['1d', '1m'], help="interval read from the archive")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = build_dataset(args.archive, args.output, args.symbols, args.source, args.workers)
+    for symbol, count in rows.items():
+        print(f"  {symbol}: {count} rows")
+    print(f"Wrote {sum(rows.values())} rows for {len(rows)} symbols in {time.perf_counter() - started:.2f} s")
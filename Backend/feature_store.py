@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from features import required_features, LOOKBACK_DAYS
+from indicators import IndicatorEngine
+from ohlcv_store import DEFAULT_CACHE_DIR, MARKET_HOLIDAYS, _to_date, trading_days
+from shared_cache import file_lock
+
+# Materialized feature table keyed by (symbol, trading date).
+# Historical feature rows never change, so they are computed once with the
+# streaming IndicatorEngine and kept on disk per symbol as two raw arrays:
+#   dates.i8     int64 days since 1970-01-01, ascending
+#   features.f8  float64 rows in required_features order
+# plus state.json with the row count, the last calendar day covered (never past
+# the last bar received) and the engine state used to extend the table when new
+# bars arrive.
+# Lookups memory-map the arrays and binary-search the date column, so worker
+# processes share the pages; builds and appends hold a file lock per symbol, so
+# a symbol is built once however many workers ask for it at the same time.
+
+# History built the first time a symbol is requested
+DEFAULT_HISTORY_DAYS = 3 * 365
+
+N_FEATURES = len(required_features)
+
+
+def _day_number(value):
+    return (_to_date(value) - date(1970, 1, 1)).days
+
+
+class FeatureStore:
+    """
+    Per-symbol feature table with "latest row on or before date" lookups.
+    `get_ohlcv(symbol, start, end)` supplies the bars (normally ohlcv_store.get_ohlcv).
+    `holidays` (dates) are days without a bar.
+    """
+
+    def __init__(self, get_ohlcv, directory=None, history_days=DEFAULT_HISTORY_DAYS, today=None,
+                 holidays=MARKET_HOLIDAYS):
+        self.get_ohlcv = get_ohlcv
+        self.holidays = frozenset(holidays)
+        self.directory = directory or os.path.join(DEFAULT_CACHE_DIR, 'feature_store')
+        self.history_days = history_days
+        self._today = today or date.today
+        self.builds = 0
+        # symbol -> (rows, dates memmap, features memmap) and symbol -> (state file identity, state)
+        self._maps = {}
+        self._states = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _lock(self, symbol):
+        return file_lock(os.path.join(self.directory, f"{symbol}.lock"))
+
+    def _paths(self, symbol):
+        symbol_dir = os.path.join(self.directory, symbol)
+        return (symbol_dir,
+                os.path.join(symbol_dir, 'dates.i8'),
+                os.path.join(symbol_dir, 'features.f8'),
+                os.path.join(symbol_dir, 'state.json'))
+
+    def _read_state(self, symbol):
+        state_path = self._paths(symbol)[3]
+        try:
+            stat = os.stat(state_path)
+            cached = self._states.get(symbol)
+            # state.json is only ever replaced by rename, so the inode/mtime identify its content
+            if cached is not None and cached[0] == (stat.st_ino, stat.st_mtime_ns):
+                return dict(cached[1])
+            with open(state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        self._states[symbol] = ((stat.st_ino, stat.st_mtime_ns), state)
+        return dict(state)
+
+    def _write_state(self, symbol, state):
+        state_path = self._paths(symbol)[3]
+        tmp_path = f"{state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _append(self, symbol, state, engine, bars, through):
+        """Feeds completed bars to the engine and appends every ready row to the table."""
+        symbol_dir, dates_path, features_path, _ = self._paths(symbol)
+        new_dates, new_rows = [], []
+        for ts, row in zip(bars.index, bars[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False)):
+            bar_date = ts.date()
+            if bar_date > through or (engine.last_date is not None and bar_date <= engine.last_date):
+                continue
+            engine.update(bar_date, *row)
+            if bar_date >= _to_date(state['first_date']) and engine.is_ready():
+                new_dates.append(_day_number(bar_date))
+                new_rows.append(engine.feature_row())
+
+        os.makedirs(symbol_dir, exist_ok=True)
+        dates_bytes = np.asarray(new_dates, dtype='<i8').tobytes()
+        rows_bytes = np.asarray(new_rows, dtype='<f8').reshape(-1, N_FEATURES).tobytes()
+        for path, width, payload in ((dates_path, 8, dates_bytes), (features_path, 8 * N_FEATURES, rows_bytes)):
+            with open(path, "ab") as f:
+                # Drop anything past the committed row count (left behind by an interrupted write)
+                f.truncate(state['rows'] * width)
+                f.write(payload)
+
+        state['rows'] += len(new_dates)
+        # Covered only as far as the bars actually ingested: a day whose bar has not arrived yet
+        # must be fetched again by the next extend(). Trailing weekends and holidays need no bar.
+        last_bar = engine.last_date
+        if last_bar is not None and trading_days(last_bar + timedelta(days=1), through + timedelta(days=1), self.holidays) == 0:
+            last_bar = through
+        if last_bar is not None:
+            state['complete_through'] = max(last_bar, _to_date(state['complete_through'])).isoformat()
+        state['engine'] = engine.to_dict()
+        self._write_state(symbol, state)
+
+    def build(self, symbol, start=None, through=None):
+        """Bulk-builds the table for `symbol` from `start` through `through` (default: yesterday)."""
+        with self._lock(symbol):
+            return self._build(symbol, start, through)
+
+    def _build(self, symbol, start, through):
+        through = min(_to_date(through) if through else self._today(), self._today() - timedelta(days=1))
+        start = _to_date(start) if start else through - timedelta(days=self.history_days)
+        # Unlink rather than truncate so memory maps held by readers keep the old data
+        for path in self._paths(symbol)[1:3]:
+            if os.path.exists(path):
+                os.remove(path)
+        state = {'first_date': start.isoformat(), 'rows': 0,
+                 'complete_through': (start - timedelta(days=1)).isoformat()}
+        engine = IndicatorEngine()
+        # Warm the indicators on the lookback window before the first stored row
+        bars = self.get_ohlcv(symbol, start - timedelta(days=LOOKBACK_DAYS), through + timedelta(days=1))
+        self._append(symbol, state, engine, bars, through)
+        self._maps.pop(symbol, None)
+        self.builds += 1
+        return state['rows']
+
+    def extend(self, symbol, through=None):
+        """Appends rows for bars after the last covered day, up to `through` (default: yesterday)."""
+        through = min(_to_date(through) if through else self._today(), self._today() - timedelta(days=1))
+        with self._lock(symbol):
+            state = self._read_state(symbol)
+            if state is None:
+                return None
+            complete_through = _to_date(state['complete_through'])
+            if through <= complete_through:
+                return 0
+            if state['engine']['count'] == 0:
+                # The build received no bars at all; redo it so the indicators get their warm-up window
+                return self._build(symbol, state['first_date'], through)
+            rows_before = state['rows']
+            engine = IndicatorEngine.from_dict(state['engine'])
+            bars = self.get_ohlcv(symbol, complete_through + timedelta(days=1), through + timedelta(days=1))
+            self._append(symbol, state, engine, bars, through)
+            return state['rows'] - rows_before
+
+    def _arrays(self, symbol, state):
+        cached = self._maps.get(symbol)
+        if cached is not None and cached[0] == state['rows']:
+            return cached[1], cached[2]
+        _, dates_path, features_path, _ = self._paths(symbol)
+        rows = state['rows']
+        if rows == 0:
+            dates, features = np.empty(0, dtype='<i8'), np.empty((0, N_FEATURES), dtype='<f8')
+        else:
+            dates = np.memmap(dates_path, dtype='<i8', mode='r', shape=(rows,))
+            features = np.memmap(features_path, dtype='<f8', mode='r', shape=(rows, N_FEATURES))
+        self._maps[symbol] = (rows, dates, features)
+        return dates, features
+
+    def lookup(self, symbol, target_date):
+        """
+        Returns (feature row, row date) for the latest stored trading day on or
+        before `target_date`, or None if the table does not cover that date.
+        """
+        target_date = _to_date(target_date)
+        state = self._read_state(symbol)
+        if state is None or not (_to_date(state['first_date']) <= target_date <= _to_date(state['complete_through'])):
+            return None
+        dates, features = self._arrays(symbol, state)
+        position = int(np.searchsorted(dates, _day_number(target_date), side='right')) - 1
+        if position < 0:
+            return None
+        return np.array(features[position]), date(1970, 1, 1) + timedelta(days=int(dates[position]))
+
+    def get_features(self, symbol, target_date):
+        """
+        lookup() that first builds the symbol's table, or extends it, when the
+        target is a completed day the table does not reach yet.
+        """
+        target_date = _to_date(target_date)
+        if target_date >= self._today():
+            return None
+        state = self._read_state(symbol)
+        if state is None:
+            start = min(target_date, self._today() - timedelta(days=self.history_days))
+            with self._lock(symbol):
+                # Concurrent first requests for a symbol wait for one build instead of each rebuilding it
+                if self._read_state(symbol) is None:
+                    self._build(symbol, start, None)
+        elif target_date > _to_date(state['complete_through']):
+            self.extend(symbol)
+        return self.lookup(symbol, target_date)
+
+
+_default_feature_store = None
+_default_feature_store_lock = threading.Lock()
+
+
+def get_feature_store():
+    """Returns the process-wide feature store, creating it on first use."""
+    global _default_feature_store
+    with _default_feature_store_lock:
+        if _default_feature_store is None:
+            from ohlcv_store import get_ohlcv
+            _default_feature_store = FeatureStore(get_ohlcv)
+        return _default_feature_store
+
+
+def set_feature_store(store):
+    global _default_feature_store
+    with _default_feature_store_lock:
+        _default_feature_store = store
+
+
+if __name__ == '__main__':
+    # Bulk build, e.g. `python feature_store.py RELIANCE.NS TCS.NS --start 2022-01-01`
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or extend the materialized feature table.")
+    parser.add_argument('symbols', nargs='+', help="yfinance symbols, e.g. RELIANCE.NS")
+    parser.add_argument('--start', help="first date to materialize (default: 3 years ago)")
+    parser.add_argument('--extend', action='store_true', help="only append bars after the last covered day")
+    args = parser.parse_args()
+
+    store = get_feature_store()
+    for symbol in args.symbols:
+        rows = store.extend(symbol) if args.extend else store.build(symbol, start=args.start)
+        print(f"{symbol}: {rows} rows {'appended' if args.extend else 'built'}")
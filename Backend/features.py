@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import ta # Import the 'ta' library
+
+# Feature engineering shared by the prediction routes.
+
+# Define ALL 18 required features - MUST match exactly what your model was trained on.
+required_features = [
+    'close_t-1', 'volume_t-1', 'sma_10', 'sma_50', 'rsi', 'macd',
+    'macd_signal', 'bollinger_high', 'bollinger_low', 'day_of_week', 'month',
+    'close_t-2', 'volume_t-2', 'close_t-3', 'volume_t-3', 'ema_10', 'atr', 'obv'
+]
+
+# Calendar days of history fetched before the target date, enough to warm up SMA_50, MACD and ATR
+LOOKBACK_DAYS = 250
+
+# Calendar days searched backwards for the previous close used to turn ROC into a price
+PREV_CLOSE_LOOKBACK_DAYS = 10
+
+# Bars needed inside the lookback window before every feature is defined (SMA_50 is the longest)
+MIN_WARMUP_BARS = 50
+
+
+def to_yfinance_symbol(symbol):
+    # Adjust symbol for yfinance for Indian stocks (e.g., RELIANCE.NS)
+    if not symbol.endswith('.NS') and not symbol.endswith('.BO'):
+        return f"{symbol}.NS"
+    return symbol
+
+def add_lag_features(df):
+    df['close_t-1'] = df['close'].shift(1)
+    df['close_t-2'] = df['close'].shift(2)
+    df['close_t-3'] = df['close'].shift(3)
+    df['volume_t-1'] = df['volume'].shift(1)
+    df['volume_t-2'] = df['volume'].shift(2)
+    df['volume_t-3'] = df['volume'].shift(3)
+    return df
+
+def add_technical_indicators(df):
+    # Technical Indicators (using 'ta' library logic from notebook)
+    df['sma_10'] = ta.trend.sma_indicator(df['close'], window=10)
+    df['sma_50'] = ta.trend.sma_indicator(df['close'], window=50)
+    df['rsi'] = ta.momentum.rsi(df['close'], window=14)
+    df['macd'] = ta.trend.macd(df['close'])
+    df['macd_signal'] = ta.trend.macd_signal(df['close'])
+
+    bollinger = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
+    df['bollinger_high'] = bollinger.bollinger_hband()
+    df['bollinger_low'] = bollinger.bollinger_lband()
+
+    df['obv'] = ta.volume.on_balance_volume(df['close'], df['volume'])
+    df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=14)
+    df['ema_10'] = ta.trend.ema_indicator(df['close'], window=10)
+    return df
+
+def add_date_features(df):
+    df['day_of_week'] = df.index.dayofweek # index is datetime
+    df['month'] = df.index.month
+    return df
+
+def build_feature_frame(df):
+    """Adds every required feature column to an OHLCV frame (rows with warm-up NaNs are kept)."""
+    add_lag_features(df)
+    add_technical_indicators(df)
+    add_date_features(df)
+    return df
+
+
+def build_feature_rows(ohlcv, dates):
+    """
+    Computes the feature frame for one symbol once and picks the row that
+    prepare_features() would use for each target date, plus the previous close
+    that predict() uses to turn ROC into a price.
+
+    `ohlcv` must cover LOOKBACK_DAYS before the earliest date up to the latest one.
+    Returns (features, prev_closes): a (len(dates), 18) float array in
+    required_features order and a float array; rows that cannot be served are NaN.
+
+    OBV is re-anchored to each date's own lookback window so it equals the
+    single-date path exactly. The EMA-based features (EMA, MACD, RSI, ATR) start
+    from an earlier seed and agree with it to within floating-point noise.
+    """
+    targets = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+    features = np.full((len(targets), len(required_features)), np.nan)
+    prev_closes = np.full(len(targets), np.nan)
+    if ohlcv.empty:
+        return features, prev_closes
+
+    frame = build_feature_frame(ohlcv.copy())
+    values = frame[required_features].to_numpy(dtype=float)
+    bar_dates = frame.index.values.astype('datetime64[D]')
+    target_days = targets.values.astype('datetime64[D]')
+
+    # Latest bar on or before each date, first bar of its lookback window and the bar before it
+    rows = np.searchsorted(bar_dates, target_days, side='right') - 1
+    window_starts = np.searchsorted(bar_dates, target_days - np.timedelta64(LOOKBACK_DAYS, 'D'), side='left')
+    prev_rows = np.searchsorted(bar_dates, target_days, side='left') - 1
+
+    close = frame['close'].to_numpy(dtype=float)
+    volume = frame['volume'].to_numpy(dtype=float)
+    signed_volume = np.where(close < np.concatenate(([np.nan], close[:-1])), -volume, volume)
+    cumulative_obv = np.cumsum(signed_volume)
+    obv_col = required_features.index('obv')
+
+    for i in range(len(targets)):
+        row, start = rows[i], window_starts[i]
+        if row >= 0 and row - start + 1 >= MIN_WARMUP_BARS:
+            features[i] = values[row]
+            # ta's OBV starts the window with +volume on its first bar
+            features[i, obv_col] = volume[start] + cumulative_obv[row] - cumulative_obv[start]
+            if np.isnan(features[i]).any():
+                features[i] = np.nan
+
+        prev = prev_rows[i]
+        if prev >= 0 and bar_dates[prev] >= target_days[i] - np.timedelta64(PREV_CLOSE_LOOKBACK_DAYS, 'D'):
+            prev_closes[i] = close[prev]
+
+    return features, prev_closes
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import numpy as np
+
+# Multi-day price paths from one feature computation.
+#
+# The model predicts one day's ROC from the indicator state after the previous
+# bar. A path of N days starts from the IndicatorEngine holding every real bar
+# before the first day and rolls it forward: each predicted close becomes a
+# synthetic bar that is fed to the engine, which updates the lags and every
+# indicator in O(1), and the next day is scored from that state. Each step is
+# one engine update and one single-row predict, so the cost of a path grows
+# with N only by a few hundred microseconds per day on top of the one
+# download/feature computation.
+#
+# Synthetic bars open at the previous close, have the predicted close as their
+# other extreme (so ATR sees the predicted move as the day's range) and repeat
+# the last known volume; OBV then moves by that volume in the predicted direction.
+
+# Upper bound on days per path
+MAX_HORIZON = 60
+
+
+def next_trading_day(day, holidays=()):
+    """The next weekday after `day` that is not in `holidays` (dates)."""
+    day += timedelta(days=1)
+    while day.weekday() >= 5 or day in holidays:
+        day += timedelta(days=1)
+    return day
+
+
+def roll_forward(engine, predict, first_date, horizon, holidays=()):
+    """
+    Forecasts `horizon` trading days starting at `first_date` (moved to the next
+    trading day if it falls on a weekend or one of `holidays`). `engine` holds
+    the real bars before first_date and is not modified; `predict` maps an
+    (n, n_features) array to ROC values. Returns a list of (date, predicted ROC,
+    predicted close); the list is shorter when the engine does not yet have
+    every feature defined.
+    """
+    engine = engine.copy()
+    day = first_date
+    if day.weekday() >= 5 or day in holidays:
+        day = next_trading_day(day, holidays)
+    prev_close = engine.closes[-1]
+    volume = engine.volumes[-1]
+    path = []
+    for _ in range(horizon):
+        # The OBV window is anchored at the forecast day, as in prepare_features()
+        row = np.asarray(engine.feature_row(day), dtype=float)
+        if np.isnan(row).any():
+            break
+        roc = float(predict(row[None, :])[0])
+        close = prev_close * (1 + roc / 100)
+        path.append((day, roc, close))
+        engine.update(day, prev_close, max(prev_close, close), min(prev_close, close), close, volume)
+        prev_close = close
+        day = next_trading_day(day, holidays)
+    return path
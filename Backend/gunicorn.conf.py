@@ -0,0 +1,32 @@
+import gc
+import os
+
+# Preforking setup: `gunicorn -c gunicorn.conf.py wsgi:application` (run from Backend/).
+#
+# With preload_app the master imports wsgi.py once and, in sync warm-up mode,
+# finishes every warm-up task (app import, model arrays, native booster, data
+# stores) before forking. Workers then share those pages copy-on-write instead
+# of each loading the model. gc.freeze() moves everything allocated so far into
+# a permanent generation, so the workers' garbage collector never touches (and
+# thereby copies) those pages.
+#
+# Nothing is predicted in the master: LightGBM's OpenMP thread pool does not
+# survive fork, so it must first be used in a worker.
+
+os.environ.setdefault('STOCKSIGHT_WARMUP', 'sync')
+
+bind = os.environ.get('STOCKSIGHT_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('STOCKSIGHT_WORKERS', '4'))
+threads = int(os.environ.get('STOCKSIGHT_THREADS', '8'))
+
+# Each worker runs its own /screen process pool (screener.py). Sized from this
+# worker count, the pools together use about one process per CPU rather than
+# workers x cpu_count; STOCKSIGHT_SCREEN_WORKERS overrides the per-worker size.
+os.environ['WEB_CONCURRENCY'] = str(workers)
+preload_app = True
+timeout = 120
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first worker forks
+    gc.freeze()
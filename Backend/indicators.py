@@ -0,0 +1,375 @@
+import json
+import math
+import os
+import threading
+from collections import deque
+from datetime import date, timedelta
+
+from features import required_features, LOOKBACK_DAYS
+from ohlcv_store import DEFAULT_CACHE_DIR, _to_date
+
+# Incremental (streaming) version of features.build_feature_frame.
+# Every indicator keeps O(1) state per symbol, so scoring the next trading day
+# only touches the new bar instead of recomputing 250 days with 'ta'.
+# The update rules reproduce the 'ta' implementations used by the model:
+#   - SMA / Bollinger: rolling sums over the last 10/20/50 closes (ddof=0 std)
+#   - EMA / MACD / signal: ewm(span, adjust=False) seeded with the first value
+#   - RSI: Wilder smoothing (alpha=1/14) of gains/losses, seeded with 0
+#   - ATR: mean of the first 14 true ranges, then Wilder smoothing (0 while warming up)
+#   - OBV: running signed volume over the lookback window, first bar counted as +volume
+
+# Rolling sums are rebuilt from their windows this often to stop float drift
+RESYNC_EVERY = 1000
+
+SMA_SHORT, SMA_LONG, BOLLINGER_WINDOW, BOLLINGER_DEV = 10, 50, 20, 2
+EMA_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGNAL = 10, 12, 26, 9
+RSI_WINDOW, ATR_WINDOW = 14, 14
+NAN = float('nan')
+
+
+class _Ema:
+    """ewm(span=window, adjust=False) with 'ta' min_periods=window semantics."""
+
+    def __init__(self, window):
+        self.alpha = 2.0 / (window + 1)
+        self.window = window
+        self.value = None
+        self.count = 0
+
+    def update(self, x):
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        self.count += 1
+
+    def current(self):
+        return self.value if self.count >= self.window else NAN
+
+    def to_dict(self):
+        return {'value': self.value, 'count': self.count}
+
+    def load(self, state):
+        self.value, self.count = state['value'], state['count']
+
+
+class _RollingSum:
+    """Running sum (and sum of squares) over the last `window` values."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def mean(self):
+        return self.total / self.window if len(self.values) == self.window else NAN
+
+    def std(self):
+        if len(self.values) < self.window:
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+    def to_dict(self):
+        return {'values': list(self.values), 'total': self.total, 'total_sq': self.total_sq, 'updates': self.updates}
+
+    def load(self, state):
+        self.values = deque(state['values'], maxlen=self.window)
+        self.total, self.total_sq = state['total'], state['total_sq']
+        self.updates = state['updates']
+
+
+class IndicatorEngine:
+    """
+    Streaming feature state for one symbol. Feed daily bars in date order with
+    update(); feature_row() returns the required_features values for the last bar.
+    State round-trips through to_dict()/from_dict() so it can be persisted and resumed.
+    """
+
+    def __init__(self, lookback_days=LOOKBACK_DAYS):
+        self.lookback_days = lookback_days
+        self.count = 0
+        self.last_date = None
+        self.closes = deque(maxlen=4)
+        self.volumes = deque(maxlen=4)
+        self.sma_short = _RollingSum(SMA_SHORT)
+        self.sma_long = _RollingSum(SMA_LONG)
+        self.bollinger = _RollingSum(BOLLINGER_WINDOW)
+        self.ema = _Ema(EMA_WINDOW)
+        self.ema_fast = _Ema(MACD_FAST)
+        self.ema_slow = _Ema(MACD_SLOW)
+        self.macd_signal = _Ema(MACD_SIGNAL)
+        self.rsi_up = None
+        self.rsi_down = None
+        self.tr_sum = 0.0
+        self.atr = 0.0
+        # (date ordinal, volume, signed volume) for every bar in the OBV lookback window
+        self.obv_window = deque()
+        self.obv_signed_sum = 0.0
+
+    def update(self, bar_date, open_, high, low, close, volume):
+        bar_date = _to_date(bar_date)
+        if self.last_date is not None and bar_date <= self.last_date:
+            raise ValueError(f"Bars must be fed in date order: got {bar_date} after {self.last_date}.")
+
+        prev_close = self.closes[-1] if self.closes else None
+
+        self.sma_short.update(close)
+        self.sma_long.update(close)
+        self.bollinger.update(close)
+        self.ema.update(close)
+        self.ema_fast.update(close)
+        self.ema_slow.update(close)
+        if self.ema_slow.count >= MACD_SLOW:
+            self.macd_signal.update(self.ema_fast.value - self.ema_slow.value)
+
+        # RSI: the first diff is NaN, which 'ta' turns into a zero gain and loss
+        change = 0.0 if prev_close is None else close - prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self.rsi_up is None:
+            self.rsi_up, self.rsi_down = gain, loss
+        else:
+            alpha = 1.0 / RSI_WINDOW
+            self.rsi_up = alpha * gain + (1 - alpha) * self.rsi_up
+            self.rsi_down = alpha * loss + (1 - alpha) * self.rsi_down
+
+        if prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if self.count < ATR_WINDOW:
+            self.tr_sum += true_range
+            if self.count == ATR_WINDOW - 1:
+                self.atr = self.tr_sum / ATR_WINDOW
+        else:
+            self.atr = (self.atr * (ATR_WINDOW - 1) + true_range) / ATR_WINDOW
+
+        signed = -volume if prev_close is not None and close < prev_close else volume
+        self.obv_window.append((bar_date.toordinal(), volume, signed))
+        self.obv_signed_sum += signed
+        cutoff = (bar_date - timedelta(days=self.lookback_days)).toordinal()
+        while self.obv_window[0][0] < cutoff:
+            self.obv_signed_sum -= self.obv_window.popleft()[2]
+
+        self.closes.append(close)
+        self.volumes.append(volume)
+        self.count += 1
+        self.last_date = bar_date
+
+    def update_frame(self, df):
+        """Feeds every bar of an OHLCV frame (see ohlcv_store) that is newer than last_date."""
+        for ts, row in zip(df.index, df[['open', 'high', 'low', 'close', 'volume']].itertuples(index=False)):
+            bar_date = ts.date()
+            if self.last_date is None or bar_date > self.last_date:
+                self.update(bar_date, *row)
+
+    def _obv(self, as_of):
+        # The window is anchored at as_of - lookback_days, like prepare_features' download window
+        cutoff = (as_of - timedelta(days=self.lookback_days)).toordinal()
+        signed_sum = self.obv_signed_sum
+        for ordinal, volume, signed in self.obv_window:
+            if ordinal >= cutoff:
+                # The first bar of the window always counts as +volume
+                return volume + signed_sum - signed
+            signed_sum -= signed
+        return NAN
+
+    def _rsi(self):
+        if self.count < RSI_WINDOW:
+            return NAN
+        if self.rsi_down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.rsi_up / self.rsi_down)
+
+    def feature_dict(self, as_of=None):
+        """Feature values for the last bar; as_of (defaults to last_date) anchors the OBV window."""
+        if self.count == 0:
+            return {name: NAN for name in required_features}
+        as_of = self.last_date if as_of is None else _to_date(as_of)
+
+        def lag(values, k):
+            return values[-1 - k] if len(values) > k else NAN
+
+        mavg, mstd = self.bollinger.mean(), self.bollinger.std()
+        macd = self.ema_fast.value - self.ema_slow.value if self.ema_slow.count >= MACD_SLOW else NAN
+        return {
+            'close_t-1': lag(self.closes, 1),
+            'volume_t-1': lag(self.volumes, 1),
+            'sma_10': self.sma_short.mean(),
+            'sma_50': self.sma_long.mean(),
+            'rsi': self._rsi(),
+            'macd': macd,
+            'macd_signal': self.macd_signal.current(),
+            'bollinger_high': mavg + BOLLINGER_DEV * mstd,
+            'bollinger_low': mavg - BOLLINGER_DEV * mstd,
+            'day_of_week': float(self.last_date.weekday()),
+            'month': float(self.last_date.month),
+            'close_t-2': lag(self.closes, 2),
+            'volume_t-2': lag(self.volumes, 2),
+            'close_t-3': lag(self.closes, 3),
+            'volume_t-3': lag(self.volumes, 3),
+            'ema_10': self.ema.current(),
+            'atr': self.atr,
+            'obv': self._obv(as_of),
+        }
+
+    def feature_row(self, as_of=None):
+        """Feature values for the last bar as a list in required_features order."""
+        values = self.feature_dict(as_of)
+        return [values[name] for name in required_features]
+
+    def is_ready(self, as_of=None):
+        return not any(math.isnan(value) for value in self.feature_row(as_of))
+
+    def to_dict(self):
+        return {
+            'lookback_days': self.lookback_days,
+            'count': self.count,
+            'last_date': self.last_date.isoformat() if self.last_date else None,
+            'closes': list(self.closes),
+            'volumes': list(self.volumes),
+            'sma_short': self.sma_short.to_dict(),
+            'sma_long': self.sma_long.to_dict(),
+            'bollinger': self.bollinger.to_dict(),
+            'ema': self.ema.to_dict(),
+            'ema_fast': self.ema_fast.to_dict(),
+            'ema_slow': self.ema_slow.to_dict(),
+            'macd_signal': self.macd_signal.to_dict(),
+            'rsi_up': self.rsi_up,
+            'rsi_down': self.rsi_down,
+            'tr_sum': self.tr_sum,
+            'atr': self.atr,
+            'obv_window': [list(entry) for entry in self.obv_window],
+            'obv_signed_sum': self.obv_signed_sum,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        engine = cls(lookback_days=state['lookback_days'])
+        engine.count = state['count']
+        engine.last_date = _to_date(state['last_date']) if state['last_date'] else None
+        engine.closes = deque(state['closes'], maxlen=4)
+        engine.volumes = deque(state['volumes'], maxlen=4)
+        for name in ('sma_short', 'sma_long', 'bollinger', 'ema', 'ema_fast', 'ema_slow', 'macd_signal'):
+            getattr(engine, name).load(state[name])
+        engine.rsi_up, engine.rsi_down = state['rsi_up'], state['rsi_down']
+        engine.tr_sum, engine.atr = state['tr_sum'], state['atr']
+        engine.obv_window = deque(tuple(entry) for entry in state['obv_window'])
+        engine.obv_signed_sum = state['obv_signed_sum']
+        return engine
+
+    def copy(self):
+        return IndicatorEngine.from_dict(self.to_dict())
+
+
+class IndicatorStateStore:
+    """Persists one IndicatorEngine per symbol as a small JSON file."""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(DEFAULT_CACHE_DIR, 'indicator_state')
+        os.makedirs(self.directory, exist_ok=True)
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol):
+        return os.path.join(self.directory, f"{symbol}.json")
+
+    def load(self, symbol):
+        with self._lock:
+            if symbol in self._engines:
+                return self._engines[symbol].copy()
+            try:
+                with open(self._path(symbol), encoding="utf-8") as f:
+                    engine = IndicatorEngine.from_dict(json.load(f))
+            except (FileNotFoundError, ValueError, KeyError):
+                return None
+            self._engines[symbol] = engine
+            return engine.copy()
+
+    def save(self, symbol, engine):
+        with self._lock:
+            self._engines[symbol] = engine.copy()
+            # Write-then-rename so concurrent readers never see a half-written file
+            tmp_path = f"{self._path(symbol)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(engine.to_dict(), f)
+            os.replace(tmp_path, self._path(symbol))
+
+
+def streaming_features(symbol, target_date, get_ohlcv, state_store, today=None):
+    """
+    Returns the required_features row for `symbol` on the latest bar on or
+    before `target_date`, or None when there is not enough history.
+    """
+    target_date = _to_date(target_date)
+    engine = streaming_engine(symbol, target_date, get_ohlcv, state_store, today)
+    if engine.count == 0 or not engine.is_ready(target_date):
+        return None
+    return engine.feature_row(target_date)
+
+
+def streaming_engine(symbol, target_date, get_ohlcv, state_store, today=None):
+    """
+    Returns an IndicatorEngine for `symbol` that has seen every bar on or before
+    `target_date` (count is 0 when there are none).
+
+    The persisted engine is resumed when the target is not older than its last
+    bar, so only bars after that are read; otherwise a fresh engine is seeded from
+    the LOOKBACK_DAYS window, the same bars prepare_features used with 'ta'.
+    Today's bar may still change, so it is applied to a copy and never persisted.
+    """
+    target_date = _to_date(target_date)
+    today = today or date.today()
+    engine = state_store.load(symbol)
+    resumed = engine is not None and engine.last_date is not None and engine.last_date <= target_date
+
+    if resumed:
+        bars = get_ohlcv(symbol, engine.last_date + timedelta(days=1), target_date + timedelta(days=1))
+    else:
+        # Seeding for a date older than the saved state must not roll that state back
+        keep_saved = engine is not None and engine.last_date is not None
+        engine = IndicatorEngine()
+        bars = get_ohlcv(symbol, target_date - timedelta(days=LOOKBACK_DAYS), target_date + timedelta(days=1))
+
+    completed = bars[bars.index.date < today]
+    if not completed.empty:
+        engine.update_frame(completed)
+        if resumed or not keep_saved:
+            state_store.save(symbol, engine)
+
+    provisional = bars[bars.index.date >= today]
+    if not provisional.empty:
+        engine = engine.copy()
+        engine.update_frame(provisional)
+    return engine
+
+
+_default_state_store = None
+_default_state_store_lock = threading.Lock()
+
+
+def get_state_store():
+    """Returns the process-wide indicator state store, creating it on first use."""
+    global _default_state_store
+    with _default_state_store_lock:
+        if _default_state_store is None:
+            _default_state_store = IndicatorStateStore()
+        return _default_state_store
+
+
+def set_state_store(store):
+    global _default_state_store
+    with _default_state_store_lock:
+        _default_state_store = store
@@ -0,0 +1,233 @@
+import os
+import threading
+
+import numpy as np
+
+# Fast model loading and a low-overhead predict path for roc_model3.pkl.
+#
+# The pickled LGBMRegressor is converted once into two cached forms under
+# <cache>/model/, keyed by the model version:
+#   <version>.npz  every tree's splits, children and leaf values as flat numpy
+#                  arrays; loads in milliseconds without importing lightgbm or
+#                  scikit-learn, whose imports dominate cold starts
+#   <version>.txt  the native booster's model text, loaded without unpickling
+#                  the sklearn wrapper
+# Both are fed a plain float array in required_features order; neither builds
+# a DataFrame or runs the sklearn wrapper's validation.
+#
+# CompiledModel.predict walks all trees at once, one tree level per numpy step,
+# and adds the leaf values in tree order exactly as LightGBM does, so its output
+# equals model.predict bit for bit.
+
+# Same cache root as ohlcv_store.DEFAULT_CACHE_DIR; not imported from there to keep pandas out of this module
+basedir = os.path.abspath(os.path.dirname(__file__))
+MODEL_CACHE_DIR = os.path.join(os.environ.get('STOCKSIGHT_CACHE_DIR', os.path.join(basedir, 'data_cache')), 'model')
+
+# LightGBM's missing-value handling, encoded per split
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+# LightGBM treats |x| <= 1e-35 as zero
+K_ZERO_THRESHOLD = 1e-35
+
+
+def flatten_lightgbm(model):
+    """
+    Flattens a fitted LGBMRegressor (or Booster) into a dict of numpy arrays.
+    Internal nodes get global ids >= 0; leaves are encoded as ~leaf_id (< 0).
+    """
+    booster = getattr(model, 'booster_', model)
+    dump = booster.dump_model()
+    if dump.get('num_tree_per_iteration', 1) != 1 or dump.get('average_output'):
+        raise ValueError("Only single-output gbdt regressors can be compiled.")
+
+    feature, threshold, left, right, default_left, missing = [], [], [], [], [], []
+    leaf_value, roots = [], []
+    max_depth = 0
+
+    def add(node, depth):
+        nonlocal max_depth
+        if 'leaf_value' in node:
+            leaf_value.append(node['leaf_value'])
+            max_depth = max(max_depth, depth)
+            return ~(len(leaf_value) - 1)
+        if node['decision_type'] != '<=':
+            raise ValueError(f"Unsupported split type {node['decision_type']!r}.")
+        node_id = len(feature)
+        feature.append(node['split_feature'])
+        threshold.append(node['threshold'])
+        default_left.append(node['default_left'])
+        missing.append(_MISSING_TYPES[node['missing_type']])
+        left.append(0)
+        right.append(0)
+        left[node_id] = add(node['left_child'], depth + 1)
+        right[node_id] = add(node['right_child'], depth + 1)
+        return node_id
+
+    for tree in dump['tree_info']:
+        roots.append(add(tree['tree_structure'], 0))
+
+    return {
+        'feature': np.asarray(feature, dtype=np.int32),
+        'threshold': np.asarray(threshold, dtype=np.float64),
+        'left': np.asarray(left, dtype=np.int32),
+        'right': np.asarray(right, dtype=np.int32),
+        'default_left': np.asarray(default_left, dtype=bool),
+        'missing': np.asarray(missing, dtype=np.int8),
+        'leaf_value': np.asarray(leaf_value, dtype=np.float64),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'max_depth': np.asarray(max_depth, dtype=np.int32),
+        'n_features': np.asarray(dump['max_feature_idx'] + 1, dtype=np.int32),
+    }
+
+
+class CompiledModel:
+    """Array form of a LightGBM regressor with a numpy predict path."""
+
+    def __init__(self, arrays, version=None):
+        self.version = version
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features = int(arrays['n_features'])
+        self.leaf_value = arrays['leaf_value']
+
+        # Walk tables with leaves as self-looping nodes, so every tree can take
+        # max_depth steps without checking which ones have already finished:
+        # node ids [0, n_internal) are splits, n_internal + leaf is a leaf.
+        n_internal, n_leaves = len(arrays['feature']), len(arrays['leaf_value'])
+        self.n_internal = n_internal
+        leaf_nodes = np.arange(n_internal, n_internal + n_leaves, dtype=np.int32)
+
+        def node_id(child):
+            return np.where(child >= 0, child, n_internal + ~child).astype(np.int32)
+
+        self.feature = np.concatenate([arrays['feature'], np.zeros(n_leaves, dtype=np.int32)])
+        self.threshold = np.concatenate([arrays['threshold'], np.full(n_leaves, np.inf)])
+        # children[node, 0] is taken when x <= threshold, children[node, 1] otherwise
+        self.children = np.concatenate([
+            np.stack([node_id(arrays['left']), node_id(arrays['right'])], axis=1),
+            np.stack([leaf_nodes, leaf_nodes], axis=1),
+        ]).ravel()
+        self.default_left = np.concatenate([arrays['default_left'], np.ones(n_leaves, dtype=bool)])
+        self.missing = np.concatenate([arrays['missing'], np.zeros(n_leaves, dtype=np.int8)])
+        self.has_missing_rules = bool((self.missing != MISSING_NONE).any())
+        self.roots = node_id(arrays['roots'])
+
+    def predict(self, X):
+        """
+        Predicts for X: an (n, n_features) float32/float64 array in required_features
+        order (a single row may be 1-D). A DataFrame is accepted as well.
+        """
+        X = _as_matrix(X, self.n_features)
+
+        # Every split's decision for every row in one gather and compare.
+        # LightGBM replaces NaN by 0.0 unless the split routes NaN explicitly.
+        feature, threshold = self.feature[:self.n_internal], self.threshold[:self.n_internal]
+        nan_mask = np.isnan(X)
+        values = np.where(nan_mask, 0.0, X)[:, feature]
+        go_right = np.zeros((len(X), len(self.feature)), dtype=bool)
+        np.greater(values, threshold, out=go_right[:, :self.n_internal])
+        if self.has_missing_rules:
+            missing, default_left = self.missing[:self.n_internal], self.default_left[:self.n_internal]
+            is_missing = (((missing == MISSING_ZERO) & (np.abs(values) <= K_ZERO_THRESHOLD))
+                          | ((missing == MISSING_NAN) & nan_mask[:, feature]))
+            go_right[:, :self.n_internal] = np.where(is_missing, ~default_left, go_right[:, :self.n_internal])
+
+        # Then walk all trees one level per step; leaves loop onto themselves
+        decisions = go_right.ravel()
+        offsets = (np.arange(len(X)) * len(self.feature))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for depth in range(self.max_depth):
+            nodes = self.children[2 * nodes + decisions[offsets + nodes]]
+            if depth % 2 == 1 and nodes.min() >= self.n_internal:
+                break
+
+        leaves = self.leaf_value[nodes - self.n_internal]
+        # Sequential sum in tree order, matching LightGBM's accumulation
+        return np.cumsum(leaves, axis=1)[:, -1]
+
+
+def _as_matrix(X, n_features):
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[None, :]
+    if X.shape[1] != n_features:
+        raise ValueError(f"Expected {n_features} features, got {X.shape[1]}.")
+    return X
+
+
+class InferenceModel:
+    """
+    Serving model. Starts on the CompiledModel arrays, which load in
+    milliseconds; the native LightGBM booster is loaded from its cached model
+    text on the first batch of NATIVE_MIN_ROWS rows or more (or by
+    load_native()), and from then on serves every call. Both return exactly
+    what the pickled model's predict returns.
+    """
+
+    # Rows at which a call switches to the native booster, loading it if needed
+    NATIVE_MIN_ROWS = 16
+
+    def __init__(self, compiled, booster_path, version=None):
+        self.compiled = compiled
+        self.booster_path = booster_path
+        self.version = version
+        self.n_features = compiled.n_features
+        self._booster = None
+        self._lock = threading.Lock()
+
+    @property
+    def native_loaded(self):
+        return self._booster is not None
+
+    def load_native(self):
+        """Imports lightgbm and loads the booster from the cached model text."""
+        with self._lock:
+            if self._booster is None:
+                import lightgbm
+                self._booster = lightgbm.Booster(model_file=self.booster_path)
+        return self._booster
+
+    def predict(self, X):
+        """Predicts for an (n, n_features) array in required_features order; no DataFrame needed."""
+        X = _as_matrix(X, self.n_features)
+        booster = self._booster
+        if booster is None and len(X) >= self.NATIVE_MIN_ROWS:
+            booster = self.load_native()
+        if booster is not None:
+            return booster.predict(X)
+        return self.compiled.predict(X)
+
+
+def _save_npz(path, arrays):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_model(pkl_path, version, cache_dir=None):
+    """
+    Returns an InferenceModel for the pickled model at `pkl_path`. The tree
+    arrays (<version>.npz) and the native booster text (<version>.txt) are
+    cached under cache_dir keyed by `version` (the model's content hash), so
+    only the first start after a model change unpickles it.
+    """
+    cache_dir = cache_dir or MODEL_CACHE_DIR
+    arrays_path = os.path.join(cache_dir, f"{version}.npz")
+    booster_path = os.path.join(cache_dir, f"{version}.txt")
+    if os.path.exists(arrays_path) and os.path.exists(booster_path):
+        with np.load(arrays_path) as cached:
+            arrays = {name: cached[name] for name in cached.files}
+        return InferenceModel(CompiledModel(arrays, version), booster_path, version)
+
+    import joblib
+    model = joblib.load(pkl_path)
+    arrays = flatten_lightgbm(model)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{booster_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    getattr(model, 'booster_', model).save_model(tmp_path)
+    os.replace(tmp_path, booster_path)
+    _save_npz(arrays_path, arrays)
+    inference_model = InferenceModel(CompiledModel(arrays, version), booster_path, version)
+    # lightgbm is imported already, so the booster costs nothing extra here
+    inference_model._booster = getattr(model, 'booster_', model)
+    return inference_model
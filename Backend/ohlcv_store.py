@@ -0,0 +1,307 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from shared_cache import SegmentCache, file_lock
+
+# Local, persistent OHLCV store used by the prediction routes.
+# Daily bars are kept in a SQLite table keyed by (symbol, date), together with
+# the date range that has already been fetched for each symbol, so repeat
+# requests are answered from disk and only the missing range goes to the network.
+#
+# The fetched range of each symbol is also published as a memory-mapped segment
+# (shared_cache.py), so every worker process slices the same pages instead of
+# running a SQL query and building its own copy per request. Fetches hold a file
+# lock per symbol, so workers missing the same symbol fetch it once between them.
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_CACHE_DIR = os.environ.get('STOCKSIGHT_CACHE_DIR', os.path.join(basedir, 'data_cache'))
+# '0' reads every request from SQLite instead of the shared segments
+SHARED_SEGMENTS = os.environ.get('STOCKSIGHT_SHARED_CACHE', '1') != '0'
+# An empty answer for a range that ended this many days ago is final (a listing
+# date, a suspension): no bar can still be published for it
+SETTLED_AFTER_DAYS = 7
+
+
+def _to_date(value):
+    """Accepts 'YYYY-MM-DD' strings, datetimes or dates and returns a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def parse_holidays(text):
+    """Comma-separated 'YYYY-MM-DD' dates -> frozenset of dates."""
+    return frozenset(_to_date(part.strip()) for part in (text or '').split(',') if part.strip())
+
+
+# NSE trading holidays (STOCKSIGHT_MARKET_HOLIDAYS, comma-separated YYYY-MM-DD).
+# Weekdays listed here have no bar, so a gap made only of them and weekends is
+# never fetched, and prediction cache entries do not expire on them.
+MARKET_HOLIDAYS = parse_holidays(os.environ.get('STOCKSIGHT_MARKET_HOLIDAYS'))
+
+
+def trading_days(start, end, holidays=()):
+    """Number of weekdays in [start, end) that are not in `holidays`."""
+    return int(np.busday_count(start, end, holidays=np.array(sorted(holidays), dtype='datetime64[D]')))
+
+
+def normalize_ohlcv(df):
+    """
+    Brings a raw OHLCV frame into the store layout: lowercase
+    open/high/low/close/volume float columns on a naive, midnight DatetimeIndex.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+
+    df = df.copy()
+    # yfinance returns MultiIndex columns such as ('Close', 'RELIANCE.NS')
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [col[0].lower() if isinstance(col, tuple) else str(col).lower() for col in df.columns.values]
+    else:
+        df.columns = [str(col).lower() for col in df.columns]
+
+    missing = [col for col in OHLCV_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"OHLCV data is missing columns {missing}. Columns found: {list(df.columns)}")
+
+    df = df[OHLCV_COLUMNS].apply(pd.to_numeric, errors='coerce').astype(float)
+    df.dropna(inplace=True)
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize()
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df
+
+
+def yfinance_fetcher(symbol, start, end):
+    """Default fetcher: daily bars for [start, end) from yfinance."""
+    import yfinance as yf
+
+    df = yf.download(symbol, start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d"), progress=False)
+    return normalize_ohlcv(df)
+
+
+class OHLCVStore:
+    """
+    SQLite-backed daily OHLCV store with a pluggable fetcher.
+
+    `fetcher(symbol, start, end)` receives dates for a half-open [start, end)
+    range and returns a DataFrame in any layout `normalize_ohlcv` understands.
+    Pass a fake fetcher to use the store offline.
+    Segments are kept in a 'segments' folder next to the database unless
+    shared_segments is False. `holidays` (dates) are days without a bar.
+    """
+
+    def __init__(self, path=None, fetcher=None, today=None, shared_segments=SHARED_SEGMENTS,
+                 holidays=MARKET_HOLIDAYS, settled_after_days=SETTLED_AFTER_DAYS):
+        if path is None:
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            path = os.path.join(DEFAULT_CACHE_DIR, 'ohlcv.sqlite3')
+        self.path = path
+        self.segments = SegmentCache(os.path.join(os.path.dirname(os.path.abspath(path)), 'segments')) \
+            if shared_segments else None
+        self.fetcher = fetcher or yfinance_fetcher
+        # Injectable clock so the "today is never complete" rule can be tested
+        self._today = today or date.today
+        self.holidays = frozenset(holidays)
+        self.settled_after_days = settled_after_days
+        self._lock = threading.Lock()
+        # One lock per symbol, so a slow fetch for one symbol never blocks reads of another
+        self._symbol_locks = {}
+        self.fetch_count = 0
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bars ("
+                " symbol TEXT NOT NULL, date TEXT NOT NULL,"
+                " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+                " PRIMARY KEY (symbol, date)) WITHOUT ROWID"
+            )
+            # One contiguous fetched range [start, end) per symbol
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                " symbol TEXT PRIMARY KEY, start TEXT NOT NULL, end TEXT NOT NULL)"
+            )
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _fetch_lock(self, symbol):
+        """Held across processes while a symbol's missing ranges are fetched."""
+        return file_lock(f"{self.path}.{symbol}.lock")
+
+    def _coverage(self, conn, symbol):
+        row = conn.execute("SELECT start, end FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+        if row is None:
+            return None
+        return _to_date(row[0]), _to_date(row[1])
+
+    def _missing_ranges(self, coverage, start, end):
+        if coverage is None:
+            return [(start, end)]
+        cov_start, cov_end = coverage
+        if end < cov_start or start > cov_end:
+            # Keep coverage contiguous: fill the gap between the two ranges as well
+            return [(min(start, cov_start), max(end, cov_end))]
+        ranges = []
+        if start < cov_start:
+            ranges.append((start, cov_start))
+        if end > cov_end:
+            ranges.append((cov_end, end))
+        return ranges
+
+    def _fetch_and_store(self, conn, symbol, start, end):
+        """Fetches [start, end) into the bars table; returns the date of the last bar received, or None."""
+        df = normalize_ohlcv(self.fetcher(symbol, start, end))
+        with self._lock:
+            self.fetch_count += 1
+        rows = [
+            (symbol, ts.strftime("%Y-%m-%d"), row.open, row.high, row.low, row.close, row.volume)
+            for ts, row in zip(df.index, df.itertuples(index=False))
+        ]
+        conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return df.index[-1].date() if len(df) else None
+
+    def _fill(self, conn, symbol, start, end):
+        """
+        Fetches whatever part of [start, end) is missing; returns the new coverage.
+        Coverage only grows over bars actually received: yfinance answers with an
+        empty frame when it is throttled or the bar is not published yet, and
+        that range must stay missing so the next request fetches it again.
+        The exception is an empty answer for a settled range of a symbol that
+        already has bars (e.g. before its listing date), which is final.
+        """
+        coverage = self._coverage(conn, symbol)
+        for fetch_start, fetch_end in self._missing_ranges(coverage, start, end):
+            if trading_days(fetch_start, fetch_end, self.holidays) == 0:
+                # Only weekends and holidays are missing; there is nothing to fetch
+                covered_through = fetch_end
+            else:
+                last_bar = self._fetch_and_store(conn, symbol, fetch_start, fetch_end)
+                if last_bar is not None:
+                    covered_through = last_bar + timedelta(days=1)
+                elif coverage is not None and fetch_end <= self._today() - timedelta(days=self.settled_after_days):
+                    covered_through = fetch_end
+                else:
+                    continue
+            # Today's bar can still change, so coverage never extends past it
+            # and the next request refetches from today onwards.
+            today = self._today()
+            covered_start = fetch_start if coverage is None else min(fetch_start, coverage[0])
+            covered_end = min(covered_through, today)
+            if coverage is not None:
+                covered_end = max(covered_end, coverage[1])
+            if covered_end > covered_start:
+                conn.execute(
+                    "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)",
+                    (symbol, covered_start.strftime("%Y-%m-%d"), covered_end.strftime("%Y-%m-%d")),
+                )
+                coverage = (covered_start, covered_end)
+        # Other workers wait on the fetch lock and must see these rows once it is released
+        conn.commit()
+        return coverage
+
+    def _read_sql(self, conn, symbol, start, end):
+        df = pd.read_sql_query(
+            "SELECT date, open, high, low, close, volume FROM bars"
+            " WHERE symbol = ? AND date >= ? AND date < ? ORDER BY date",
+            conn,
+            params=(symbol, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+        )
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop('date')), name='Date')
+        return df.astype(float)
+
+    def _segment(self, conn, symbol, coverage):
+        """The shared segment holding every bar in the symbol's coverage (all final)."""
+        def build():
+            rows = conn.execute(
+                "SELECT date, open, high, low, close, volume FROM bars"
+                " WHERE symbol = ? AND date >= ? AND date < ? ORDER BY date",
+                (symbol, coverage[0].strftime("%Y-%m-%d"), coverage[1].strftime("%Y-%m-%d")),
+            ).fetchall()
+            return {'dates': np.array([row[0] for row in rows], dtype='datetime64[D]').astype('<i8'),
+                    'ohlcv': np.array([row[1:] for row in rows], dtype='<f8').reshape(-1, len(OHLCV_COLUMNS))}
+
+        version = f"{coverage[0].isoformat()}:{coverage[1].isoformat()}"
+        return self.segments.get_or_build(f"ohlcv.{symbol}", build, version)
+
+    def _read(self, conn, symbol, coverage, start, end):
+        if self.segments is None or coverage is None or start >= coverage[1]:
+            return self._read_sql(conn, symbol, start, end)
+        segment = self._segment(conn, symbol, coverage)
+        if segment is None:
+            return self._read_sql(conn, symbol, start, end)
+        days = segment['dates']
+        lo = int(np.searchsorted(days, (start - date(1970, 1, 1)).days, side='left'))
+        hi = int(np.searchsorted(days, (min(end, coverage[1]) - date(1970, 1, 1)).days, side='left'))
+        index = pd.DatetimeIndex(days[lo:hi].astype('datetime64[D]').astype('datetime64[us]'), name='Date')
+        # A view of the mapped pages; pandas copies on write, so callers can still modify it
+        df = pd.DataFrame(segment['ohlcv'][lo:hi], index=index, columns=OHLCV_COLUMNS, copy=False)
+        if end > coverage[1]:
+            # Today's bar is not final and lives only in SQLite
+            tail = self._read_sql(conn, symbol, coverage[1], end)
+            if not tail.empty:
+                df = pd.concat([df, tail])
+        return df
+
+    def get_ohlcv(self, symbol, start, end):
+        """
+        Returns daily OHLCV bars for `symbol` in [start, end), fetching only
+        the part of the range that is not on disk yet. With shared segments the
+        values are a read-only view: add or replace columns freely, but copy()
+        before writing into existing cells.
+        """
+        start, end = _to_date(start), _to_date(end)
+        if end <= start:
+            return normalize_ohlcv(None)
+
+        with self._symbol_lock(symbol), self._connect() as conn:
+            coverage = self._coverage(conn, symbol)
+            if self._missing_ranges(coverage, start, end):
+                # Another worker may be fetching this symbol; wait for it, then fetch only what is still missing
+                with self._fetch_lock(symbol):
+                    coverage = self._fill(conn, symbol, start, end)
+            return self._read(conn, symbol, coverage, start, end)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the process-wide store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = OHLCVStore()
+        return _default_store
+
+
+def set_store(store):
+    """Replaces the process-wide store (e.g. with one that uses a fake fetcher)."""
+    global _default_store
+    with _default_store_lock:
+        _default_store = store
+
+
+def get_ohlcv(symbol, start, end):
+    return get_store().get_ohlcv(symbol, start, end)
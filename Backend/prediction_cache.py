@@ -0,0 +1,243 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from ohlcv_store import _to_date, parse_holidays
+
+# Result cache in front of /predict.
+# A prediction for a past trading day never changes, so it is kept until the
+# LRU bound evicts it. A prediction for today or a future date depends on bars
+# that are still forming, so it expires at the next NSE session close and is
+# recomputed from the final bar afterwards.
+#
+# Entries live in memory as JSON bytes (bounded by entry count and/or bytes).
+# An optional on-disk tier (one JSON file per key, written by atomic rename)
+# lets several worker processes share results; it is bounded by file count and
+# pruned least recently used first (a disk hit refreshes the file's mtime).
+#
+# Sessions close on weekdays at 15:30 IST. NSE holidays are only skipped when
+# they are passed in (STOCKSIGHT_MARKET_HOLIDAYS, see ohlcv_store.py); otherwise an entry
+# made before a holiday expires on it and is recomputed once, unchanged.
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SESSION_CLOSE = (15, 30)  # NSE cash market closes at 15:30 IST
+
+
+def model_version(path):
+    """Short content hash of the model file, so a retrained model never serves old entries."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def next_session_close(now, holidays=()):
+    """
+    Epoch seconds of the first 15:30 IST close strictly after `now` (epoch seconds)
+    on a weekday that is not in `holidays` (dates).
+    """
+    local = datetime.fromtimestamp(now, IST)
+    close = local.replace(hour=SESSION_CLOSE[0], minute=SESSION_CLOSE[1], second=0, microsecond=0)
+    if close <= local:
+        close += timedelta(days=1)
+    while close.weekday() >= 5 or close.date() in holidays:
+        close += timedelta(days=1)
+    return close.timestamp()
+
+
+def expires_at(target_date, now, holidays=()):
+    """None (never expires) for dates before today in IST, else the next session close."""
+    if _to_date(target_date) < datetime.fromtimestamp(now, IST).date():
+        return None
+    return next_session_close(now, holidays)
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of /predict response bodies keyed by
+    (normalized symbol, date, model version).
+    max_entries / max_bytes of None (or 0) leave that dimension unbounded;
+    With neither bound nor a directory, caching is disabled.
+    The directory holds at most max_disk_entries files (None: unbounded).
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, directory=None, clock=None,
+                 max_disk_entries=100000, holidays=()):
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries or None
+        self.holidays = frozenset(holidays)
+        self._clock = clock or time.time
+        self._disk_writes = 0
+        self._entries = OrderedDict()  # key -> (expires_at, payload bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return bool(self.max_entries or self.max_bytes or self.directory)
+
+    @staticmethod
+    def key(symbol, date_str, version):
+        # '2025-7-1' and '2025-07-01' are the same prediction
+        try:
+            date_str = _to_date(date_str).isoformat()
+        except ValueError:
+            pass
+        return (symbol, date_str, version)
+
+    def _disk_path(self, key):
+        name = hashlib.sha1("|".join(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read_disk(self, key, now):
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                record = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if tuple(record['key']) != key:
+            return None
+        if record['expires_at'] is not None and record['expires_at'] <= now:
+            return None
+        try:
+            # Marks the file as recently used for prune_disk()
+            os.utime(self._disk_path(key))
+        except OSError:
+            pass
+        return record['expires_at'], json.dumps(record['value']).encode()
+
+    def _write_disk(self, key, expiry, value):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'key': list(key), 'expires_at': expiry, 'value': value}, f)
+        os.replace(tmp_path, path)
+        if self.max_disk_entries:
+            with self._lock:
+                self._disk_writes += 1
+                # Scanning the directory is O(files), so only every 1% of the bound
+                due = self._disk_writes % max(1, self.max_disk_entries // 100) == 0
+            if due:
+                self.prune_disk()
+
+    def prune_disk(self):
+        """
+        Deletes the least recently used files beyond max_disk_entries (down to 90%
+        of it) and temporary files left behind by interrupted writes; returns the
+        number of entries removed. Safe while other processes read and write.
+        """
+        if not (self.directory and self.max_disk_entries):
+            return 0
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            try:
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith('.tmp'):
+                if now - mtime > 3600:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(entry.path)
+            elif entry.name.endswith('.json'):
+                files.append((mtime, entry.path))
+        if len(files) <= self.max_disk_entries:
+            return 0
+        files.sort()
+        excess = files[:len(files) - int(self.max_disk_entries * 0.9)]
+        for _, path in excess:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        with self._lock:
+            self.disk_evictions += len(excess)
+        return len(excess)
+
+    def _store(self, key, expiry, payload):
+        """Inserts into the memory tier and evicts least recently used entries; caller holds the lock."""
+        if not (self.max_entries or self.max_bytes):
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = (expiry, payload)
+        self._bytes += len(payload)
+        while self._entries and ((self.max_entries and len(self._entries) > self.max_entries)
+                                 or (self.max_bytes and self._bytes > self.max_bytes)):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def get(self, key):
+        """Returns a copy of the cached body for `key`, or None."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[1])
+                del self._entries[key]
+                self._bytes -= len(entry[1])
+                self.expirations += 1
+
+        if self.directory:
+            record = self._read_disk(key, now)
+            if record is not None:
+                with self._lock:
+                    self._store(key, *record)
+                    self.disk_hits += 1
+                return json.loads(record[1])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value, target_date):
+        """Caches `value` (a JSON-serialisable body) with an expiry derived from `target_date`."""
+        if not self.enabled:
+            return
+        expiry = expires_at(target_date, self._clock(), self.holidays)
+        payload = json.dumps(value).encode()
+        with self._lock:
+            self._store(key, expiry, payload)
+        if self.directory:
+            self._write_disk(key, expiry, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'disk_evictions': self.disk_evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else None,
+            }
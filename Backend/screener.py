@@ -0,0 +1,199 @@
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from features import PREV_CLOSE_LOOKBACK_DAYS, required_features, to_yfinance_symbol
+from feature_store import get_feature_store
+from indicators import get_state_store, streaming_engine
+from ohlcv_store import get_ohlcv
+
+# Market-wide screen: the next-day ROC for every symbol of a universe, ranked.
+#
+# Feature rows are computed in worker processes, a chunk of symbols per task,
+# with exactly the lookups /predict uses (feature table for completed days, the
+# streaming indicator state otherwise). The parent stacks the rows, scores them
+# with one model.predict call and picks the top k with np.argpartition, which
+# is O(n) instead of a full sort.
+#
+# The universe is STOCKSIGHT_UNIVERSE: a comma-separated list of symbols or the
+# path of a file with one symbol per line, or NSE's index constituent CSV
+# (e.g. ind_nifty500list.csv) with a "Symbol" column. Default: the top 20.
+
+# Top 20 NSE companies, as in NseDatafetcher.py
+DEFAULT_UNIVERSE = [
+    "RELIANCE", "HDFCBANK", "ICICIBANK", "INFY", "TCS", "ITC", "LT", "AXISBANK",
+    "KOTAKBANK", "SBIN", "HCLTECH", "SUNPHARMA", "BAJFINANCE", "TITAN",
+    "HINDUNILVR", "M&M", "ASIANPAINT", "MARUTI", "NESTLEIND", "WIPRO"
+]
+
+# Worker processes for the feature stage (1 computes in the calling process).
+# Every server process gets its own pool, so the default splits the CPUs between
+# WEB_CONCURRENCY server processes (gunicorn.conf.py sets it for its workers)
+# instead of spawning cpu_count interpreters, each loading the model, per process.
+SCREEN_WORKERS = int(os.environ.get('STOCKSIGHT_SCREEN_WORKERS') or
+                     max(1, (os.cpu_count() or 1) // max(1, int(os.environ.get('WEB_CONCURRENCY') or 1))))
+
+# Tasks per worker; more, smaller chunks even out symbols that need a cold build
+CHUNKS_PER_WORKER = 4
+
+# How the top k are ranked: highest predicted ROC, lowest, or largest absolute move
+RANK_KEYS = {
+    'gain': lambda roc: roc,
+    'loss': lambda roc: -roc,
+    'abs': np.abs,
+}
+
+
+def load_universe(spec=None):
+    """Symbols named by `spec` (default: STOCKSIGHT_UNIVERSE), see the module comment."""
+    spec = spec if spec is not None else os.environ.get('STOCKSIGHT_UNIVERSE', '')
+    if not spec.strip():
+        return list(DEFAULT_UNIVERSE)
+    if os.path.isfile(spec):
+        with open(spec, encoding="utf-8-sig") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        header = [column.strip() for column in lines[0].split(',')]
+        if 'Symbol' in header:
+            column = header.index('Symbol')
+            symbols = [line.split(',')[column] for line in lines[1:]]
+        else:
+            symbols = lines
+    else:
+        symbols = spec.split(',')
+    # De-duplicated, in the given order
+    return list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+
+
+def symbol_features(symbol, date_str):
+    """
+    (required_features row, previous close) for `symbol` on `date_str`, using the
+    same lookups as app.prepare_features and app.compute_prediction; None if
+    either is unavailable.
+    """
+    yfinance_symbol = to_yfinance_symbol(symbol)
+    target = datetime.strptime(date_str, "%Y-%m-%d").date()
+    stored = get_feature_store().get_features(yfinance_symbol, date_str)
+    if stored is None or stored[1] != target:
+        # Streaming path. The engine already holds the last closes, so the previous
+        # close needs no second OHLCV read (for a future date that read would
+        # refetch the provisional bar).
+        engine = streaming_engine(yfinance_symbol, target, get_ohlcv, get_state_store())
+        if engine.count == 0 or not engine.is_ready(target):
+            return None
+        closes = list(engine.closes)
+        if engine.last_date == target:
+            closes.pop()
+        return (engine.feature_row(target), float(closes[-1])) if closes else None
+
+    bars = get_ohlcv(yfinance_symbol, target - timedelta(days=PREV_CLOSE_LOOKBACK_DAYS), target)
+    if bars.empty:
+        return None
+    before = bars[bars.index.date < target]['close']
+    prev_close = before.iloc[-1] if not before.empty else bars['close'].iloc[-1]
+    return stored[0], float(prev_close)
+
+
+def featurize_chunk(symbols, date_str):
+    """
+    Runs in a worker: feature matrix, previous closes and per-symbol errors for
+    `symbols`. Rows that could not be built are NaN.
+    """
+    features = np.full((len(symbols), len(required_features)), np.nan)
+    prev_closes = np.full(len(symbols), np.nan)
+    errors = {}
+    for position, symbol in enumerate(symbols):
+        try:
+            result = symbol_features(symbol, date_str)
+        except Exception as e:
+            errors[symbol] = str(e)
+            continue
+        if result is None:
+            errors[symbol] = 'Insufficient historical data to prepare features or previous close.'
+            continue
+        features[position], prev_closes[position] = result
+    return features, prev_closes, errors
+
+
+_pool = None
+_pool_config = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers, initializer, initargs):
+    # Kept for the life of the process so workers keep their open stores between screens.
+    # Spawned rather than forked: the server process is multi-threaded and may have
+    # used LightGBM's OpenMP pool, neither of which survives fork.
+    global _pool, _pool_config
+    with _pool_lock:
+        config = (workers, initializer, initargs)
+        if _pool is None or _pool_config != config:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=initializer, initargs=initargs)
+            _pool_config = config
+        return _pool
+
+
+def screen(symbols, date_str, predict, top_k=20, rank='gain', workers=None, initializer=None, initargs=()):
+    """
+    Scores `symbols` for `date_str` and returns a dict with the top_k rows by
+    `rank` (see RANK_KEYS), the symbols that could not be scored and the
+    seconds spent in each stage. `predict` maps an (n, n_features) array to ROC.
+    """
+    timings = {}
+    started = time.perf_counter()
+    workers = SCREEN_WORKERS if workers is None else workers
+
+    stage_start = time.perf_counter()
+    if workers <= 1 or len(symbols) <= 1:
+        if initializer:
+            initializer(*initargs)
+        parts = [featurize_chunk(symbols, date_str)]
+    else:
+        chunk_size = max(1, math.ceil(len(symbols) / (workers * CHUNKS_PER_WORKER)))
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        pool = _get_pool(workers, initializer, initargs)
+        parts = list(pool.map(featurize_chunk, chunks, [date_str] * len(chunks)))
+    features = np.concatenate([part[0] for part in parts])
+    prev_closes = np.concatenate([part[1] for part in parts])
+    errors = {symbol: error for part in parts for symbol, error in part[2].items()}
+    timings['features'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    valid = np.flatnonzero(~np.isnan(features).any(axis=1) & ~np.isnan(prev_closes))
+    roc = predict(features[valid]) if len(valid) else np.empty(0)
+    timings['inference'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    key = RANK_KEYS[rank](roc)
+    k = min(top_k, len(valid))
+    if k == 0:
+        order = np.empty(0, dtype=int)
+    else:
+        # Partition for the k-th largest key, then sort only the rows above it.
+        # Ties at the boundary go to the earlier symbols, as in a stable full sort.
+        kth = key[np.argpartition(-key, k - 1)[k - 1]]
+        above = np.flatnonzero(key > kth)
+        top = np.concatenate([above, np.flatnonzero(key == kth)[:k - len(above)]])
+        order = top[np.lexsort((top, -key[top]))]
+    rows = []
+    for rank_position, index in enumerate(order, start=1):
+        position = valid[index]
+        rows.append({
+            'rank': rank_position,
+            'companySymbol': symbols[position],
+            'predictedRoc': float(roc[index]),
+            'prevClose': float(prev_closes[position]),
+            'estimatedPrice': float(prev_closes[position] * (1 + roc[index] / 100)),
+        })
+    timings['rank'] = time.perf_counter() - stage_start
+    timings['total'] = time.perf_counter() - started
+
+    return {'top': rows, 'scored': int(len(valid)), 'errors': errors, 'timings': timings}
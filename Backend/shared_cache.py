@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process (the dev server), so thread locks suffice
+    fcntl = None
+
+# Cache of memory-mapped array segments shared by every worker process on the host.
+#
+# gunicorn runs several workers side by side; anything a worker keeps in its own
+# heap is computed once per worker and held once per worker. A segment instead
+# is a handful of named arrays saved as plain .npy files, which each worker
+# memory-maps read-only, so all of them read the same page-cache pages.
+#
+# Layout: <dir>/index.json                 key -> {version, generation, arrays: [names]}
+#         <dir>/<key>.<generation>.<name>.npy
+#         <dir>/<key>.lock                 flock taken while the segment is computed
+#
+# A writer saves the arrays of a new generation first and then replaces
+# index.json by rename, so readers see either the old segment or the new one,
+# never a partial one. Files of the old generation are unlinked afterwards;
+# workers that still map them keep reading the old data until they remap.
+# get_or_build() holds the key's file lock while it computes, so when several
+# workers miss the same key at once, one computes and the others wait for it.
+
+
+def _safe_name(key):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock shared by threads and processes, held on `path` (created if missing)."""
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(path, threading.Lock())
+    # flock is per open file description, so threads of one process queue on the thread lock first
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SegmentCache:
+    """
+    Named groups of arrays shared across processes. `get` returns a dict of
+    read-only memory maps, or None when the key is missing or has a different
+    version.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, 'index.json')
+        self._index = (None, {})  # (index.json identity, parsed index)
+        self._maps = {}  # key -> (generation, arrays)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def _read_index(self):
+        try:
+            stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return {}
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self._index[0] == identity:
+            return self._index[1]
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        self._index = (identity, index)
+        return index
+
+    def _path(self, key, generation, name):
+        return os.path.join(self.directory, f"{_safe_name(key)}.{generation}.{name}.npy")
+
+    def _lookup(self, key, version):
+        entry = self._read_index().get(key)
+        if entry is None or entry['version'] != version:
+            return None
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached is not None and cached[0] == entry['generation']:
+                return cached[1]
+        try:
+            arrays = {name: np.load(self._path(key, entry['generation'], name), mmap_mode='r')
+                      for name in entry['arrays']}
+        except FileNotFoundError:
+            # Replaced between reading the index and opening the files
+            return None
+        except (ValueError, EOFError):
+            # A truncated file (the host died before the data reached disk); get_or_build rebuilds it
+            return None
+        with self._lock:
+            self._maps[key] = (entry['generation'], arrays)
+        return arrays
+
+    def get(self, key, version=None):
+        arrays = self._lookup(key, version)
+        with self._lock:
+            if arrays is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return arrays
+
+    def put(self, key, arrays, version=None):
+        """Publishes `arrays` ({name: ndarray}) as the segment for `key`."""
+        generation = f"{os.getpid()}-{threading.get_ident()}-{os.urandom(4).hex()}"
+        for name, array in arrays.items():
+            path = self._path(key, generation, name)
+            with open(f"{path}.tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(f"{path}.tmp", path)
+
+        with file_lock(os.path.join(self.directory, 'index.lock')):
+            index = dict(self._read_index())
+            old = index.get(key)
+            index[key] = {'version': version, 'generation': generation, 'arrays': sorted(arrays)}
+            tmp_path = f"{self._index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path)
+        if old is not None:
+            for name in old['arrays']:
+                try:
+                    os.remove(self._path(key, old['generation'], name))
+                except FileNotFoundError:
+                    pass
+
+    def get_or_build(self, key, build, version=None):
+        """
+        The segment for (key, version); on a miss `build()` computes the arrays
+        under the key's file lock, unless another process published them meanwhile.
+        """
+        arrays = self.get(key, version)
+        if arrays is not None:
+            return arrays
+        with file_lock(os.path.join(self.directory, f"{_safe_name(key)}.lock")):
+            arrays = self._lookup(key, version)
+            if arrays is not None:
+                return arrays
+            self.put(key, build(), version)
+            with self._lock:
+                self.builds += 1
+        return self._lookup(key, version)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'segments': len(self._read_index()),
+                'mapped': len(self._maps),
+                'hits': self.hits,
+                'misses': self.misses,
+                'builds': self.builds,
+                'hit_rate': self.hits / lookups if lookups else None,
+            }
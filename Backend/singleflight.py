@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+# Request coalescing ("single flight").
+# When several callers ask for the same key at the same time, only the first one
+# (the leader) runs the computation; the others wait for it and receive the same
+# result, or the same exception. Nothing is cached: once the call finishes, the
+# next request for that key starts a new computation.
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-based single flight for synchronous (WSGI) handlers."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Returns fn(*args, **kwargs), sharing one in-flight call per key."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single flight. The computation runs as its own task, so a client
+    that disconnects (cancelling its handler) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Awaits fn(*args, **kwargs) (a coroutine function), sharing one in-flight call per key."""
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._futures[key] = future
+            self.executed += 1
+            future.add_done_callback(lambda _f: self._futures.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def in_flight(self):
+        return len(self._futures)
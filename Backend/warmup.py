@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+import traceback
+
+# Startup state shared by the health endpoints and the lazy WSGI entry point.
+# Nothing heavy is imported here, so it is available before pandas, the
+# feature pipeline or the model have loaded.
+#
+# Warm-up runs a fixed list of named tasks in order (import the app, load the
+# model, open the data caches, ...). Liveness only needs the process to answer;
+# readiness needs every task to have finished.
+
+STARTED_AT = time.time()
+
+# 'background' runs warm-up in a daemon thread while requests are served,
+# 'sync' runs it before the module that starts it finishes importing (used when
+# preforking, so workers inherit a warm parent), 'off' skips it.
+WARMUP_MODE = os.environ.get('STOCKSIGHT_WARMUP', 'background')
+
+# Symbols whose feature tables are built or extended during warm-up, e.g. "RELIANCE,TCS"
+WARM_SYMBOLS = [s.strip().upper() for s in os.environ.get('STOCKSIGHT_WARM_SYMBOLS', '').split(',') if s.strip()]
+
+
+class Warmup:
+    def __init__(self):
+        self.tasks = []  # (name, fn)
+        self.status = {}  # name -> 'pending' | 'running' | 'done' | 'failed: ...'
+        self.seconds = {}
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def add(self, name, fn):
+        self.tasks.append((name, fn))
+        self.status[name] = 'pending'
+
+    def run(self):
+        """
+        Runs every task in order in the calling thread; a failed task does not stop
+        the rest. Tasks added by a running task (e.g. by the module it imports) run too.
+        """
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        index = 0
+        while index < len(self.tasks):
+            name, fn = self.tasks[index]
+            index += 1
+            self.status[name] = 'running'
+            start = time.perf_counter()
+            try:
+                fn()
+                self.status[name] = 'done'
+            except Exception as e:
+                self.status[name] = f'failed: {e}'
+                print(f"Warm-up task '{name}' failed: {e}")
+                traceback.print_exc()
+            self.seconds[name] = round(time.perf_counter() - start, 3)
+        self._done.set()
+
+    def start(self):
+        """Runs the tasks in a background daemon thread, unless a run is already under way."""
+        with self._lock:
+            if self._thread is None and not self._running:
+                self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+                self._thread.start()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    @property
+    def ready(self):
+        return self.finished and all(status == 'done' for status in self.status.values())
+
+    def report(self):
+        return {
+            'ready': self.ready,
+            'uptime_seconds': round(time.time() - STARTED_AT, 3),
+            'tasks': {name: {'status': self.status[name], 'seconds': self.seconds.get(name)} for name, _ in self.tasks},
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+
+from warmup import warmup, WARMUP_MODE
+
+# Lazy WSGI entry point: `gunicorn -c gunicorn.conf.py wsgi:application`.
+#
+# Importing this module only imports the standard library and warmup.py, so the
+# server binds and answers /healthz immediately. app.py (Flask, pandas, the
+# feature pipeline and the model) is imported by the first warm-up task, which
+# then queues app.py's own tasks (native booster, data caches). Requests other
+# than /healthz and /readyz wait for app.py to finish importing, up to
+# STOCKSIGHT_STARTUP_TIMEOUT seconds, and get a 503 if it takes longer.
+
+STARTUP_TIMEOUT = float(os.environ.get('STOCKSIGHT_STARTUP_TIMEOUT', '60'))
+
+_flask_app = None
+_app_imported = threading.Event()
+
+
+def import_app():
+    global _flask_app
+    try:
+        import app as flask_module
+        _flask_app = flask_module.app
+    finally:
+        _app_imported.set()
+
+
+def _json_response(start_response, status, body):
+    payload = json.dumps(body).encode()
+    start_response(status, [('Content-Type', 'application/json'), ('Content-Length', str(len(payload))),
+                            ('Access-Control-Allow-Origin', '*')])
+    return [payload]
+
+
+def application(environ, start_response):
+    if _flask_app is not None:
+        return _flask_app(environ, start_response)
+
+    path = environ.get('PATH_INFO', '')
+    if path == '/healthz':
+        return _json_response(start_response, '200 OK',
+                              {'status': 'ok', 'uptime_seconds': warmup.report()['uptime_seconds']})
+    if path == '/readyz':
+        return _json_response(start_response, '503 Service Unavailable', warmup.report())
+
+    _app_imported.wait(STARTUP_TIMEOUT)
+    if _flask_app is None:
+        return _json_response(start_response, '503 Service Unavailable',
+                              {'error': 'Server is still starting up.', 'warmup': warmup.report()})
+    return _flask_app(environ, start_response)
+
+
+warmup.add('app', import_app)
+if WARMUP_MODE == 'sync':
+    warmup.run()
+elif WARMUP_MODE != 'off':
+    warmup.start()
+else:
+    # No warm-up: import app.py eagerly, as `python app.py` does
+    import_app()
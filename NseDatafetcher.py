@@ -1,9 +1,12 @@
-import requests
+import argparse
 import json
 import os
-import time
 from datetime import datetime, timedelta
 
+from candle_store import CandleStore
+from groww_fetch import DEFAULT_BASE_URL, ChunkLedger, FetchEngine, GrowwClient, SyncCheckpoints, plan_chunks_ms
+from resample import DERIVED_INTERVALS, refresh_derived, session_day_end
+
 # === CONFIGURATION ===
 
 # Top 20 NSE companies
@@ -21,6 +24,10 @@ intervals = {
     "1d": 1440  # 1 day = 1440 minutes
 }
 
+# 5m, 15m and 1d are built locally from the 1m candles (resample.py) instead of
+# being downloaded again; only days older than the 1m history are fetched at 1d.
+# Pass --no-resample to download every interval from the API as before.
+
 # Max days to query per API request, per interval
 days_per_chunk = {
     "1m": 3,
@@ -33,71 +40,186 @@ days_per_chunk = {
 def get_start_date(interval_label):
     return datetime.now() - timedelta(days=3*365)
 
-end_date = datetime.now()
-
 # API endpoint base (symbol is added at the end)
-base_url = "https://groww.in/v1/api/charting_service/v4/chart/exchange/NSE/segment/CASH"
+base_url = DEFAULT_BASE_URL
 
-# Create the main output folder if it doesn't exist
+# Main output folder
 output_folder = "groww_3year_data"
-os.makedirs(output_folder, exist_ok=True)
 
-# === MAIN SCRIPT ===
+# Requests per second across all worker threads (replaces the fixed 1.5 s sleep)
+requests_per_second = 4.0
+
+
+def get_candle_store():
+    # Candles are kept in the columnar store (candle_store.py), one file pair per symbol/interval/month
+    return CandleStore(output_folder)
+
+
+def merge_into_series(symbol, label, candles, replace=False):
+    """Writes candles into a stored series, de-duplicated on timestamp (newer fetches win)."""
+    store = get_candle_store()
+    store.write(symbol, label, candles, replace=replace)
+    print(f"    Saved {len(candles)} records to {store.series_dir(symbol, label)} ({store.count(symbol, label)} total)")
+
 
-# Loop over each company
-for symbol in symbols:
-    print(f"\nFetching data for {symbol}")
+def oldest_timestamp_ms(symbol, label):
+    """Epoch ms of the oldest stored candle, or None."""
+    oldest = get_candle_store().oldest_timestamp(symbol, label)
+    return oldest * 1000 if oldest is not None else None
 
-    # Create a subfolder for each company
-    symbol_dir = os.path.join(output_folder, symbol)
-    os.makedirs(symbol_dir, exist_ok=True)
 
-    # Loop over each interval (e.g., 1m, 5m, 1d)
-    for label, interval in intervals.items():
-        print(f"  Timeframe: {label}")
+def newest_timestamp_ms(symbol, label):
+    """Epoch ms of the newest stored candle (Groww timestamps are in seconds), or None."""
+    newest = get_candle_store().newest_timestamp(symbol, label)
+    return newest * 1000 if newest is not None else None
 
-        all_candles = []
-        chunk_days = days_per_chunk[label]
-        current_end = end_date
-        custom_start_date = get_start_date(label)
 
-        no_data_count = 0
+# --- Checkpointed progress ---
+# Each completed chunk is appended to <SYMBOL>_<label>.partial.jsonl and recorded in
+# the chunk ledger. If a run is interrupted, the next run finds the series in
+# _checkpoints.json, replans the same chunk boundaries, skips completed chunks and
+# merges the partial file once the series finishes.
 
-        while current_end > custom_start_date:
-            current_start = current_end - timedelta(days=chunk_days)
-            start_ms = int(current_start.timestamp() * 1000)
-            end_ms = int(current_end.timestamp() * 1000)
+def partial_path(symbol, label):
+    return os.path.join(output_folder, symbol, f"{symbol}_{label}.partial.jsonl")
 
-            params = {
-                "startTimeInMillis": start_ms,
-                "endTimeInMillis": end_ms,
-                "intervalInMinutes": interval
-            }
 
+def append_partial(symbol, label, candles):
+    filename = partial_path(symbol, label)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "a", encoding="utf-8") as f:
+        f.write(json.dumps(candles) + "\n")
+
+
+def load_partial(symbol, label):
+    filename = partial_path(symbol, label)
+    if not os.path.exists(filename):
+        return []
+    candles = []
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
             try:
-                res = requests.get(f"{base_url}/{symbol}", params=params)
-                res.raise_for_status()
-                data = res.json()
-
-                if "candles" in data and data["candles"]:
-                    all_candles.extend(data["candles"])
-                    print(f"    {len(data['candles'])} records: {current_start.date()} to {current_end.date()}")
-                    no_data_count = 0
-                else:
-                    print(f"    No data available: {current_start.date()} to {current_end.date()}")
-                    no_data_count += 1
-                    if no_data_count >= 2:
-                        print("    Skipping to next interval due to consecutive data gaps.")
-                        break
-
-            except Exception as e:
-                print(f"    Error: {e}")
-
-            current_end = current_start
-            time.sleep(1.5)
-
-        filename = os.path.join(symbol_dir, f"{symbol}_{label}.json")
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(all_candles, f, indent=2)
-
-        print(f"    Saved {len(all_candles)} records to {filename}")
+                candles.extend(json.loads(line))
+            except ValueError:
+                continue # A torn line from an interrupted write; its chunk was not committed to the ledger
+    return candles
+
+
+def plan_series(checkpoints, symbol, label, sync, now_ms):
+    """Returns (mode, start_ms, end_ms) for a series, resuming an unfinished checkpoint."""
+    checkpoint = checkpoints.get(symbol, label)
+    if checkpoint:
+        return checkpoint['mode'], checkpoint['start_ms'], checkpoint['end_ms']
+
+    full_start_ms = int(get_start_date(label).timestamp() * 1000)
+    newest_ms = newest_timestamp_ms(symbol, label) if sync else None
+    if newest_ms is None:
+        mode, start_ms = 'full', full_start_ms
+    else:
+        # Refetch from the newest stored candle: it may have been saved while still forming
+        mode, start_ms = 'sync', max(newest_ms, full_start_ms)
+    checkpoints.set(symbol, label, mode=mode, start_ms=start_ms, end_ms=now_ms)
+    return mode, start_ms, now_ms
+
+
+# === MAIN SCRIPT ===
+
+def main():
+    global output_folder
+
+    parser = argparse.ArgumentParser(description="Download Groww candle history for the top NSE companies.")
+    parser.add_argument('--symbols', nargs='+', default=symbols)
+    parser.add_argument('--intervals', nargs='+', default=list(intervals), choices=list(intervals))
+    parser.add_argument('--output', default=output_folder)
+    parser.add_argument('--base-url', default=base_url, help="candle endpoint, e.g. a local stand-in server")
+    parser.add_argument('--rate', type=float, default=requests_per_second, help="requests per second, all threads")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--sync', action='store_true',
+                        help="only fetch candles newer than the newest one already stored")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="only re-fetch the chunks the ledger marks as failed")
+    parser.add_argument('--no-resample', action='store_true',
+                        help="download 5m/15m/1d from the API instead of building them from 1m")
+    args = parser.parse_args()
+
+    output_folder = args.output
+    os.makedirs(output_folder, exist_ok=True)
+    selected_intervals = {label: intervals[label] for label in args.intervals}
+
+    if args.no_resample:
+        download_rounds = [list(selected_intervals)]
+        derived_labels = []
+    else:
+        # 1m first: its oldest candle is where the 1d download stops
+        download_rounds = [["1m"]] + ([["1d"]] if "1d" in selected_intervals else [])
+        derived_labels = [label for label in selected_intervals if label in DERIVED_INTERVALS]
+    download_intervals = {label: intervals[label] for labels in download_rounds for label in labels}
+
+    ledger = ChunkLedger(os.path.join(output_folder, "_chunk_ledger.json"))
+    checkpoints = SyncCheckpoints(os.path.join(output_folder, "_checkpoints.json"))
+    # An incremental gap may start with weekend/holiday chunks, so never stop early while syncing
+    engine = FetchEngine(GrowwClient(args.base_url, rate=args.rate), ledger, max_workers=args.workers,
+                         max_empty=None if args.sync else 2)
+    # (symbol, label) -> (mode, planned chunks) of every series fetched in this run
+    plans = {}
+
+    def finish_series(symbol, label, _candles):
+        fetched = load_partial(symbol, label)
+        mode, chunks = plans[(symbol, label)]
+        # A full run replaces the stored series, but only when every chunk arrived:
+        # a failed chunk would otherwise delete the candles already stored for its range
+        failed = [chunk for chunk in chunks if ledger.status(symbol, label, *chunk) == 'failed']
+        replace = mode != 'sync' and not failed
+        merge_into_series(symbol, label, fetched, replace=replace)
+        if os.path.exists(partial_path(symbol, label)):
+            os.remove(partial_path(symbol, label))
+        checkpoints.clear(symbol, label)
+        # The series can no longer be resumed, so only failed chunks stay in the ledger; once the
+        # stored series is replaced, failures recorded by earlier runs no longer apply
+        ledger.forget(symbol, label, keep_failed=chunks if replace else None)
+        ledger.save()
+
+    try:
+        if not args.retry_failed:
+            for labels in download_rounds:
+                now_ms = int(datetime.now().timestamp() * 1000)
+                series = []
+                for symbol in args.symbols:
+                    for label in labels:
+                        end_ms = now_ms
+                        oldest_1m_ms = oldest_timestamp_ms(symbol, "1m") if label == "1d" and derived_labels else None
+                        if oldest_1m_ms is not None:
+                            # Through the first 1m day, which may be incomplete and is then not derived
+                            end_ms = min(now_ms, session_day_end(oldest_1m_ms // 1000) * 1000)
+                        mode, start_ms, end_ms = plan_series(checkpoints, symbol, label, args.sync, end_ms)
+                        chunks = plan_chunks_ms(start_ms, end_ms, days_per_chunk[label])
+                        if not chunks:
+                            checkpoints.clear(symbol, label)
+                            continue
+                        plans[(symbol, label)] = (mode, chunks)
+                        series.append((symbol, label, intervals[label], chunks))
+                total_chunks = sum(len(chunks) for *_, chunks in series)
+                print(f"Fetching {len(series)} series ({total_chunks} chunks) for {len(args.symbols)} symbols at {args.rate} requests/s")
+                engine.fetch_all(series, on_series_done=finish_series, skip_done=True, on_chunk=append_partial)
+
+        # Failed chunks are retried rather than silently dropped
+        recovered = engine.retry_failed(download_intervals)
+        for (symbol, label), candles in recovered.items():
+            merge_into_series(symbol, label, candles)
+
+        if derived_labels:
+            print(f"Resampling {', '.join(derived_labels)} from 1m candles")
+            for symbol in args.symbols:
+                refresh_derived(get_candle_store(), symbol, derived_labels)
+
+        still_failed = ledger.failed()
+        if still_failed:
+            print(f"{len(still_failed)} chunks still failed; run again with --retry-failed to fetch them.")
+        else:
+            print("All chunks fetched.")
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Wall time of the vectorized backtest, serial vs process pool, and a spot check
+of its estimated prices against single /predict calls.
+
+Runs fully offline on the synthetic fetcher in fake_market.py; every worker
+process gets its own temporary store.
+
+    python benchmarks/bench_backtest.py --symbols 20 --start 2022-01-01 --end 2024-12-31
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend'))
+
+from bench_batch_predict import SYMBOLS
+from fake_market import install_offline_stores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--start', default='2022-01-01')
+    parser.add_argument('--end', default='2024-12-31')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--check', type=int, default=20, help='days compared against /predict')
+    args = parser.parse_args()
+
+    from backtest import run_backtest
+
+    symbols = SYMBOLS[:args.symbols]
+    start = time.perf_counter()
+    results, summary = run_backtest(symbols, args.start, args.end, workers=1, initializer=install_offline_stores)
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled, _ = run_backtest(symbols, args.start, args.end, workers=args.workers, initializer=install_offline_stores)
+    pool_seconds = time.perf_counter() - start
+
+    print(summary.to_string(float_format=lambda v: f"{v:.3f}"))
+    print()
+    print(f"symbol-days:        {len(results)} ({len(symbols)} symbols, {args.start} to {args.end})")
+    print(f"serial:             {serial_seconds:8.2f} s  {len(results) / serial_seconds:10.0f} days/s")
+    print(f"process pool:       {pool_seconds:8.2f} s  {len(pooled) / pool_seconds:10.0f} days/s")
+    print(f"pool == serial:     {pooled['estimated_price'].equals(results['estimated_price'])}")
+
+    # Spot check against the serving path (same fake data in this process)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    client = app_module.app.test_client()
+    sample = results.sample(min(args.check, len(results)), random_state=0)
+    diffs = []
+    for row in sample.itertuples():
+        with contextlib.redirect_stdout(io.StringIO()):
+            body = client.post('/predict', json={'companySymbol': row.symbol,
+                                                 'predictionDate': row.date.strftime("%Y-%m-%d")}).get_json()
+        diffs.append(abs(body['estimatedPrice'] - row.estimated_price) / row.estimated_price)
+    print(f"max rel diff vs /predict: {max(diffs):.2e} over {len(diffs)} days")
+
+
+if __name__ == '__main__':
+    main()
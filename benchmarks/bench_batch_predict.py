@@ -0,0 +1,76 @@
+"""
+Throughput of /predict/batch against N single /predict calls.
+
+Runs fully offline: the OHLCV store is backed by a temporary SQLite file and the
+synthetic fetcher in fake_market.py. Both paths are measured with a warm store,
+so the numbers compare request, feature and model overhead rather than network.
+
+    python benchmarks/bench_batch_predict.py --symbols 20 --days 30
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend'))
+
+from fake_market import CountingFetcher, install_offline_stores
+
+# Top 20 NSE companies, as in NseDatafetcher.py
+SYMBOLS = [
+    "RELIANCE", "HDFCBANK", "ICICIBANK", "INFY", "TCS", "ITC", "LT", "AXISBANK",
+    "KOTAKBANK", "SBIN", "HCLTECH", "SUNPHARMA", "BAJFINANCE", "TITAN",
+    "HINDUNILVR", "M&M", "ASIANPAINT", "MARUTI", "NESTLEIND", "WIPRO"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20, help='number of symbols from the top-20 list')
+    parser.add_argument('--days', type=int, default=30, help='weekdays per symbol, ending at --end')
+    parser.add_argument('--end', default='2024-06-28')
+    args = parser.parse_args()
+
+    install_offline_stores(CountingFetcher())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    client = app_module.app.test_client()
+
+    symbols = SYMBOLS[:args.symbols]
+    dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range(end=args.end, periods=args.days)]
+    pairs = [(s, d) for s in symbols for d in dates]
+
+    # Warm the store so neither path pays for fetching
+    client.post('/predict/batch', json={'companySymbols': symbols, 'startDate': dates[0], 'endDate': dates[-1]})
+    for s in symbols:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.post('/predict', json={'companySymbol': s, 'predictionDate': dates[0]})
+
+    start = time.perf_counter()
+    single = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for s, d in pairs:
+            single[(s, d)] = client.post('/predict', json={'companySymbol': s, 'predictionDate': d}).get_json()
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = client.post('/predict/batch', json={'companySymbols': symbols, 'startDate': dates[0], 'endDate': dates[-1]}).get_json()
+    batch_seconds = time.perf_counter() - start
+
+    diffs = [abs(row['estimatedPrice'] - single[(row['companySymbol'], row['predictionDate'])]['estimatedPrice'])
+             for row in batch['predictions'] if 'estimatedPrice' in row]
+
+    print(f"pairs:              {len(pairs)} ({len(symbols)} symbols x {len(dates)} days)")
+    print(f"single /predict:    {single_seconds:8.3f} s  {len(pairs) / single_seconds:10.1f} pairs/s")
+    print(f"/predict/batch:     {batch_seconds:8.3f} s  {len(pairs) / batch_seconds:10.1f} pairs/s")
+    print(f"speedup:            {single_seconds / batch_seconds:8.1f} x")
+    print(f"max price diff:     {max(diffs) if diffs else float('nan'):.6f} over {len(diffs)} scored pairs")
+
+
+if __name__ == '__main__':
+    main()
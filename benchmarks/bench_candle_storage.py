@@ -0,0 +1,86 @@
+"""
+Write/load time of the columnar candle store against indent=2 JSON dumps.
+
+Generates synthetic one-minute candles, writes them both ways, then times a
+full load and a one-week slice read (the JSON path has to parse everything).
+
+    python benchmarks/bench_candle_storage.py --days 365
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candle_store import CandleStore, convert_json_tree
+from fake_market import synthetic_groww_candles
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=365, help="calendar days of 1-minute candles")
+    parser.add_argument('--end', default='2024-06-28')
+    args = parser.parse_args()
+
+    end_ms = int(np.datetime64(args.end, 'ms').astype(np.int64))
+    start_ms = end_ms - args.days * 86400 * 1000
+    # Newest-first, as the downloader used to concatenate its chunks
+    candles = synthetic_groww_candles("RELIANCE", start_ms, end_ms, 1)[::-1]
+
+    root = tempfile.mkdtemp(prefix='stocksight-candles-')
+    try:
+        json_dir = os.path.join(root, 'json', 'RELIANCE')
+        os.makedirs(json_dir)
+        json_path = os.path.join(json_dir, 'RELIANCE_1m.json')
+
+        def write_json():
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(candles, f, indent=2)
+
+        def load_json():
+            with open(json_path, encoding="utf-8") as f:
+                return json.load(f)
+
+        store = CandleStore(os.path.join(root, 'store'))
+        json_write, _ = timed(write_json)
+        store_write, _ = timed(lambda: store.write("RELIANCE", "1m", candles, replace=True))
+        json_load, loaded = timed(load_json)
+        store_load, (timestamps, values) = timed(lambda: store.read("RELIANCE", "1m"))
+        store_sum, _ = timed(lambda: float(values[3].sum()))
+
+        week_end = end_ms // 1000
+        week_start = week_end - 7 * 86400
+        json_slice, _ = timed(lambda: [c for c in load_json() if week_start <= c[0] < week_end])
+        store_slice, (slice_ts, _) = timed(lambda: store.read("RELIANCE", "1m", week_start, week_end))
+        convert, _ = timed(lambda: convert_json_tree(os.path.join(root, 'json'), os.path.join(root, 'converted'), log=lambda *a: None))
+
+        assert len(loaded) == len(timestamps) and np.all(np.diff(timestamps) > 0)
+        print(f"candles:              {len(candles)} ({args.days} days of 1m bars)")
+        print(f"size on disk:         json {dir_size(os.path.join(root, 'json')) / 1e6:8.1f} MB   store {dir_size(os.path.join(root, 'store')) / 1e6:8.1f} MB")
+        print(f"write:                json {json_write:8.3f} s    store {store_write:8.3f} s")
+        print(f"load all:             json {json_load:8.3f} s    store {store_load:8.3f} s  ({json_load / store_load:.0f}x)")
+        print(f"load + close.sum():   store {store_load + store_sum:8.3f} s")
+        print(f"one-week slice:       json {json_slice:8.3f} s    store {store_slice:8.4f} s  ({len(slice_ts)} candles)")
+        print(f"convert json -> store: {convert:7.3f} s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
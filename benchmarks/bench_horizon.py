@@ -0,0 +1,78 @@
+"""
+Latency of one /predict/horizon call versus N separate /predict calls for an
+N-day path, and a check that the first step of the path equals /predict.
+
+Runs offline on the synthetic fetcher in fake_market.py, with history cut off
+at --last-bar so the forecast days have not "traded" yet.
+
+    python benchmarks/bench_horizon.py --horizons 1 5 10 30 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend'))
+os.environ.setdefault('STOCKSIGHT_WARMUP', 'off')
+
+from fake_market import install_offline_stores, synthetic_ohlcv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbol', default='RELIANCE')
+    parser.add_argument('--last-bar', default='2024-05-31', help='last day with a real bar')
+    parser.add_argument('--horizons', type=int, nargs='+', default=[1, 5, 10, 30, 60])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    cutoff = pd.Timestamp(args.last_bar) + pd.Timedelta(days=1)
+
+    def fetcher(symbol, start, end):
+        return synthetic_ohlcv(symbol, start, min(pd.Timestamp(end), cutoff))
+
+    install_offline_stores(fetcher)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+        from forecast import next_trading_day
+    client = app_module.app.test_client()
+
+    first_date = next_trading_day(cutoff.date() - timedelta(days=1))
+    first = first_date.strftime("%Y-%m-%d")
+
+    def horizon_call(n):
+        return client.post('/predict/horizon', json={'companySymbol': args.symbol, 'predictionDate': first, 'horizon': n})
+
+    body = horizon_call(1).get_json()
+    single = client.post('/predict', json={'companySymbol': args.symbol, 'predictionDate': first}).get_json()
+    print(f"first step {body['path'][0]['estimatedPrice']:.6f} vs /predict {single['estimatedPrice']:.6f} "
+          f"(equal: {body['path'][0]['estimatedPrice'] == single['estimatedPrice']})")
+
+    print(f"\n{'horizon':>8} {'/predict/horizon':>17} {'N x /predict':>13}")
+    for n in args.horizons:
+        horizon_ms, separate_ms = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = horizon_call(n)
+            horizon_ms.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200 and len(response.get_json()['path']) == n
+
+            app_module.prediction_cache.clear()
+            day = first_date
+            start = time.perf_counter()
+            for _ in range(n):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    client.post('/predict', json={'companySymbol': args.symbol, 'predictionDate': day.strftime("%Y-%m-%d")})
+                day = next_trading_day(day)
+            separate_ms.append((time.perf_counter() - start) * 1000)
+        print(f"{n:8d} {statistics.median(horizon_ms):14.2f} ms {statistics.median(separate_ms):10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Model load time and per-call predict latency: the pickled sklearn model fed a
+one-row DataFrame (the old /predict path) against inference.py's compiled
+numpy trees and native booster fed plain arrays. That all three return
+identical predictions is tested in tests/test_inference.py.
+
+Load times are measured in fresh interpreter processes, so they include the
+imports each path needs.
+
+    python benchmarks/bench_inference.py --repeat 500
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend')
+sys.path.insert(0, BACKEND)
+
+from fake_market import synthetic_ohlcv
+
+MODEL_PATH = os.path.join(BACKEND, 'roc_model3.pkl')
+
+LOAD_SNIPPETS = {
+    'joblib.load (sklearn wrapper)': "import joblib; joblib.load({pkl!r})",
+    'compiled arrays (cached .npz)': "from inference import load_model; load_model({pkl!r}, {version!r}, {cache!r})",
+    'native booster (cached .txt)': "from inference import load_model; load_model({pkl!r}, {version!r}, {cache!r}).load_native()",
+}
+
+
+def time_load(snippet, runs):
+    code = f"import sys, time; sys.path.insert(0, {BACKEND!r}); t = time.perf_counter(); {snippet}; print(time.perf_counter() - t)"
+    return min(float(subprocess.check_output([sys.executable, '-c', code]).decode().split()[-1]) for _ in range(runs))
+
+
+def per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--load-runs', type=int, default=3)
+    args = parser.parse_args()
+
+    import joblib
+    from features import required_features, build_feature_rows
+    from inference import load_model
+    from ohlcv_store import normalize_ohlcv
+    from prediction_cache import model_version
+
+    version = model_version(MODEL_PATH)
+    cache_dir = tempfile.mkdtemp(prefix='stocksight-model-')
+    load_model(MODEL_PATH, version, cache_dir)  # writes the cache
+
+    print("Load time (fresh process, best of %d):" % args.load_runs)
+    for name, snippet in LOAD_SNIPPETS.items():
+        seconds = time_load(snippet.format(pkl=MODEL_PATH, version=version, cache=cache_dir), args.load_runs)
+        print(f"  {name:32} {seconds * 1000:9.1f} ms")
+
+    sklearn_model = joblib.load(MODEL_PATH)
+    model = load_model(MODEL_PATH, version, cache_dir)
+    compiled = model.compiled
+    native = model.load_native()
+
+    ohlcv = normalize_ohlcv(synthetic_ohlcv('RELIANCE.NS', '2019-01-01', '2024-12-31'))
+    X, _ = build_feature_rows(ohlcv, ohlcv.index[300:])
+    X = X[~np.isnan(X).any(axis=1)]
+
+    print("\nPer call:")
+    for rows in (1, 1000):
+        batch = np.ascontiguousarray(X[:rows])
+        repeat = max(3, int(args.repeat / rows ** 0.5))
+        results = {
+            'sklearn + DataFrame': per_call(lambda: sklearn_model.predict(pd.DataFrame(batch, columns=required_features)), repeat),
+            'compiled numpy': per_call(lambda: compiled.predict(batch), repeat),
+            'native booster': per_call(lambda: native.predict(batch), repeat),
+        }
+        for name, seconds in results.items():
+            print(f"  {rows:5d} rows  {name:22} {seconds * 1e6:10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Wall time of /screen over a synthetic universe (the top 20 plus generated
+names, up to Nifty 500 size), cold and warm, in-process versus on worker
+processes, with the per-stage split the endpoint reports. Also checks the
+ranking against a full sort and the top row against /predict.
+
+Runs offline: all processes share one temporary store backed by the synthetic
+fetcher in fake_market.py, with no bars after today.
+
+    python benchmarks/bench_screen.py --universe 500 --workers 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend'))
+os.environ.setdefault('STOCKSIGHT_WARMUP', 'off')
+
+from bench_batch_predict import SYMBOLS
+from fake_market import install_offline_stores, synthetic_ohlcv
+
+
+def fetch_until_today(symbol, start, end):
+    return synthetic_ohlcv(symbol, start, min(pd.Timestamp(end), pd.Timestamp(date.today())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--universe', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--top-k', type=int, default=20)
+    args = parser.parse_args()
+
+    universe = (SYMBOLS + [f"SYN{i:03d}" for i in range(args.universe)])[:args.universe]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+        import screener
+    client = app_module.app.test_client()
+
+    def run(workers, tmpdir):
+        initargs = (fetch_until_today, tmpdir)
+        install_offline_stores(*initargs)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = screener.screen(universe, prediction_date, app_module.model.predict, top_k=args.top_k,
+                                     workers=workers, initializer=install_offline_stores, initargs=initargs)
+        return time.perf_counter() - start, result
+
+    prediction_date = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+    print(f"{len(universe)} symbols, predictionDate {prediction_date}, {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<22} {'wall':>8} {'features':>9} {'inference':>10} {'rank':>8}")
+    for workers in (1, args.workers):
+        tmpdir = install_offline_stores(fetch_until_today)
+        for label in ('cold', 'warm'):
+            seconds, result = run(workers, tmpdir)
+            t = result['timings']
+            print(f"{f'{workers} worker(s), {label}':<22} {seconds:7.2f}s {t['features']:8.3f}s "
+                  f"{t['inference'] * 1000:8.2f}ms {t['rank'] * 1000:6.2f}ms")
+    print(f"\nscored {result['scored']}, errors {len(result['errors'])}")
+
+    # Ranking vs a full sort, and the top row vs the single-symbol route
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = screener.screen(universe, prediction_date, app_module.model.predict, top_k=len(universe), workers=1)
+    print(f"top {args.top_k} == full sort prefix: "
+          f"{[r['companySymbol'] for r in full['top'][:args.top_k]] == [r['companySymbol'] for r in result['top']]}")
+    best = result['top'][0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        single = client.post('/predict', json={'companySymbol': best['companySymbol'],
+                                               'predictionDate': prediction_date}).get_json()
+    print(f"top row {best['companySymbol']}: screen {best['estimatedPrice']:.6f} vs /predict {single['estimatedPrice']:.6f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Shared cross-worker data cache (shared_cache.py) with 1, 4 and 8 worker
+processes: how often a worker finds a symbol's history already fetched and
+computed by another, and what each worker holds in memory.
+
+Every worker is a separate process, as under gunicorn, calling
+app.prepare_features for the same symbols and dates in the same order (newest
+date first), released together: the cold start after market open, when all
+workers ask for the same popular names. Reported per run:
+  fetches    OHLCV downloads summed over workers (the fetcher sleeps
+             --fetch-latency seconds per call, standing in for yfinance)
+  builds     feature tables built, summed over workers
+  errors     prepare_features calls that returned no row
+  crashed    workers killed by a signal (results cover the others)
+  hit rate   share of calls served without the worker downloading:
+             1 - fetches / calls
+  PSS / USS  per-worker proportional / unique set size growth from after
+             `import app` to the end of the run (Linux smaps_rollup)
+
+With --baseline-ref the same workload also runs against that git revision of
+Backend/ (e.g. the commit before the shared cache) for comparison.
+
+    python benchmarks/bench_shared_cache.py --symbols 20 --baseline-ref HEAD~1
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+from bench_batch_predict import SYMBOLS
+
+WORKER = """
+import contextlib, io, json, os, sys, time
+from datetime import date, timedelta
+sys.path[:0] = [{backend!r}, {bench!r}]
+import pandas as pd
+import fake_market
+import feature_store
+
+def memory():
+    with open('/proc/self/smaps_rollup') as f:
+        fields = dict((line.split()[0].rstrip(':'), int(line.split()[1])) for line in f if line.split()[0].endswith(':'))
+    return {{'pss': fields['Pss'], 'uss': fields['Private_Clean'] + fields['Private_Dirty']}}
+
+def fetcher(symbol, start, end):
+    time.sleep({latency!r})
+    return fake_market.synthetic_ohlcv(symbol, start, min(pd.Timestamp(end), pd.Timestamp(date.today())))
+
+fake_market.install_offline_stores(fetcher, {store_dir!r})
+builds = []
+original_build = feature_store.FeatureStore._build
+def counting_build(self, *args):
+    builds.append(args[0])
+    return original_build(self, *args)
+feature_store.FeatureStore._build = counting_build
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+from ohlcv_store import get_store
+before = memory()
+open(os.path.join({store_dir!r}, f"ready.{{os.getpid()}}"), 'w').close()
+while not os.path.exists({go!r}):
+    time.sleep(0.005)
+started = time.perf_counter()
+latencies, errors = [], 0
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    for date_str in {dates!r}:
+        for symbol in {symbols!r}:
+            t0 = time.perf_counter()
+            errors += app.prepare_features(symbol, date_str) is None
+            latencies.append(time.perf_counter() - t0)
+after = memory()
+segments = get_store().segments.stats() if getattr(get_store(), 'segments', None) is not None else None
+print(json.dumps({{'seconds': time.perf_counter() - started, 'fetches': get_store().fetch_count, 'builds': len(builds), 'errors': errors,
+                  'latencies': latencies, 'before': before, 'after': after, 'segments': segments}}))
+"""
+
+
+def export_backend(ref, target):
+    """Writes Backend/ as of git revision `ref` into `target`; returns the Backend path."""
+    archive = subprocess.run(['git', '-C', ROOT, 'archive', ref, 'Backend'], check=True, capture_output=True).stdout
+    subprocess.run(['tar', '-x', '-C', target], input=archive, check=True)
+    # The model is not needed from git history; use the working tree's
+    return os.path.join(target, 'Backend')
+
+
+def run(backend, workers, symbols, dates, latency, engine, tmpdir):
+    store_dir = tempfile.mkdtemp(dir=tmpdir)
+    go = os.path.join(store_dir, 'go')
+    code = WORKER.format(backend=backend, bench=BENCH_DIR, latency=latency, store_dir=store_dir, go=go,
+                         dates=dates, symbols=symbols)
+    env = dict(os.environ, STOCKSIGHT_WARMUP='off', STOCKSIGHT_FEATURE_ENGINE=engine)
+    procs = [subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              env=env, cwd=backend)
+             for _ in range(workers)]
+    # Release the workers together once every one has imported the app
+    while sum(name.startswith('ready.') for name in os.listdir(store_dir)) < workers:
+        if any(p.poll() is not None for p in procs):
+            raise RuntimeError(f"a worker exited before it was ready:\n{procs[0].communicate()[1].decode()[-2000:]}")
+        time.sleep(0.05)
+    open(go, 'w').close()
+    outputs = [p.communicate() for p in procs]
+    results, crashed = [], 0
+    for p, (stdout, stderr) in zip(procs, outputs):
+        if p.returncode < 0:
+            # Killed by a signal, e.g. SIGBUS reading a mapped file another process truncated
+            crashed += 1
+        elif p.returncode:
+            raise RuntimeError(f"a worker failed:\n{stderr.decode()[-2000:]}")
+        else:
+            results.append(json.loads(stdout.decode().strip().splitlines()[-1]))
+    segment_bytes = sum(os.path.getsize(os.path.join(store_dir, 'segments', name))
+                        for name in os.listdir(os.path.join(store_dir, 'segments'))
+                        if name.endswith('.npy')) if os.path.isdir(os.path.join(store_dir, 'segments')) else 0
+    return results, crashed, segment_bytes
+
+
+def report(label, workers, calls, results, crashed, segment_bytes):
+    import numpy as np
+
+    fetches = sum(r['fetches'] for r in results)
+    builds = sum(r['builds'] for r in results)
+    errors = sum(r['errors'] for r in results)
+    latencies = np.concatenate([r['latencies'] for r in results]) * 1000
+    pss = np.mean([r['after']['pss'] - r['before']['pss'] for r in results]) / 1024
+    uss = np.mean([r['after']['uss'] - r['before']['uss'] for r in results]) / 1024
+    hit_rate = 1 - fetches / (len(results) * calls)
+    wall = max(r['seconds'] for r in results)
+    print(f"  {label:<9} {workers:2d}  {fetches:7d}  {builds:6d}  {errors:6d}  {crashed:7d}  {hit_rate:8.1%}  {wall:7.2f}  "
+          f"{np.percentile(latencies, 50):7.2f}  {np.percentile(latencies, 99):8.1f}  {pss:7.1f}  {uss:7.1f}  "
+          f"{segment_bytes / 1e6:7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--dates', type=int, default=3, help="completed trading days requested per symbol")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--fetch-latency', type=float, default=0.2)
+    parser.add_argument('--engine', default='streaming', choices=['streaming', 'ta'])
+    parser.add_argument('--baseline-ref', help="git revision to compare against")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    symbols = SYMBOLS[:args.symbols]
+    days = pd.bdate_range(end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1), periods=args.dates)
+    dates = [day.strftime("%Y-%m-%d") for day in reversed(days)]
+
+    tmpdir = tempfile.mkdtemp(prefix='stocksight-shared-')
+    try:
+        variants = [('shared', os.path.join(ROOT, 'Backend'))]
+        if args.baseline_ref:
+            baseline = export_backend(args.baseline_ref, tempfile.mkdtemp(dir=tmpdir))
+            shutil.copy(os.path.join(ROOT, 'Backend', 'roc_model3.pkl'), baseline)
+            variants.insert(0, (args.baseline_ref[:9], baseline))
+
+        print(f"{len(symbols)} symbols x {len(dates)} dates per worker, engine={args.engine}, "
+              f"fetch latency {args.fetch_latency * 1000:.0f} ms")
+        print(f"  {'variant':<9} {'wk':>2}  {'fetches':>7}  {'builds':>6}  {'errors':>6}  {'crashed':>7}  {'hit rate':>8}  {'wall s':>7}  "
+              f"{'p50 ms':>7}  {'p99 ms':>8}  {'PSS MB':>7}  {'USS MB':>7}  {'seg MB':>7}")
+        for workers in args.workers:
+            for label, backend in variants:
+                results, crashed, segment_bytes = run(backend, workers, symbols, dates, args.fetch_latency,
+                                                      args.engine, tmpdir)
+                report(label, workers, len(symbols) * len(dates), results, crashed, segment_bytes)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Time to first response of a fresh server process: eager `import app` versus the
+lazy wsgi.py entry point with background warm-up, with a cold and a warm model
+cache.
+
+For each variant a server subprocess is started and polled; reported are the
+seconds from spawn to the first HTTP answer (GET /healthz), to the first
+successful POST /predict and to GET /readyz returning 200.
+
+Runs offline: the OHLCV store and feature table for the requested symbol and
+date are built beforehand from the synthetic fetcher in fake_market.py, in a
+temporary STOCKSIGHT_CACHE_DIR the server then reads.
+
+    python benchmarks/bench_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'Backend')
+
+SERVER = """
+import sys
+sys.path.insert(0, {backend!r})
+from werkzeug.serving import run_simple
+if {lazy!r}:
+    from wsgi import application
+else:
+    from app import app as application
+run_simple('127.0.0.1', {port}, application, threaded=True)
+"""
+
+
+def prepare_cache(cache_dir, symbol, date_str):
+    """Builds the OHLCV store and feature table the server will read, without network access."""
+    code = f"""
+import sys
+sys.path[:0] = [{BACKEND_DIR!r}, {BENCH_DIR!r}]
+import ohlcv_store
+from feature_store import get_feature_store
+from features import PREV_CLOSE_LOOKBACK_DAYS
+from fake_market import synthetic_ohlcv
+from datetime import datetime, timedelta
+ohlcv_store.set_store(ohlcv_store.OHLCVStore(fetcher=synthetic_ohlcv))
+get_feature_store().get_features({symbol!r}, {date_str!r})
+day = datetime.strptime({date_str!r}, "%Y-%m-%d")
+ohlcv_store.get_ohlcv({symbol!r}, day - timedelta(days=PREV_CLOSE_LOOKBACK_DAYS), day)
+"""
+    subprocess.run([sys.executable, '-c', code], check=True, env=dict(os.environ, STOCKSIGHT_CACHE_DIR=cache_dir))
+
+
+def request(port, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(f'http://127.0.0.1:{port}{path}', data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def measure(lazy, cache_dir, port, symbol, date_str):
+    env = dict(os.environ, STOCKSIGHT_CACHE_DIR=cache_dir, STOCKSIGHT_WARMUP='background')
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-c', SERVER.format(backend=BACKEND_DIR, lazy=lazy, port=port)],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        first_response = first_predict = ready = None
+        while ready is None and time.perf_counter() - start < 120:
+            try:
+                if first_response is None:
+                    request(port, 'GET', '/healthz')
+                    first_response = time.perf_counter() - start
+                if first_predict is None:
+                    if request(port, 'POST', '/predict', {'companySymbol': symbol, 'predictionDate': date_str}) != 200:
+                        raise RuntimeError("/predict failed")
+                    first_predict = time.perf_counter() - start
+                if request(port, 'GET', '/readyz') == 200:
+                    ready = time.perf_counter() - start
+                else:
+                    time.sleep(0.02)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        return first_response, first_predict, ready
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--symbol', default='RELIANCE')
+    parser.add_argument('--port', type=int, default=5077)
+    args = parser.parse_args()
+
+    day = date.today() - timedelta(days=30)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    date_str = day.strftime("%Y-%m-%d")
+
+    cache_dir = tempfile.mkdtemp(prefix='stocksight-startup-')
+    model_dir = os.path.join(cache_dir, 'model')
+    try:
+        prepare_cache(cache_dir, f"{args.symbol}.NS", date_str)
+        print(f"{'entry point':<14} {'model cache':<12} {'first response':>15} {'first /predict':>15} {'ready':>8}")
+        for lazy in (False, True):
+            for cold in (True, False):
+                timings = []
+                for _ in range(args.runs):
+                    if cold:
+                        shutil.rmtree(model_dir, ignore_errors=True)
+                    timings.append(measure(lazy, cache_dir, args.port, args.symbol, date_str))
+                # Median run by time to first /predict
+                first_response, first_predict, ready = sorted(timings, key=lambda t: t[1])[len(timings) // 2]
+                print(f"{'wsgi (lazy)' if lazy else 'app (eager)':<14} {'cold' if cold else 'warm':<12} "
+                      f"{first_response:14.2f}s {first_predict:14.2f}s {ready:7.2f}s")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Checks and times the out-of-core training pipeline (Backend/feature_pipeline.py).
+
+1. Parity: dataset rows equal the serving batch path (features.build_feature_rows,
+   'ta' based) within rtol, and the target equals the next day's return.
+2. 1m source: a dataset built from minute candles equals one built from the
+   daily candles of the same sessions.
+3. Memory: peak RSS of building one symbol stays flat as history grows
+   (Linux /proc high-water mark, reset after imports).
+4. Throughput: rows/s serial and on the process pool.
+
+Runs offline on a synthetic candle archive written with candle_store.py.
+
+    python benchmarks/check_feature_pipeline.py --symbols 20 --years 3
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'Backend')]
+
+from bench_batch_predict import SYMBOLS
+from candle_store import CandleStore
+from fake_market import synthetic_groww_candles
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def write_archive(root, symbols, years, minutes=False):
+    """Daily candles (and with minutes=True the 1m candles they aggregate) for `years` up to mid-2025."""
+    store = CandleStore(root)
+    end = datetime(2025, 6, 30, tzinfo=IST)
+    end_ms = int(end.timestamp() * 1000)
+    start_ms = int((end - timedelta(days=int(365 * years))).timestamp() * 1000)
+    for symbol in symbols:
+        store.write(symbol, '1d', synthetic_groww_candles(symbol, start_ms, end_ms, 1440))
+        if minutes:
+            store.write(symbol, '1m', synthetic_groww_candles(symbol, start_ms, end_ms, 1))
+    return store
+
+
+def check_parity(archive, output, symbol):
+    from features import build_feature_rows, required_features
+    from feature_pipeline import build_symbol, load_symbol
+
+    build_symbol(archive, output, symbol)
+    dates, features, target = load_symbol(output, symbol)
+
+    ts, values = CandleStore(archive).read(symbol, '1d')
+    index = pd.to_datetime((ts + 19800) // 86400, unit='D')
+    ohlcv = pd.DataFrame(values.T, index=index, columns=['open', 'high', 'low', 'close', 'volume'])
+    # Serving rows for the same dates
+    reference, _ = build_feature_rows(ohlcv, pd.DatetimeIndex(dates))
+    ok = np.isclose(features, reference, rtol=1e-3, atol=1e-6)
+    worst = {name: float(np.max(np.abs(features[:, i] - reference[:, i])
+                                / np.maximum(np.abs(reference[:, i]), 1e-12)))
+             for i, name in enumerate(required_features)}
+
+    close = ohlcv['close']
+    expected = (close.shift(-1) / close - 1) * 100
+    target_ok = np.allclose(np.asarray(target), expected.loc[pd.DatetimeIndex(dates)].to_numpy())
+    print(f"  {symbol}: {len(dates)} rows, features within rtol 1e-3: {bool(ok.all())} "
+          f"(worst {max(worst, key=worst.get)} {max(worst.values()):.1e}), target equal: {target_ok}")
+    return bool(ok.all()) and target_ok
+
+
+def check_minute_source(archive, output, symbol):
+    from feature_pipeline import build_symbol, load_symbol
+
+    build_symbol(archive, os.path.join(output, '1d'), symbol, source='1d')
+    build_symbol(archive, os.path.join(output, '1m'), symbol, source='1m')
+    daily = load_symbol(os.path.join(output, '1d'), symbol)
+    minute = load_symbol(os.path.join(output, '1m'), symbol)
+    equal = len(daily[0]) > 0 and np.array_equal(daily[0], minute[0]) \
+        and np.allclose(daily[1], minute[1], rtol=1e-9) and np.allclose(daily[2], minute[2], rtol=1e-9)
+    print(f"  {symbol}: {len(minute[0])} rows from {CandleStore(archive).count(symbol, '1m')} 1m candles, "
+          f"equal to the rows built from 1d: {equal}")
+    return equal
+
+
+PEAK_RSS = """
+import sys
+sys.path[:0] = [{root!r}, {backend!r}]
+import feature_pipeline
+
+def status(field):
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field))
+
+# Reset the high-water mark once imports are done (Linux), so the peak is the build's own
+with open('/proc/self/clear_refs', 'w') as f:
+    f.write('5')
+base = status('VmRSS:')
+feature_pipeline.build_symbol({archive!r}, {output!r}, {symbol!r})
+print(base, status('VmHWM:'))
+"""
+
+
+def peak_rss_mb(archive, output, symbol):
+    """(RSS after imports, peak RSS while building) in MB, measured in a fresh process."""
+    code = PEAK_RSS.format(root=ROOT, backend=os.path.join(ROOT, 'Backend'), archive=archive, output=output, symbol=symbol)
+    base, peak = map(int, subprocess.run([sys.executable, '-c', code], check=True, capture_output=True,
+                                         text=True).stdout.split())
+    return base / 1024, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    from feature_pipeline import build_dataset, load_dataset
+
+    tmpdir = tempfile.mkdtemp(prefix='stocksight-pipeline-')
+    try:
+        archive = os.path.join(tmpdir, 'archive')
+        symbols = SYMBOLS[:args.symbols]
+        write_archive(archive, symbols, args.years)
+
+        print("1. Parity with the serving feature path")
+        ok = check_parity(archive, os.path.join(tmpdir, 'parity'), symbols[0])
+        print("\n2. Minute candles as the source")
+        minute_archive = os.path.join(tmpdir, 'archive_1m')
+        write_archive(minute_archive, symbols[:1], 1, minutes=True)
+        ok &= check_minute_source(minute_archive, os.path.join(tmpdir, 'minute'), symbols[0])
+
+        print("\n3. Peak RSS building one symbol")
+        for years in (2, 10, 40):
+            long_archive = os.path.join(tmpdir, f'archive_{years}')
+            write_archive(long_archive, ['LONG'], years)
+            base, peak = peak_rss_mb(long_archive, os.path.join(tmpdir, f'out_{years}'), 'LONG')
+            rows = len(load_dataset(os.path.join(tmpdir, f'out_{years}'))[1])
+            print(f"  {years:3d} years ({rows:6d} rows): {peak:6.1f} MB peak, {peak - base:5.1f} MB above import")
+
+        print(f"\n4. {len(symbols)} symbols, {args.years:g} years")
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            rows = build_dataset(archive, os.path.join(tmpdir, f'dataset_{workers}'), symbols, workers=workers)
+            seconds = time.perf_counter() - start
+            label = 'serial' if workers == 1 else f"pool ({workers or os.cpu_count()} workers)"
+            print(f"  {label:<18} {sum(rows.values()):7d} rows in {seconds:5.2f} s  {sum(rows.values()) / seconds:8.0f} rows/s")
+        X, y, dates, row_symbols = load_dataset(os.path.join(tmpdir, 'dataset_1'))
+        print(f"  load_dataset: X {X.shape}, y {y.shape}, {len(set(row_symbols))} symbols")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("\nOK" if ok else "\nMISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Parity check: streaming prepare_features() against the 'ta' reference path.
+
+Walks consecutive weekdays for each symbol so the streaming engine is resumed
+from its persisted state one bar at a time, and compares every feature with
+prepare_features_ta() for the same date. Exits non-zero if any feature differs
+by more than --rtol (relative to max(|reference|, 1)).
+
+Lags, SMAs, Bollinger bands and OBV match to float precision. EMA-based
+features (MACD, signal, RSI, ATR) differ around 1e-4 because the reference
+path reseeds its EMAs at the start of each request's 250-day window, while the
+resumed engine carries a longer, already converged history.
+
+    python benchmarks/check_indicator_parity.py --symbols 5 --days 120
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend'))
+
+from fake_market import install_offline_stores
+from bench_batch_predict import SYMBOLS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5)
+    parser.add_argument('--days', type=int, default=120)
+    parser.add_argument('--end', default='2024-06-28')
+    parser.add_argument('--rtol', type=float, default=1e-3)
+    args = parser.parse_args()
+
+    install_offline_stores()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+
+    dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range(end=args.end, periods=args.days)]
+    worst = pd.Series(0.0, index=app_module.required_features)
+    compared = 0
+    for symbol in SYMBOLS[:args.symbols]:
+        for date_str in dates:
+            with contextlib.redirect_stdout(io.StringIO()):
+                streaming = app_module.prepare_features(symbol, date_str)
+                reference = app_module.prepare_features_ta(symbol, date_str)
+            if streaming is None or reference is None:
+                if (streaming is None) != (reference is None):
+                    print(f"{symbol} {date_str}: only one path produced features")
+                    return 1
+                continue
+            diff = (streaming.iloc[0] - reference.iloc[0]).abs() / reference.iloc[0].abs().clip(lower=1)
+            worst = np.maximum(worst, diff)
+            compared += 1
+
+    print(f"compared {compared} (symbol, date) rows; max relative difference per feature:")
+    print(worst.to_string())
+    if (worst > args.rtol).any():
+        print(f"FAILED: features above rtol={args.rtol}: {list(worst[worst > args.rtol].index)}")
+        return 1
+    print(f"OK: all features within rtol={args.rtol}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Checks resample.py against recorded Groww aggregates and measures what
+resampling saves the downloader.
+
+1. Recorded API: for every fixture in fixtures/groww (groww_fixtures.py), the
+   5m/15m/1d candles resampled from its 1m candles must have the same buckets
+   as the recorded API candles and the same OHLCV values. Skipped, with a
+   note, when nothing has been recorded yet.
+2. Gaps: with random minutes missing (halts, thin trading) and a history that
+   starts mid-session, resample() must equal a pandas groupby reference.
+3. Downloader: NseDatafetcher.py run against the fake server with and without
+   --no-resample; API requests, bytes stored and wall time for each.
+
+    python benchmarks/check_resample_parity.py --symbols 3
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from candle_store import CandleStore, to_arrays
+from fake_groww_server import start_server
+from fake_market import synthetic_minute_candles
+from groww_fixtures import IST, compare_resampled, fixture_paths, load_fixture
+from resample import DERIVED_INTERVALS, SESSION_OPEN_MINUTE, resample
+
+
+def check_recorded():
+    """None when no fixture is recorded, else whether every fixture matched."""
+    paths = fixture_paths()
+    if not paths:
+        return None
+    ok = True
+    for path in paths:
+        fixture = load_fixture(path)
+        for label, report in compare_resampled(fixture).items():
+            equal = not report['missing'] and not report['extra'] and max(report['max_diff'].values()) < 0.005
+            ok &= equal
+            diffs = ", ".join(f"{column} {value:g}" for column, value in report['max_diff'].items())
+            print(f"  {fixture['symbol']} {label:>3}: {report['derived']:5d} derived / {report['api']:5d} API buckets, "
+                  f"{len(report['missing'])} missing, {len(report['extra'])} extra; max diff {diffs}: "
+                  f"{'equal' if equal else 'MISMATCH'}")
+    return ok
+
+
+def pandas_reference(timestamps, values, interval_minutes):
+    local = pd.to_datetime(timestamps, unit='s') + pd.Timedelta(hours=5, minutes=30)
+    minute_of_session = local.hour * 60 + local.minute - SESSION_OPEN_MINUTE
+    frame = pd.DataFrame(values.T, columns=['open', 'high', 'low', 'close', 'volume'])
+    frame = frame[(minute_of_session >= 0) & (minute_of_session < 375)]
+    local, minute_of_session = local[frame.index], minute_of_session[frame.index]
+    width = 375 if interval_minutes >= 1440 else interval_minutes
+    bucket = local.normalize() + pd.to_timedelta(SESSION_OPEN_MINUTE + (minute_of_session // width) * width, unit='min')
+    grouped = frame.groupby(np.asarray(bucket)).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    ts = ((grouped.index - pd.Timedelta(hours=5, minutes=30)) - pd.Timestamp('1970-01-01')) // pd.Timedelta(seconds=1)
+    return np.asarray(ts, dtype=np.int64), grouped.to_numpy().T
+
+
+def check_gaps(symbol):
+    end_ms = int(datetime(2024, 7, 3, 16, 0, tzinfo=IST).timestamp() * 1000)
+    # Starts at 11:02 IST, mid-session and mid-bucket
+    start_ms = int(datetime(2024, 5, 27, 11, 2, tzinfo=IST).timestamp() * 1000)
+    candles = synthetic_minute_candles(symbol, start_ms, end_ms)
+    keep = np.random.default_rng(0).random(len(candles)) > 0.2
+    ts, values = to_arrays(candles[keep])
+    ok = True
+    for label, interval in DERIVED_INTERVALS.items():
+        got_ts, got_values = resample(ts, values, interval)
+        ref_ts, ref_values = pandas_reference(ts, values, interval)
+        equal = np.array_equal(got_ts, ref_ts) and np.allclose(got_values, ref_values, rtol=0, atol=0)
+        ok &= equal
+        print(f"  {symbol} {label:>3}: {len(got_ts):5d} buckets from {len(ts)} 1m candles (20% missing), equal to pandas: {equal}")
+    return ok
+
+
+def store_bytes(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files if f.endswith('.npy'))
+
+
+def run_downloader(base_url, output, symbols, extra):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, 'NseDatafetcher.py'), '--base-url', base_url, '--output', output,
+                    '--rate', '1000', '--symbols', *symbols, *extra], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=3)
+    args = parser.parse_args()
+    symbols = ["RELIANCE", "TCS", "INFY", "HDFCBANK", "SBIN"][:args.symbols]
+
+    server, base_url = start_server(history_days={1: 120, 5: 400, 15: 800, 1440: 5000})
+
+    print("1. Resampled vs recorded Groww API candles")
+    recorded = check_recorded()
+    if recorded is None:
+        print("  SKIPPED: no fixtures in benchmarks/fixtures/groww; record them with "
+              "`python benchmarks/groww_fixtures.py` (needs network access to Groww)")
+    ok = recorded is not False
+    print("\n2. Resampled vs pandas reference, with gaps")
+    ok &= all([check_gaps(symbol) for symbol in symbols])
+
+    print("\n3. Downloader, 3 years of history")
+    tmpdir = tempfile.mkdtemp(prefix='stocksight-resample-')
+    try:
+        for label, extra in (("API for every interval", ['--no-resample']), ("1m + old 1d, resampled", [])):
+            output = os.path.join(tmpdir, label.split()[0])
+            before = server.request_count
+            seconds = run_downloader(base_url, output, symbols, extra)
+            print(f"  {label:<24} {server.request_count - before:6d} requests  "
+                  f"{store_bytes(output) / 1e6:7.1f} MB  {seconds:6.1f} s")
+
+        store = CandleStore(os.path.join(tmpdir, '1m'))
+        for symbol in symbols:
+            ts, values = store.read(symbol, '1m')
+            for label, interval in DERIVED_INTERVALS.items():
+                stored_ts, stored_values = store.read(symbol, label, int(ts[0]))
+                # A first bucket the 1m history only partly covers is not derived; the rest must match
+                derived_ts, derived_values = resample(ts, values, interval)
+                if derived_ts[0] != ts[0]:
+                    derived_ts, derived_values = derived_ts[1:], derived_values[:, 1:]
+                equal = np.array_equal(stored_ts[-len(derived_ts):], derived_ts) and \
+                    np.array_equal(stored_values[:, -len(derived_ts):], derived_values)
+                ok &= equal
+            daily = store.read(symbol, '1d')[0]
+            print(f"  {symbol}: 1d series has {len(daily)} days, {len(np.unique(daily))} unique, "
+                  f"{int(np.sum(np.diff(daily) > 5 * 86400))} gaps over 5 days")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        server.shutdown()
+
+    print("\nOK" if ok else "\nMISMATCH")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
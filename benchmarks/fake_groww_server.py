@@ -0,0 +1,110 @@
+"""
+Local stand-in for the Groww charting API.
+
+Serves GET /<SYMBOL>?startTimeInMillis=..&endTimeInMillis=..&intervalInMinutes=..
+with deterministic synthetic candles, and can inject failures and rate limiting
+so the downloader's retry and ledger logic can be exercised offline.
+
+    python benchmarks/fake_groww_server.py --port 8765 --fail-rate 0.1
+    python NseDatafetcher.py --base-url http://127.0.0.1:8765 --rate 50
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from fake_market import synthetic_groww_candles
+
+# Data is served for the last `history_days` only, like Groww's limited intraday history
+DEFAULT_HISTORY_DAYS = {1: 120, 5: 400, 15: 800, 1440: 5000}
+
+
+class FakeGrowwServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fail_rate=0.0, max_rate=None, latency=0.0, history_days=None):
+        super().__init__(address, FakeGrowwHandler)
+        self.fail_rate = fail_rate
+        self.max_rate = max_rate
+        self.latency = latency
+        self.history_days = history_days or DEFAULT_HISTORY_DAYS
+        self.request_count = 0
+        self.failures = 0
+        self.throttled = 0
+        self._recent = []
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """Returns None, or the error status to answer with for this request."""
+        with self._lock:
+            self.request_count += 1
+            now = time.monotonic()
+            if self.max_rate:
+                self._recent = [t for t in self._recent if now - t < 1.0]
+                if len(self._recent) >= self.max_rate:
+                    self.throttled += 1
+                    return 429
+                self._recent.append(now)
+            if random.random() < self.fail_rate:
+                self.failures += 1
+                return 503
+        return None
+
+
+class FakeGrowwHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = self.server.admit()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if status is not None:
+            self.send_error(status)
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            symbol = unquote(url.path.rstrip('/').rsplit('/', 1)[-1])
+            start_ms = int(query['startTimeInMillis'][0])
+            end_ms = int(query['endTimeInMillis'][0])
+            interval = int(query['intervalInMinutes'][0])
+        except (KeyError, ValueError, IndexError):
+            self.send_error(400)
+            return
+
+        history_ms = self.server.history_days.get(interval, 5000) * 86400 * 1000
+        start_ms = max(start_ms, int(time.time() * 1000) - history_ms)
+        candles = synthetic_groww_candles(symbol, start_ms, end_ms, interval) if start_ms < end_ms else []
+
+        body = json.dumps({"candles": candles}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, **kwargs):
+    """Starts a FakeGrowwServer on a background thread; returns (server, base_url)."""
+    server = FakeGrowwServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--max-rate', type=float, default=None, help="requests/s above which 429 is returned")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server = FakeGrowwServer(("127.0.0.1", args.port), fail_rate=args.fail_rate,
+                             max_rate=args.max_rate, latency=args.latency)
+    print(f"Fake Groww API on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Offline stand-in for yfinance used by the benchmarks.
+# Prices are a deterministic function of (symbol, day), so overlapping
+# fetches always agree and results are reproducible across runs.
+
+EPOCH = pd.Timestamp('2015-01-01')
+
+
+def _noise(offsets, seed):
+    # Counter-based hash in [-0.5, 0.5) so each bar depends only on (symbol, day)
+    noise = np.sin((offsets + seed % 997) * 12.9898) * 43758.5453
+    return noise - np.floor(noise) - 0.5
+
+
+def synthetic_ohlcv(symbol, start, end):
+    """Daily weekday bars for [start, end) in the layout yf.download returns."""
+    days = pd.bdate_range(pd.Timestamp(start), pd.Timestamp(end) - pd.Timedelta(days=1))
+    seed = zlib.crc32(symbol.encode())
+    offsets = (days - EPOCH).days.to_numpy()
+
+    noise = _noise(offsets, seed)
+    level = 500 + seed % 2500
+    trend = level * np.exp(0.0003 * offsets)
+    close = trend * (1 + 0.05 * np.sin(offsets / 23.0) + 0.02 * noise)
+    open_ = close * (1 + 0.01 * _noise(offsets - 1, seed))
+    high = np.maximum(open_, close) * (1 + 0.005 * np.abs(noise))
+    low = np.minimum(open_, close) * (1 - 0.005 * np.abs(_noise(offsets - 2, seed)))
+    volume = np.round(1e6 * (1.5 + noise))
+
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=days)
+
+
+class CountingFetcher:
+    """Wraps a fetcher and counts calls, standing in for network round trips."""
+
+    def __init__(self, fetcher=synthetic_ohlcv):
+        self.fetcher = fetcher
+        self.calls = 0
+
+    def __call__(self, symbol, start, end):
+        self.calls += 1
+        return self.fetcher(symbol, start, end)
+
+
+def install_offline_stores(fetcher=synthetic_ohlcv, tmpdir=None):
+    """
+    Points the process-wide OHLCV store, indicator state and feature table at
+    `tmpdir` (default: a fresh temporary directory) backed by `fetcher`. Returns
+    the directory. Processes given the same directory share the stores.
+    """
+    import feature_store
+    import indicators
+    import ohlcv_store
+
+    tmpdir = tmpdir or tempfile.mkdtemp(prefix='stocksight-bench-')
+    store = ohlcv_store.OHLCVStore(os.path.join(tmpdir, 'ohlcv.sqlite3'), fetcher=fetcher)
+    ohlcv_store.set_store(store)
+    indicators.set_state_store(indicators.IndicatorStateStore(os.path.join(tmpdir, 'indicator_state')))
+    feature_store.set_feature_store(feature_store.FeatureStore(store.get_ohlcv, os.path.join(tmpdir, 'feature_store')))
+    return tmpdir
+
+
+# --- Groww-style intraday candles ---
+
+# NSE cash session: 09:15 to 15:30 IST, i.e. 375 one-minute candles per weekday
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+SESSION_OPEN_MINUTE = 9 * 60 + 15
+SESSION_MINUTES = 375
+
+
+def synthetic_minute_candles(symbol, start_ms, end_ms):
+    """
+    One-minute candles [epoch_seconds, open, high, low, close, volume] for every
+    session minute in [start_ms, end_ms], in the shape the Groww chart API returns.
+    Each candle depends only on (symbol, minute), so any range slices consistently.
+    """
+    start_s, end_s = start_ms // 1000, end_ms // 1000
+    first_day = (start_s + IST_OFFSET_SECONDS) // 86400
+    last_day = (end_s + IST_OFFSET_SECONDS) // 86400
+    days = np.arange(first_day, last_day + 1)
+    # 1970-01-01 was a Thursday, so day % 7 in (2, 3) are Saturday and Sunday
+    days = days[(days % 7 != 2) & (days % 7 != 3)]
+
+    minutes = (days[:, None] * 1440 + SESSION_OPEN_MINUTE + np.arange(SESSION_MINUTES)[None, :]).ravel()
+    timestamps = minutes * 60 - IST_OFFSET_SECONDS
+    keep = (timestamps >= start_s) & (timestamps <= end_s)
+    minutes, timestamps = minutes[keep], timestamps[keep]
+
+    seed = zlib.crc32(symbol.encode())
+    level = 500 + seed % 2500
+    day_offsets = minutes / 1440.0 - (EPOCH - pd.Timestamp('1970-01-01')).days
+    noise = _noise(minutes, seed)
+    trend = level * np.exp(0.0003 * day_offsets)
+    close = trend * (1 + 0.05 * np.sin(day_offsets / 23.0) + 0.002 * np.sin(minutes / 17.0) + 0.001 * noise)
+    open_ = trend * (1 + 0.05 * np.sin((day_offsets - 1 / 1440.0) / 23.0) + 0.002 * np.sin((minutes - 1) / 17.0)
+                     + 0.001 * _noise(minutes - 1, seed))
+    high = np.maximum(open_, close) * (1 + 0.0005 * np.abs(_noise(minutes + 7, seed)))
+    low = np.minimum(open_, close) * (1 - 0.0005 * np.abs(_noise(minutes + 13, seed)))
+    volume = np.round(2000 * (1.5 + noise))
+
+    return np.column_stack([timestamps, np.round(open_, 2), np.round(high, 2), np.round(low, 2),
+                            np.round(close, 2), volume])
+
+
+def aggregate_candles(candles, interval_minutes):
+    """
+    Aggregates one-minute candles into interval_minutes buckets aligned to the
+    09:15 session open (1440 gives one candle per session, stamped at the open).
+    """
+    if len(candles) == 0:
+        return candles
+    ts = candles[:, 0].astype(np.int64)
+    local_minutes = (ts + IST_OFFSET_SECONDS) // 60
+    day = local_minutes // 1440
+    minute_of_session = local_minutes % 1440 - SESSION_OPEN_MINUTE
+    width = SESSION_MINUTES if interval_minutes >= 1440 else interval_minutes
+    bucket = day * 1440 + (minute_of_session // width) * width
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(candles)]
+    return np.column_stack([
+        (day[starts] * 1440 + SESSION_OPEN_MINUTE + (minute_of_session[starts] // width) * width) * 60 - IST_OFFSET_SECONDS,
+        candles[starts, 1],
+        np.maximum.reduceat(candles[:, 2], starts),
+        np.minimum.reduceat(candles[:, 3], starts),
+        candles[ends - 1, 4],
+        np.add.reduceat(candles[:, 5], starts),
+    ])
+
+
+def synthetic_groww_candles(symbol, start_ms, end_ms, interval_minutes):
+    """Groww-style candle list for any interval, as plain Python lists."""
+    candles = synthetic_minute_candles(symbol, start_ms, end_ms)
+    if interval_minutes > 1:
+        candles = aggregate_candles(candles, interval_minutes)
+    return [[int(row[0])] + [float(v) for v in row[1:5]] + [int(row[5])] for row in candles]
@@ -0,0 +1,81 @@
+import os
+import sys
+import types
+
+import pandas as pd
+
+# Recorded daily OHLCV fixtures and a stand-in for the yfinance module.
+#
+# fixtures/ohlcv/<SYMBOL>.csv holds daily bars in the column layout of
+# yf.download (Date, Open, High, Low, Close, Volume). install() puts a module
+# named 'yfinance' into sys.modules whose download() serves those files, with
+# the MultiIndex columns real yfinance returns, so the app's own fetcher and
+# normalize_ohlcv run unchanged and nothing touches the network.
+#
+# Re-record with `python benchmarks/fake_yfinance.py` (needs network and the
+# real yfinance package) or `--synthetic` to regenerate them from fake_market.py.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ohlcv')
+FIXTURE_SYMBOLS = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFCBANK.NS', 'SBIN.NS']
+FIXTURE_START, FIXTURE_END = '2021-07-01', '2025-07-01'  # [start, end)
+
+_frames = {}
+
+
+def load_fixture(symbol):
+    """The recorded bars for `symbol` (flat columns); KeyError if none were recorded."""
+    if symbol not in _frames:
+        path = os.path.join(FIXTURE_DIR, f"{symbol}.csv")
+        if not os.path.exists(path):
+            raise KeyError(f"No OHLCV fixture for {symbol} in {FIXTURE_DIR}")
+        _frames[symbol] = pd.read_csv(path, index_col='Date', parse_dates=['Date'])
+    return _frames[symbol]
+
+
+def download(tickers, start=None, end=None, progress=True, **kwargs):
+    """yf.download for one ticker over recorded data: bars in [start, end), MultiIndex columns."""
+    frame = load_fixture(tickers)
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    if end is not None:
+        frame = frame[frame.index < pd.Timestamp(end)]
+    frame = frame.copy()
+    frame.columns = pd.MultiIndex.from_tuples([(column, tickers) for column in frame.columns],
+                                              names=['Price', 'Ticker'])
+    return frame
+
+
+def install():
+    """Makes `import yfinance` return this fake for the rest of the process."""
+    module = types.ModuleType('yfinance')
+    module.download = download
+    module.__fake__ = True
+    sys.modules['yfinance'] = module
+    return module
+
+
+def record(symbols=FIXTURE_SYMBOLS, start=FIXTURE_START, end=FIXTURE_END, synthetic=False):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for symbol in symbols:
+        if synthetic:
+            from fake_market import synthetic_ohlcv
+            frame = synthetic_ohlcv(symbol, start, end)
+        else:
+            import yfinance as yf
+            frame = yf.download(symbol, start=start, end=end, progress=False)
+            frame.columns = [column[0] if isinstance(column, tuple) else column for column in frame.columns]
+        frame = frame[['Open', 'High', 'Low', 'Close', 'Volume']].astype({'Volume': 'int64'})
+        frame.index = pd.DatetimeIndex(frame.index).tz_localize(None).normalize()
+        frame.index.name = 'Date'
+        frame.to_csv(os.path.join(FIXTURE_DIR, f"{symbol}.csv"), float_format='%.4f', date_format='%Y-%m-%d')
+        print(f"  {symbol}: {len(frame)} bars")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record the daily OHLCV fixtures used by the benchmark suite.")
+    parser.add_argument('--symbols', nargs='+', default=FIXTURE_SYMBOLS)
+    parser.add_argument('--synthetic', action='store_true', help="generate them offline from fake_market.py")
+    args = parser.parse_args()
+    record(args.symbols, synthetic=args.synthetic)
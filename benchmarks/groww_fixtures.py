@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from candle_store import to_arrays
+from resample import DERIVED_INTERVALS, resample
+
+# Recorded Groww chart API responses, the reference resample.py is checked against.
+#
+# fixtures/groww/<SYMBOL>.json holds, for one range of whole sessions, the
+# candles the API returned at 1m and at each derived interval (5m, 15m, 1d):
+#   {"symbol", "start_ms", "end_ms", "recorded", "candles": {"1": [...], "5": [...], ...}}
+# Unlike fake_market.aggregate_candles, these come from the exchange's own
+# aggregation, so they show how Groww aligns buckets and what its daily candle
+# includes (pre-open auction, closing session volume) that the 1m candles do not.
+#
+# Record with `python benchmarks/groww_fixtures.py --symbols TCS SBIN` (needs
+# network access to Groww). Only intraday history the API still serves at 1m
+# can be recorded, so the default range is the last full week. With
+# STOCKSIGHT_RECORD_GROWW=1, tests/test_resample.py records one into a temporary
+# folder when none is committed, so a CI job with network access runs the check.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'groww')
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def fixture_paths(directory=FIXTURE_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json'))
+
+
+def load_fixture(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_resampled(fixture):
+    """
+    Resamples the fixture's 1m candles and compares them with the recorded API
+    candles of each derived interval. Returns {label: report} where report has
+    the bucket counts, the buckets only one side has ('missing' from the derived
+    series, 'extra' in it) and, over the shared buckets, the largest absolute
+    difference per column.
+    """
+    minute_ts, minute_values = to_arrays(fixture['candles']['1'])
+    reports = {}
+    for label, interval in DERIVED_INTERVALS.items():
+        api_ts, api_values = to_arrays(fixture['candles'][str(interval)])
+        ts, values = resample(minute_ts, minute_values, interval)
+        shared, derived_at, api_at = np.intersect1d(ts, api_ts, return_indices=True)
+        diff = np.abs(values[:, derived_at] - api_values[:, api_at])
+        reports[label] = {
+            'derived': len(ts),
+            'api': len(api_ts),
+            'missing': np.setdiff1d(api_ts, ts).tolist(),
+            'extra': np.setdiff1d(ts, api_ts).tolist(),
+            'max_diff': dict(zip(['open', 'high', 'low', 'close', 'volume'],
+                                 (diff.max(axis=1) if len(shared) else np.zeros(5)).tolist())),
+        }
+    return reports
+
+
+def default_first_day():
+    """Monday of last week (IST), a range of whole sessions the API still serves at 1m."""
+    today = datetime.now(IST).date()
+    return today - timedelta(days=today.weekday() + 7)
+
+
+def record(symbols, first_day, days, base_url=None, directory=FIXTURE_DIR):
+    """Fetches [first_day, first_day + days) at 1m and every derived interval from the API."""
+    from groww_fetch import DEFAULT_BASE_URL, GrowwClient
+
+    os.makedirs(directory, exist_ok=True)
+    start = datetime.combine(first_day, datetime.min.time(), IST)
+    start_ms = int(start.timestamp() * 1000)
+    end_ms = int((start + timedelta(days=days)).timestamp() * 1000) - 1
+    client = GrowwClient(base_url or DEFAULT_BASE_URL, rate=1.0)
+    try:
+        for symbol in symbols:
+            candles = {str(interval): client.get_candles(symbol, interval, start_ms, end_ms)
+                       for interval in [1] + list(DERIVED_INTERVALS.values())}
+            fixture = {'symbol': symbol, 'start_ms': start_ms, 'end_ms': end_ms,
+                       'recorded': datetime.now(IST).isoformat(timespec='seconds'), 'candles': candles}
+            with open(os.path.join(directory, f"{symbol}.json"), "w", encoding="utf-8") as f:
+                json.dump(fixture, f)
+            print(f"  {symbol}: " + ", ".join(f"{len(rows)} x {interval}m" for interval, rows in candles.items()))
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record Groww API candles used to check resample.py.")
+    parser.add_argument('--symbols', nargs='+', default=['TCS', 'SBIN'])
+    parser.add_argument('--start', default=default_first_day().isoformat(),
+                        help="first IST day (default: Monday of last week)")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--base-url', help="candle endpoint (default: Groww)")
+    args = parser.parse_args()
+    record(args.symbols, datetime.strptime(args.start, "%Y-%m-%d").date(), args.days, args.base_url)
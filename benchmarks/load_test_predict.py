@@ -0,0 +1,131 @@
+"""
+p50/p99 latency of /predict under concurrent identical and mixed requests.
+
+Compares three ways of serving the app, each over real HTTP on localhost:
+  flask        threaded Werkzeug server, every request computed separately
+  flask+sf     threaded Werkzeug server with request coalescing (single flight)
+  asgi         uvicorn serving asgi.py: async handler, thread-pool compute, single flight
+
+Runs fully offline. The synthetic fetcher sleeps --fetch-latency seconds per call
+to stand in for a yfinance download, and every round starts from empty stores,
+so each round looks like the first requests after market open.
+
+    python benchmarks/load_test_predict.py --concurrency 32 --rounds 5
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend'))
+
+from bench_batch_predict import SYMBOLS
+from fake_market import CountingFetcher, install_offline_stores, synthetic_ohlcv
+
+
+class SlowFetcher(CountingFetcher):
+    def __init__(self, latency):
+        super().__init__(synthetic_ohlcv)
+        self.latency = latency
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol, start, end):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        return self.fetcher(symbol, start, end)
+
+
+def start_flask(port):
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def start_asgi(port):
+    import uvicorn
+    import asgi
+
+    server = uvicorn.Server(uvicorn.Config(asgi.application, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return stop
+
+
+def workload(kind, concurrency, date_str):
+    if kind == 'identical':
+        return [('RELIANCE', date_str)] * concurrency
+    # Mixed: hot names requested by several users at once, plus a tail of single requests
+    hot = [(symbol, date_str) for symbol in SYMBOLS[:4]]
+    tail = [(symbol, date_str) for symbol in SYMBOLS[4:]]
+    return [hot[i % len(hot)] if i % 3 else tail[i % len(tail)] for i in range(concurrency)]
+
+
+def run_round(url, pairs):
+    def call(pair):
+        start = time.perf_counter()
+        res = requests.post(f"{url}/predict", json={'companySymbol': pair[0], 'predictionDate': pair[1]}, timeout=120)
+        return time.perf_counter() - start, res.status_code
+
+    with ThreadPoolExecutor(max_workers=len(pairs)) as pool:
+        return list(pool.map(call, pairs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=32, help='simultaneous requests per round')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--fetch-latency', type=float, default=0.3, help='seconds per simulated download')
+    parser.add_argument('--date', default='2024-06-28')
+    parser.add_argument('--port', type=int, default=5077)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+
+    modes = [('flask', start_flask, False), ('flask+sf', start_flask, True), ('asgi', start_asgi, True)]
+    print(f"{args.concurrency} concurrent requests x {args.rounds} cold rounds, {args.fetch_latency * 1000:.0f} ms per fetch")
+    print(f"{'mode':10} {'workload':10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'fetches':>8} {'errors':>7}")
+
+    for offset, (name, start_server, coalesce) in enumerate(modes):
+        port = args.port + offset
+        app_module.COALESCE_REQUESTS = coalesce
+        stop = start_server(port)
+        try:
+            for kind in ('identical', 'mixed'):
+                latencies, fetches, errors = [], 0, 0
+                for _ in range(args.rounds):
+                    fetcher = SlowFetcher(args.fetch_latency)
+                    install_offline_stores(fetcher)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results = run_round(f"http://127.0.0.1:{port}", workload(kind, args.concurrency, args.date))
+                    latencies += [seconds for seconds, _ in results]
+                    errors += sum(status != 200 for _, status in results)
+                    fetches += fetcher.calls
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                print(f"{name:10} {kind:10} {p50:9.1f} {p99:9.1f} {max(latencies) * 1000:9.1f} "
+                      f"{fetches / args.rounds:8.1f} {errors:7d}")
+        finally:
+            stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+"""
+Offline benchmark suite with a stored baseline.
+
+Each section runs in a fresh interpreter, so imports and peak memory are its
+own, against recorded data only: the daily OHLCV fixtures behind a fake
+yfinance module (fake_yfinance.py) and the local fake Groww server
+(fake_groww_server.py). Stores are pinned to the fixtures' last day, so every
+run requests and computes exactly the same thing.
+
+  features  prepare_features, 'ta' and 'streaming' engines: first call per
+            symbol (download + build) and warm calls, with the mean time of
+            each stage the app itself records in stocksight_stage_seconds
+  predict   /predict over HTTP on a threaded Werkzeug server, prediction cache
+            off: requests/s and p50/p99 at 1 and 8 concurrent clients
+  model     model load in a fresh process: joblib pickle, compiled arrays
+            (cold and cached), native booster; time and peak RSS of each
+  candles   1m candles from the fake Groww API: fetch, CandleStore write,
+            full and one-week reads, resample to 1d
+The other sections also report their own peak RSS.
+
+Each section runs --rounds times in fresh processes and keeps the best value
+of each metric, since noise only ever makes a run look slower; timings that
+moved by less than --min-delta-ms are not flagged.
+
+Results go to --output as JSON ({"meta": ..., "metrics": {name: value}}) and
+are compared with --baseline. Names ending in _per_s are better when higher,
+all others (ms, MB) when lower. Peak RSS and counts repeat to within 1% from
+run to run, so an MB metric is flagged when it is more than
+--memory-tolerance worse. Timings are not that stable on shared hardware: on
+the 1-CPU host that recorded baseline.json, timings of unchanged code spread
+by up to 60% around their median over three back-to-back runs, and by up to
+95% between runs recorded apart. A timing is therefore flagged only when it is
+worse than --tolerance (default 1.0, i.e. twice as slow) and worse than the
+noise the baseline recorded for it, and only if it is still worse after its
+section is run again for --confirm-rounds more rounds. Any confirmed
+regression sets the exit status to 1. On a dedicated machine, record a
+baseline there and pass a lower --tolerance (e.g. 0.1): each timing is still
+held to no less than its own recorded noise.
+
+--update-baseline runs the whole measurement --baseline-runs times and stores
+the median of each metric, plus the largest relative deviation of any run from
+that median as the metric's noise.
+
+    python benchmarks/run_suite.py
+    python benchmarks/run_suite.py --sections features model --repeat 3
+    python benchmarks/run_suite.py --update-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BACKEND = os.path.join(ROOT, 'Backend')
+sys.path[:0] = [ROOT, BACKEND]
+
+import fake_yfinance
+
+SECTIONS = ['features', 'predict', 'model', 'candles']
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# The day after the last fixture bar is "today" for the stores
+TODAY = date.fromisoformat(fake_yfinance.FIXTURE_END)
+STAGES = {
+    'ta': ['download', 'flatten_columns', 'lag_features', 'indicators', 'dropna_filter'],
+    'streaming': ['feature_store', 'streaming_features'],
+}
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def peak_rss_mb():
+    """High-water RSS of this process in MB (Linux; 0 elsewhere)."""
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+    except (FileNotFoundError, StopIteration):
+        return 0.0
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def install_fixture_stores(tmpdir):
+    """Fresh OHLCV store, indicator state and feature table in `tmpdir`, fed by the fake yfinance."""
+    import feature_store
+    import indicators
+    import ohlcv_store
+
+    store = ohlcv_store.OHLCVStore(os.path.join(tmpdir, 'ohlcv.sqlite3'), today=lambda: TODAY)
+    ohlcv_store.set_store(store)
+    indicators.set_state_store(indicators.IndicatorStateStore(os.path.join(tmpdir, 'indicator_state')))
+    feature_store.set_feature_store(
+        feature_store.FeatureStore(store.get_ohlcv, os.path.join(tmpdir, 'feature_store'), today=lambda: TODAY))
+    return store
+
+
+def fixture_pairs(days):
+    """(app symbol, date) for every fixture symbol over its last `days` trading days, newest day first."""
+    symbols = [symbol.split('.')[0] for symbol in fake_yfinance.FIXTURE_SYMBOLS]
+    dates = fake_yfinance.load_fixture(fake_yfinance.FIXTURE_SYMBOLS[0]).index[-days:]
+    return [(symbol, day.strftime("%Y-%m-%d")) for day in reversed(dates) for symbol in symbols]
+
+
+# --- Sections (each runs in its own process and returns {metric: value}) ---
+
+def section_features(args, tmpdir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    from metrics import STAGE_SECONDS
+
+    pairs = fixture_pairs(args.dates)
+    metrics = {}
+    for engine in ('ta', 'streaming'):
+        install_fixture_stores(tempfile.mkdtemp(dir=tmpdir))
+        app.FEATURE_ENGINE = engine
+        first, warm = [], []
+        seen = set()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for symbol, date_str in pairs:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    start = time.perf_counter()
+                    assert app.prepare_features(symbol, date_str) is not None
+                    first.append(time.perf_counter() - start)
+            before = {name: STAGE_SECONDS.snapshot(stage=name) for name in STAGES[engine]}
+            for _ in range(args.repeat):
+                for symbol, date_str in pairs:
+                    start = time.perf_counter()
+                    assert app.prepare_features(symbol, date_str) is not None
+                    warm.append(time.perf_counter() - start)
+        metrics[f'features.{engine}.first_call_ms'] = ms(statistics.median(first))
+        metrics[f'features.{engine}.warm_p50_ms'] = ms(statistics.median(warm))
+        for name in STAGES[engine]:
+            count, total = STAGE_SECONDS.snapshot(stage=name)
+            if count > before[name][0]:
+                metrics[f'features.{engine}.stage.{name}_ms'] = ms((total - before[name][1]) / (count - before[name][0]))
+    return metrics
+
+
+def section_predict(args, tmpdir):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import threading
+
+    import requests
+    from werkzeug.serving import make_server
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    install_fixture_stores(tmpdir)
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/predict"
+    pairs = fixture_pairs(args.dates)
+
+    def call(pair):
+        start = time.perf_counter()
+        res = requests.post(url, json={'companySymbol': pair[0], 'predictionDate': pair[1]}, timeout=120)
+        assert res.status_code == 200, res.text
+        return time.perf_counter() - start
+
+    metrics = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Stores warm, so throughput measures request, feature and model work rather than the first fetch
+        list(map(call, pairs))
+        for concurrency in (1, 8):
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                start = time.perf_counter()
+                latencies = sorted(pool.map(call, pairs * args.repeat))
+                seconds = time.perf_counter() - start
+            metrics[f'predict.c{concurrency}.requests_per_s'] = round(len(latencies) / seconds, 2)
+            metrics[f'predict.c{concurrency}.p50_ms'] = ms(latencies[len(latencies) // 2])
+            metrics[f'predict.c{concurrency}.p99_ms'] = ms(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))])
+    server.shutdown()
+    return metrics
+
+
+MODEL_LOADS = {
+    'joblib': "import joblib; joblib.load({pkl!r})",
+    'compiled_cold': "from inference import load_model; load_model({pkl!r}, {version!r}, {cold!r})",
+    'compiled_cached': "from inference import load_model; load_model({pkl!r}, {version!r}, {cache!r})",
+    'native_cached': "from inference import load_model; load_model({pkl!r}, {version!r}, {cache!r}).load_native()",
+}
+
+
+def section_model(args, tmpdir):
+    from prediction_cache import model_version
+
+    pkl = os.path.join(BACKEND, 'roc_model3.pkl')
+    version = model_version(pkl)
+    cache = os.path.join(tmpdir, 'model_cache')
+    subprocess.run([sys.executable, '-c', f"import sys; sys.path.insert(0, {BACKEND!r}); "
+                    + MODEL_LOADS['native_cached'].format(pkl=pkl, version=version, cache=cache)], check=True)
+    metrics = {}
+    for name, snippet in MODEL_LOADS.items():
+        runs = []
+        for run in range(args.repeat):
+            # Nothing imported before the clock starts but what the entry points import anyway
+            code = (f"import sys, time; sys.path.insert(0, {BACKEND!r}); t = time.perf_counter(); "
+                    + snippet.format(pkl=pkl, version=version, cache=cache, cold=os.path.join(tmpdir, f'cold_{name}_{run}'))
+                    + "; seconds = time.perf_counter() - t; "
+                    "print(seconds, next(int(line.split()[1]) for line in open('/proc/self/status') "
+                    "if line.startswith('VmHWM:')) / 1024)")
+            seconds, peak = map(float, subprocess.check_output([sys.executable, '-c', code]).decode().split()[-2:])
+            runs.append((seconds, peak))
+        metrics[f'model.{name}.load_ms'] = ms(min(seconds for seconds, _ in runs))
+        metrics[f'model.{name}.peak_rss_mb'] = round(max(peak for _, peak in runs), 1)
+    return metrics
+
+
+def section_candles(args, tmpdir):
+    from candle_store import CandleStore
+    from fake_groww_server import start_server
+    from groww_fetch import GrowwClient, plan_chunks_ms
+    from resample import resample
+
+    symbol = 'RELIANCE'
+    start = datetime(2025, 1, 1, tzinfo=IST)
+    end = start + timedelta(days=args.candle_days)
+    # Unlimited history, so the fixed window is served whatever today's date is
+    server, base_url = start_server(history_days={1: 100000})
+    client = GrowwClient(base_url, rate=1000)
+    fetch, write, read_full, read_week, resample_1d = [], [], [], [], []
+    try:
+        for run in range(args.repeat):
+            t = time.perf_counter()
+            candles = []
+            # The downloader's 1m chunking (3 days per request)
+            for chunk_start, chunk_end in plan_chunks_ms(int(start.timestamp() * 1000), int(end.timestamp() * 1000), 3):
+                candles += client.get_candles(symbol, 1, chunk_start, chunk_end)
+            fetch.append(time.perf_counter() - t)
+
+            store = CandleStore(os.path.join(tmpdir, f'candles_{run}'))
+            t = time.perf_counter()
+            store.write(symbol, '1m', candles)
+            write.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            timestamps, values = store.read(symbol, '1m')
+            float(values[3].sum())  # touch the mapped pages
+            read_full.append(time.perf_counter() - t)
+
+            week_start = int((end - timedelta(days=14)).timestamp())
+            t = time.perf_counter()
+            _, week = store.read(symbol, '1m', week_start, week_start + 7 * 86400)
+            float(week[3].sum())
+            read_week.append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            resample(timestamps, values, 1440)
+            resample_1d.append(time.perf_counter() - t)
+    finally:
+        client.close()
+        server.shutdown()
+    return {
+        'candles.count': len(candles),
+        'candles.fetch_ms': ms(statistics.median(fetch)),
+        'candles.write_ms': ms(statistics.median(write)),
+        'candles.read_full_ms': ms(statistics.median(read_full)),
+        'candles.read_week_ms': ms(statistics.median(read_week)),
+        'candles.resample_1d_ms': ms(statistics.median(resample_1d)),
+    }
+
+
+def run_section(name, args):
+    fake_yfinance.install()
+    tmpdir = tempfile.mkdtemp(prefix=f'stocksight-suite-{name}-')
+    try:
+        metrics = globals()[f'section_{name}'](args, tmpdir)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    # The model loads run in their own processes and report their own peaks
+    if name != 'model':
+        metrics[f'{name}.peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return metrics
+
+
+# --- Baseline comparison ---
+
+def higher_is_better(name):
+    return name.endswith('_per_s')
+
+
+def threshold(name, noise, tolerance, memory_tolerance):
+    """Relative slowdown beyond which `name` is flagged."""
+    if name.endswith('.count'):
+        return 0.0
+    if name.endswith('_mb'):
+        return memory_tolerance
+    return max(tolerance, noise.get(name, 0.0))
+
+
+def regressed(metrics, baseline, noise, tolerance, memory_tolerance, min_delta_ms=0.0):
+    """{name: (change, flag)} for every metric measured in both runs; flag is '' when within bounds."""
+    results = {}
+    for name in sorted(set(metrics) & set(baseline)):
+        base, current = baseline[name], metrics[name]
+        change = (current - base) / base if base else 0.0
+        worse = -change if higher_is_better(name) else change
+        limit = threshold(name, noise, tolerance, memory_tolerance)
+        flag = ''
+        if name.endswith('.count'):
+            flag = 'workload changed' if current != base else ''
+        elif name.endswith('_ms') and abs(current - base) < min_delta_ms:
+            flag = ''
+        elif worse > limit:
+            flag = 'REGRESSION'
+        elif worse < -limit:
+            flag = 'improved'
+        results[name] = (change, flag)
+    return results
+
+
+def compare(metrics, baseline, noise, tolerance, memory_tolerance, min_delta_ms=0.0):
+    """
+    Prints current vs baseline per metric with the threshold it is held to;
+    returns the names that regressed beyond it.
+    """
+    results = regressed(metrics, baseline, noise, tolerance, memory_tolerance, min_delta_ms)
+    print(f"\n{'metric':<44} {'baseline':>11} {'current':>11} {'change':>8} {'limit':>6}")
+    for name in sorted(set(metrics) | set(baseline)):
+        if name not in results:
+            print(f"{name:<44} {baseline.get(name, '-')!s:>11} {metrics.get(name, '-')!s:>11} {'new' if name in metrics else 'gone':>8}")
+            continue
+        change, flag = results[name]
+        limit = threshold(name, noise, tolerance, memory_tolerance)
+        print(f"{name:<44} {baseline[name]:>11.3f} {metrics[name]:>11.3f} {change:>+7.1%} {limit:>6.0%}"
+              + (f"  {flag}" if flag else ''))
+    return [name for name, (_, flag) in results.items() if flag == 'REGRESSION']
+
+
+def machine():
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+            'cpus': os.cpu_count()}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', '-C', ROOT, 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_sections(names, args, rounds, metrics=None):
+    """Runs each section `rounds` times in fresh processes; returns the best value of each metric."""
+    env = dict(os.environ, STOCKSIGHT_WARMUP='off', STOCKSIGHT_PREDICTION_CACHE_ENTRIES='0',
+               STOCKSIGHT_PREDICTION_CACHE_DIR='')
+    passthrough = ['--repeat', str(args.repeat), '--dates', str(args.dates), '--candle-days', str(args.candle_days)]
+    metrics = dict(metrics or {})
+    for name in names:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            output = subprocess.run([sys.executable, __file__, '--run-section', name, *passthrough], env=env,
+                                    check=True, capture_output=True, text=True).stdout
+            # Keep the best round of each metric: noise only ever makes a run look slower
+            for metric, value in json.loads(output.strip().splitlines()[-1]).items():
+                best = max if higher_is_better(metric) else min
+                metrics[metric] = best(metrics[metric], value) if metric in metrics else value
+        print(f"  {name:<9} {time.perf_counter() - start:6.1f} s")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sections', nargs='+', default=SECTIONS, choices=SECTIONS)
+    parser.add_argument('--repeat', type=int, default=5, help="passes per measurement (median, or min for loads)")
+    parser.add_argument('--rounds', type=int, default=3, help="fresh processes per section; the best value is kept")
+    parser.add_argument('--dates', type=int, default=10, help="trading days per fixture symbol")
+    parser.add_argument('--candle-days', type=int, default=60, help="days of 1m candles in the candles section")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help="allowed relative slowdown of a timing (at least its recorded noise)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.05, help="allowed relative growth of a peak RSS")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="timing changes smaller than this are noise")
+    parser.add_argument('--confirm-rounds', type=int, default=3,
+                        help="extra rounds for sections with a regression before it is reported (0: report at once)")
+    parser.add_argument('--update-baseline', action='store_true', help="store the measurement as the new baseline")
+    parser.add_argument('--baseline-runs', type=int, default=3, help="measurements whose median --update-baseline stores")
+    parser.add_argument('--run-section', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_section:
+        print(json.dumps(run_section(args.run_section, args)))
+        return
+
+    meta = dict(machine(), revision=git_revision(), created=datetime.now().isoformat(timespec='seconds'),
+                repeat=args.repeat, rounds=args.rounds, dates=args.dates, candle_days=args.candle_days)
+
+    if args.update_baseline:
+        runs = []
+        for run in range(args.baseline_runs):
+            print(f"Run {run + 1}/{args.baseline_runs}")
+            runs.append(run_sections(args.sections, args, args.rounds))
+        metrics = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+        noise = {name: round(max(abs(run[name] - value) / value if value else 0.0 for run in runs), 3)
+                 for name, value in metrics.items()}
+        results = {'meta': dict(meta, baseline_runs=args.baseline_runs), 'metrics': metrics, 'noise': noise}
+        for path in (args.output, args.baseline):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    metrics = run_sections(args.sections, args, args.rounds)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        noise = baseline.get('noise', {})
+        # Only compare what this run measured
+        measured = {name: value for name, value in baseline['metrics'].items() if name.split('.')[0] in args.sections}
+        limits = (noise, args.tolerance, args.memory_tolerance, args.min_delta_ms)
+        flagged = {name.split('.')[0] for name, (_, flag) in regressed(metrics, measured, *limits).items()
+                   if flag == 'REGRESSION'}
+        if flagged and args.confirm_rounds:
+            # A slow stretch of a shared machine rarely lasts; a real regression shows up again
+            print(f"Confirming {', '.join(sorted(flagged))} with {args.confirm_rounds} more round(s)")
+            metrics = run_sections([name for name in args.sections if name in flagged], args, args.confirm_rounds, metrics)
+
+    results = {'meta': meta, 'metrics': metrics}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Wrote {args.output}")
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to store one.")
+        return
+    if {k: baseline['meta'].get(k) for k in machine()} != machine():
+        print(f"Note: baseline was recorded on {baseline['meta'].get('platform')} with {baseline['meta'].get('cpus')} CPUs; "
+              "timings are only comparable on the same machine.")
+    regressions = compare(metrics, measured, *limits)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond their limit: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions beyond their limits.")
+
+
+if __name__ == '__main__':
+    main()
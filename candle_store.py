@@ -0,0 +1,201 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Columnar on-disk storage for Groww candles.
+#
+# Layout: <root>/<SYMBOL>/<label>/<YYYY-MM>.ts.npy     int64 epoch seconds, ascending
+#         <root>/<SYMBOL>/<label>/<YYYY-MM>.ohlcv.npy  float64, shape (5, n): open, high, low, close, volume
+#
+# Each column is contiguous, months are split on IST calendar months so no
+# trading session is split, and files are plain .npy so reads can memory-map
+# them and hand out zero-copy views of a time slice.
+
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+
+
+def _month_keys(timestamps):
+    """'YYYY-MM' (IST) for each epoch-second timestamp."""
+    local = (np.asarray(timestamps, dtype=np.int64) + IST_OFFSET_SECONDS).astype('datetime64[s]')
+    return np.datetime_as_string(local.astype('datetime64[M]'))
+
+
+def to_arrays(candles):
+    """Groww candle rows [ts, o, h, l, c, v] -> (int64 timestamps, (5, n) float64), sorted and de-duplicated."""
+    rows = np.asarray(candles, dtype=np.float64).reshape(-1, 6)
+    timestamps = rows[:, 0].astype(np.int64)
+    # Stable sort, then keep the last occurrence of each timestamp so later rows win
+    order = np.argsort(timestamps, kind='stable')
+    timestamps, values = timestamps[order], rows[order, 1:].T
+    keep = np.r_[timestamps[1:] != timestamps[:-1], True] if len(timestamps) else np.zeros(0, dtype=bool)
+    return timestamps[keep], np.ascontiguousarray(values[:, keep])
+
+
+def to_candles(timestamps, values):
+    """Inverse of to_arrays, for callers that still expect Groww-style lists."""
+    return [[int(ts)] + [float(v) for v in column] for ts, column in zip(timestamps, values.T)]
+
+
+class CandleStore:
+    def __init__(self, root):
+        self.root = root
+
+    def series_dir(self, symbol, label):
+        return os.path.join(self.root, symbol, label)
+
+    def months(self, symbol, label):
+        series_dir = self.series_dir(symbol, label)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(name[:-len('.ts.npy')] for name in os.listdir(series_dir) if name.endswith('.ts.npy'))
+
+    def _load_month(self, symbol, label, month, mmap=True):
+        base = os.path.join(self.series_dir(symbol, label), month)
+        mode = 'r' if mmap else None
+        return np.load(f"{base}.ts.npy", mmap_mode=mode), np.load(f"{base}.ohlcv.npy", mmap_mode=mode)
+
+    def _write_month(self, symbol, label, month, timestamps, values):
+        series_dir = self.series_dir(symbol, label)
+        os.makedirs(series_dir, exist_ok=True)
+        base = os.path.join(series_dir, month)
+        # Values first, then timestamps: a month only "exists" once its .ts.npy is renamed in
+        for suffix, array in (('.ohlcv.npy', values), ('.ts.npy', timestamps)):
+            tmp_path = f"{base}{suffix}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, base + suffix)
+
+    def write(self, symbol, label, candles, replace=False):
+        """
+        Merges candles into the stored series (newer rows win on equal timestamps).
+        With replace=True the existing series is dropped first.
+        """
+        if replace:
+            self.delete(symbol, label)
+        timestamps, values = to_arrays(candles)
+        if len(timestamps) == 0:
+            return 0
+        months = _month_keys(timestamps)
+        boundaries = np.flatnonzero(np.r_[True, months[1:] != months[:-1], True])
+        stored = set(self.months(symbol, label))
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            month = str(months[start])
+            month_ts, month_values = timestamps[start:end], values[:, start:end]
+            if month in stored:
+                old_ts, old_values = self._load_month(symbol, label, month, mmap=False)
+                keep = ~np.isin(old_ts, month_ts)
+                month_ts = np.concatenate([old_ts[keep], month_ts])
+                month_values = np.concatenate([old_values[:, keep], month_values], axis=1)
+                order = np.argsort(month_ts, kind='stable')
+                month_ts, month_values = month_ts[order], np.ascontiguousarray(month_values[:, order])
+            self._write_month(symbol, label, month, month_ts, month_values)
+        return len(timestamps)
+
+    def remove(self, symbol, label, timestamps):
+        """Drops the candles stamped at any of `timestamps` from the stored series."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(timestamps) == 0:
+            return 0
+        removed = 0
+        for month in sorted(set(_month_keys(timestamps).tolist()) & set(self.months(symbol, label))):
+            old_ts, old_values = self._load_month(symbol, label, month, mmap=False)
+            keep = ~np.isin(old_ts, timestamps)
+            if keep.all():
+                continue
+            removed += int((~keep).sum())
+            self._write_month(symbol, label, month, old_ts[keep], np.ascontiguousarray(old_values[:, keep]))
+        return removed
+
+    def delete(self, symbol, label):
+        shutil.rmtree(self.series_dir(symbol, label), ignore_errors=True)
+
+    def iter_slices(self, symbol, label, start_ts=None, end_ts=None):
+        """
+        Yields (timestamps, values) per month for start_ts <= ts < end_ts (epoch seconds).
+        Both arrays are zero-copy views into memory-mapped files.
+        """
+        months = self.months(symbol, label)
+        if start_ts is not None:
+            first = str(_month_keys([start_ts])[0])
+            months = [m for m in months if m >= first]
+        if end_ts is not None:
+            last = str(_month_keys([end_ts - 1])[0])
+            months = [m for m in months if m <= last]
+        for month in months:
+            timestamps, values = self._load_month(symbol, label, month)
+            lo = 0 if start_ts is None else int(np.searchsorted(timestamps, start_ts, side='left'))
+            hi = len(timestamps) if end_ts is None else int(np.searchsorted(timestamps, end_ts, side='left'))
+            if hi > lo:
+                yield timestamps[lo:hi], values[:, lo:hi]
+
+    def read(self, symbol, label, start_ts=None, end_ts=None):
+        """
+        Returns (timestamps, values) for start_ts <= ts < end_ts. A slice inside one
+        month is a zero-copy view; slices spanning months are concatenated.
+        """
+        parts = list(self.iter_slices(symbol, label, start_ts, end_ts))
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty((5, 0), dtype=np.float64)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts], axis=1)
+
+    def newest_timestamp(self, symbol, label):
+        months = self.months(symbol, label)
+        if not months:
+            return None
+        timestamps, _ = self._load_month(symbol, label, months[-1])
+        return int(timestamps[-1]) if len(timestamps) else None
+
+    def oldest_timestamp(self, symbol, label):
+        months = self.months(symbol, label)
+        if not months:
+            return None
+        timestamps, _ = self._load_month(symbol, label, months[0])
+        return int(timestamps[0]) if len(timestamps) else None
+
+    def count(self, symbol, label):
+        return sum(len(self._load_month(symbol, label, m)[0]) for m in self.months(symbol, label))
+
+
+def convert_json_tree(json_root, store_root=None, remove_json=False, log=print):
+    """
+    Converts <json_root>/<SYMBOL>/<SYMBOL>_<label>.json dumps written by the old
+    downloader into a CandleStore (by default in place, next to the JSON files).
+    """
+    store = CandleStore(store_root or json_root)
+    converted = 0
+    for symbol in sorted(os.listdir(json_root)):
+        symbol_dir = os.path.join(json_root, symbol)
+        if not os.path.isdir(symbol_dir):
+            continue
+        for name in sorted(os.listdir(symbol_dir)):
+            prefix = f"{symbol}_"
+            if not (name.startswith(prefix) and name.endswith('.json')):
+                continue
+            label = name[len(prefix):-len('.json')]
+            path = os.path.join(symbol_dir, name)
+            with open(path, encoding="utf-8") as f:
+                candles = json.load(f)
+            written = store.write(symbol, label, candles, replace=True)
+            log(f"  {symbol} {label}: {written} candles")
+            converted += 1
+            if remove_json:
+                os.remove(path)
+    return converted
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert old JSON candle dumps to the columnar candle store.")
+    parser.add_argument('json_root', nargs='?', default="groww_3year_data")
+    parser.add_argument('--output', help="store root (default: same folder as the JSON dumps)")
+    parser.add_argument('--remove-json', action='store_true', help="delete each JSON file after converting it")
+    args = parser.parse_args()
+
+    count = convert_json_tree(args.json_root, args.output, args.remove_json)
+    print(f"Converted {count} series.")
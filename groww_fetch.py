@@ -0,0 +1,323 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Concurrent, rate-limited fetch engine for the Groww charting API.
+# One pooled HTTP session is shared by every worker thread, a global token
+# bucket spaces out requests instead of fixed sleeps, failed chunks are
+# retried with exponential backoff, and every chunk's outcome is recorded in
+# a ledger so failed ranges can be fetched again instead of being lost.
+
+DEFAULT_BASE_URL = "https://groww.in/v1/api/charting_service/v4/chart/exchange/NSE/segment/CASH"
+
+# HTTP statuses worth retrying; anything else in 4xx is a permanent failure
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ChunkLedger:
+    """
+    Outcome of every (symbol, interval, start, end) chunk, persisted as JSON.
+    Statuses: 'ok' (candles received), 'empty' (no data for the range), 'failed'.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(symbol, label, start_ms, end_ms):
+        return f"{symbol}|{label}|{start_ms}|{end_ms}"
+
+    def record(self, symbol, label, start_ms, end_ms, status, count=0, error=None):
+        key = self.key(symbol, label, start_ms, end_ms)
+        with self._lock:
+            attempts = self.entries.get(key, {}).get('attempts', 0) + 1
+            self.entries[key] = {'status': status, 'count': count, 'attempts': attempts}
+            if error:
+                self.entries[key]['error'] = str(error)
+
+    def status(self, symbol, label, start_ms, end_ms):
+        entry = self.entries.get(self.key(symbol, label, start_ms, end_ms))
+        return entry['status'] if entry else None
+
+    def failed(self):
+        """(symbol, label, start_ms, end_ms) for every chunk whose last attempt failed."""
+        with self._lock:
+            failed = [key for key, entry in self.entries.items() if entry['status'] == 'failed']
+        return [(symbol, label, int(start_ms), int(end_ms))
+                for symbol, label, start_ms, end_ms in (key.split('|') for key in failed)]
+
+    def forget(self, symbol, label, keep_failed=None):
+        """
+        Drops the recorded outcomes of one series once it is merged and can no
+        longer be resumed. Failed chunks stay for retry_failed(): all of them by
+        default, or only those whose (start_ms, end_ms) is in `keep_failed`.
+        """
+        prefix = f"{symbol}|{label}|"
+        keep = None if keep_failed is None else {(int(start_ms), int(end_ms)) for start_ms, end_ms in keep_failed}
+
+        def kept(key, entry):
+            if not key.startswith(prefix):
+                return True
+            if entry['status'] != 'failed':
+                return False
+            return keep is None or tuple(int(part) for part in key.split('|')[2:]) in keep
+
+        with self._lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if kept(key, entry)}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class SyncCheckpoints:
+    """
+    Planned [start_ms, end_ms] range and mode of every series that has not
+    finished yet, persisted as JSON. A rerun reuses the same range, so chunk
+    boundaries match the ledger and completed chunks are skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, symbol, label):
+        return self.entries.get(f"{symbol}|{label}")
+
+    def set(self, symbol, label, **entry):
+        with self._lock:
+            self.entries[f"{symbol}|{label}"] = entry
+        self.save()
+
+    def clear(self, symbol, label):
+        with self._lock:
+            self.entries.pop(f"{symbol}|{label}", None)
+        self.save()
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class GrowwClient:
+    """Pooled, rate-limited, retrying client for the candle endpoint."""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, rate=4.0, max_retries=4, backoff=1.0, timeout=30, pool_size=16):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_candles(self, symbol, interval_minutes, start_ms, end_ms):
+        """Returns the candle list for one chunk; raises after max_retries failed attempts."""
+        params = {
+            "startTimeInMillis": start_ms,
+            "endTimeInMillis": end_ms,
+            "intervalInMinutes": interval_minutes
+        }
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                res = self.session.get(f"{self.base_url}/{symbol}", params=params, timeout=self.timeout)
+                if res.status_code in RETRYABLE_STATUSES:
+                    raise requests.HTTPError(f"{res.status_code} from Groww", response=res)
+                res.raise_for_status()
+                return res.json().get("candles") or []
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                response = getattr(e, 'response', None)
+                if response is not None and response.status_code not in RETRYABLE_STATUSES:
+                    raise
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                # Honour Retry-After when the server sends it, otherwise back off exponentially with jitter
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** (attempt - 1)
+                time.sleep(delay * (1 + random.random() * 0.25))
+
+    def close(self):
+        self.session.close()
+
+
+def plan_chunks(start, end, chunk_days):
+    """Splits [start, end] into chunk_days-long (start_ms, end_ms) ranges, newest first."""
+    return plan_chunks_ms(int(start.timestamp() * 1000), int(end.timestamp() * 1000), chunk_days)
+
+
+def plan_chunks_ms(start_ms, end_ms, chunk_days):
+    """plan_chunks() for epoch-millisecond bounds; the oldest chunk is clipped at start_ms."""
+    chunks = []
+    chunk_ms = chunk_days * 86400 * 1000
+    current_end = end_ms
+    while current_end > start_ms:
+        current_start = max(current_end - chunk_ms, start_ms)
+        chunks.append((current_start, current_end))
+        current_end = current_start
+    return chunks
+
+
+def _fmt_ms(ms):
+    return datetime.fromtimestamp(ms / 1000).date()
+
+
+class FetchEngine:
+    """
+    Fetches many (symbol, interval) candle series concurrently.
+
+    Series run in parallel; within a series, chunks are requested in newest-first
+    waves of `wave_size` concurrent requests. As in the original serial loop, a
+    series stops going further back after `max_empty` consecutive empty chunks
+    (max_empty=None fetches every planned chunk).
+    """
+
+    def __init__(self, client, ledger=None, max_workers=8, wave_size=4, max_empty=2, log=print):
+        self.client = client
+        self.ledger = ledger or ChunkLedger()
+        self.max_workers = max_workers
+        self.wave_size = wave_size
+        self.max_empty = max_empty
+        self.log = log
+        self._chunk_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="groww-chunk")
+
+    def fetch_chunk(self, symbol, label, interval, start_ms, end_ms):
+        """Fetches one chunk and records the outcome; returns the candles or None on failure."""
+        try:
+            candles = self.client.get_candles(symbol, interval, start_ms, end_ms)
+        except Exception as e:
+            self.ledger.record(symbol, label, start_ms, end_ms, 'failed', error=e)
+            self.log(f"    {symbol} {label} error: {_fmt_ms(start_ms)} to {_fmt_ms(end_ms)}: {e}")
+            return None
+        self.ledger.record(symbol, label, start_ms, end_ms, 'ok' if candles else 'empty', count=len(candles))
+        return candles
+
+    def fetch_series(self, symbol, label, interval, chunks, skip_done=False, on_chunk=None):
+        """
+        Returns the candles fetched for one series, chunks concatenated newest-first.
+
+        With skip_done, chunks the ledger already marks 'ok' or 'empty' are not
+        requested again (their candles were handed to on_chunk by an earlier run).
+        on_chunk(symbol, label, candles) is called after every successful chunk.
+        """
+        all_candles = []
+        empty_run = 0
+        for wave_start in range(0, len(chunks), self.wave_size):
+            wave = chunks[wave_start:wave_start + self.wave_size]
+            outcomes = []
+            for start_ms, end_ms in wave:
+                status = self.ledger.status(symbol, label, start_ms, end_ms) if skip_done else None
+                if status in ('ok', 'empty'):
+                    outcomes.append(status)
+                else:
+                    outcomes.append(self._chunk_pool.submit(self.fetch_chunk, symbol, label, interval, start_ms, end_ms))
+
+            stop = False
+            for outcome in outcomes:
+                if outcome == 'ok':
+                    empty_run = 0
+                    continue
+                candles = [] if outcome == 'empty' else outcome.result()
+                if candles:
+                    all_candles.extend(candles)
+                    empty_run = 0
+                    if on_chunk:
+                        on_chunk(symbol, label, candles)
+                elif candles is not None:
+                    empty_run += 1
+                    if self.max_empty and empty_run >= self.max_empty:
+                        stop = True
+            self.ledger.save()
+            if stop:
+                self.log(f"    {symbol} {label}: stopping after {self.max_empty} consecutive empty chunks.")
+                break
+        return all_candles
+
+    def fetch_all(self, series, on_series_done=None, skip_done=False, on_chunk=None):
+        """
+        `series` is a list of (symbol, label, interval_minutes, chunks). Returns
+        {(symbol, label): candles}; on_series_done(symbol, label, candles) is called
+        as each series completes so results can be written out incrementally.
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="groww-series") as series_pool:
+            futures = {series_pool.submit(self.fetch_series, symbol, label, interval, chunks, skip_done, on_chunk): (symbol, label)
+                       for symbol, label, interval, chunks in series}
+            for future, key in futures.items():
+                results[key] = future.result()
+                self.log(f"  {key[0]} {key[1]}: {len(results[key])} records")
+                if on_series_done:
+                    on_series_done(key[0], key[1], results[key])
+        self.ledger.save()
+        return results
+
+    def retry_failed(self, intervals):
+        """
+        Fetches every chunk the ledger marks as failed again.
+        Returns {(symbol, label): candles} for the chunks that now succeeded.
+        """
+        recovered = {}
+        pending = self.ledger.failed()
+        futures = [(symbol, label, self._chunk_pool.submit(self.fetch_chunk, symbol, label, intervals[label], start_ms, end_ms))
+                   for symbol, label, start_ms, end_ms in pending if label in intervals]
+        for symbol, label, future in futures:
+            candles = future.result()
+            if candles:
+                recovered.setdefault((symbol, label), []).extend(candles)
+        self.ledger.save()
+        return recovered
+
+    def close(self):
+        self._chunk_pool.shutdown(wait=True)
+        self.client.close()
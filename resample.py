@@ -0,0 +1,170 @@
+import json
+import os
+
+import numpy as np
+
+from candle_store import IST_OFFSET_SECONDS
+
+# Higher timeframes derived locally from stored 1-minute candles.
+#
+# Buckets are aligned to the NSE cash session, 09:15 to 15:30 IST: a 5m bucket
+# starts at 09:15, 09:20, ..., a 15m bucket at 09:15, 09:30, ..., and the daily
+# candle covers the whole session and is stamped at 09:15. Buckets without any
+# 1m candle are left out rather than filled. 1m candles outside the session are
+# ignored.
+#
+# Downloaded '1d' candles (days older than the 1m history) share a series with
+# the derived ones, so refresh_derived restamps derived days at the time of day
+# the downloaded candles carry and drops any other candle stored for those days.
+# Whether the API itself stamps daily candles at 09:15 is what the recorded
+# fixtures in benchmarks/fixtures/groww check.
+#
+# Each aggregate is open of the first candle, max high, min low, close of the
+# last candle and summed volume, computed for all buckets at once with
+# np.*.reduceat over the bucket boundaries.
+
+SESSION_OPEN_MINUTE = 9 * 60 + 15
+SESSION_MINUTES = 375
+
+# Intervals that can be derived from '1m', in minutes (1440 = one session)
+DERIVED_INTERVALS = {"5m": 5, "15m": 15, "1d": 1440}
+
+
+def resample(timestamps, values, interval_minutes):
+    """
+    Aggregates ascending 1m candles, given as epoch-second timestamps and a
+    (5, n) open/high/low/close/volume array (candle_store layout), into
+    interval_minutes buckets. Returns arrays in the same layout.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    local_minutes = (timestamps + IST_OFFSET_SECONDS) // 60
+    day = local_minutes // 1440
+    minute_of_session = local_minutes % 1440 - SESSION_OPEN_MINUTE
+    in_session = _in_session(timestamps)
+    if not in_session.all():
+        timestamps, values = timestamps[in_session], values[:, in_session]
+        day, minute_of_session = day[in_session], minute_of_session[in_session]
+    if len(timestamps) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((5, 0), dtype=np.float64)
+
+    width = SESSION_MINUTES if interval_minutes >= 1440 else interval_minutes
+    bucket = day * 1440 + SESSION_OPEN_MINUTE + (minute_of_session // width) * width
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(timestamps)]
+
+    out = np.empty((5, len(starts)), dtype=np.float64)
+    out[0] = values[0, starts]
+    out[1] = np.maximum.reduceat(values[1], starts)
+    out[2] = np.minimum.reduceat(values[2], starts)
+    out[3] = values[3, ends - 1]
+    out[4] = np.add.reduceat(values[4], starts)
+    return bucket[starts] * 60 - IST_OFFSET_SECONDS, out
+
+
+def _in_session(timestamps):
+    minute_of_session = (np.asarray(timestamps, dtype=np.int64) + IST_OFFSET_SECONDS) // 60 % 1440 - SESSION_OPEN_MINUTE
+    return (minute_of_session >= 0) & (minute_of_session < SESSION_MINUTES)
+
+
+def _day_start(timestamps):
+    """Epoch seconds of the IST midnight at or before each timestamp."""
+    return (np.asarray(timestamps, dtype=np.int64) + IST_OFFSET_SECONDS) // 86400 * 86400 - IST_OFFSET_SECONDS
+
+
+def bucket_start(ts, interval_minutes):
+    """Epoch seconds at which the bucket holding `ts` starts (for in-session timestamps)."""
+    local_minutes = (int(ts) + IST_OFFSET_SECONDS) // 60
+    day, minute_of_session = divmod(local_minutes, 1440)
+    width = SESSION_MINUTES if interval_minutes >= 1440 else interval_minutes
+    minute_of_session = max(minute_of_session - SESSION_OPEN_MINUTE, 0)
+    return (day * 1440 + SESSION_OPEN_MINUTE + (minute_of_session // width) * width) * 60 - IST_OFFSET_SECONDS
+
+
+def session_day_end(ts):
+    """Epoch seconds of the IST midnight after `ts`."""
+    return ((int(ts) + IST_OFFSET_SECONDS) // 86400 + 1) * 86400 - IST_OFFSET_SECONDS
+
+
+def read_resampled(store, symbol, interval_minutes, start_ts=None, end_ts=None):
+    """
+    Candles of `interval_minutes` for start_ts <= bucket start < end_ts, computed
+    on demand from the stored '1m' series. Only whole buckets are read, so the
+    first one is not cut short by start_ts.
+    """
+    if start_ts is not None:
+        start_ts = bucket_start(start_ts, interval_minutes)
+    timestamps, values = store.read(symbol, "1m", start_ts, end_ts)
+    return resample(timestamps, values, interval_minutes)
+
+
+def _manifest_path(store, symbol, label):
+    return os.path.join(store.series_dir(symbol, label), "_derived.json")
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _daily_stamp(store, symbol, label, first_minute_ts):
+    """
+    Seconds after IST midnight at which the stored daily candles before the 1m
+    history are stamped, or the session open when there are none.
+    """
+    downloaded, _ = store.read(symbol, label, end_ts=int(_day_start([first_minute_ts])[0]))
+    if len(downloaded) == 0:
+        return SESSION_OPEN_MINUTE * 60
+    return int(downloaded[-1] - _day_start(downloaded[-1:])[0])
+
+
+def refresh_derived(store, symbol, labels=tuple(DERIVED_INTERVALS), log=print):
+    """
+    Brings the cached derived series of `symbol` up to date with its '1m' series.
+    Month files are session-aligned, so each month whose 1m file changed since it
+    was last resampled (tracked in <label>/_derived.json by the 1m file's mtime)
+    is resampled on its own and merged into the derived series; '1d' candles
+    downloaded for days without 1m data are kept, and derived days take their
+    stamp. Returns the months rewritten.
+    """
+    rewritten = 0
+    months = store.months(symbol, "1m")
+    first_minute_ts = store.oldest_timestamp(symbol, "1m")
+    for label in labels:
+        interval_minutes = DERIVED_INTERVALS[label]
+        manifest_path = _manifest_path(store, symbol, label)
+        manifest = _load_manifest(manifest_path)
+        stale = 0
+        if interval_minutes >= 1440 and months:
+            stamp = _daily_stamp(store, symbol, label, first_minute_ts)
+        for month in months:
+            source_mtime = os.stat(os.path.join(store.series_dir(symbol, "1m"), f"{month}.ts.npy")).st_mtime_ns
+            if manifest.get(month) == source_mtime:
+                continue
+            timestamps, values = store._load_month(symbol, "1m", month)
+            bucket_ts, bucket_values = resample(timestamps, values, interval_minutes)
+            # The 1m history may begin mid-bucket (e.g. mid-session for '1d'); that
+            # bucket would be incomplete, so it is left to whatever was downloaded.
+            # Candles before the session open do not make the first bucket partial.
+            if month == months[0] and len(bucket_ts) and bucket_ts[0] < timestamps[_in_session(timestamps)][0]:
+                bucket_ts, bucket_values = bucket_ts[1:], bucket_values[:, 1:]
+            if interval_minutes >= 1440 and len(bucket_ts):
+                bucket_ts = _day_start(bucket_ts) + stamp
+                # A day downloaded at 1d under another stamp would otherwise be stored twice
+                stored_ts = np.array(store.read(symbol, label, int(bucket_ts[0]) - stamp, int(bucket_ts[-1]) - stamp + 86400)[0])
+                store.remove(symbol, label, stored_ts[np.isin(_day_start(stored_ts), bucket_ts - stamp)
+                                                      & ~np.isin(stored_ts, bucket_ts)])
+            store.write(symbol, label, np.column_stack([bucket_ts, bucket_values.T]))
+            manifest[month] = source_mtime
+            stale += 1
+        if stale:
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            tmp_path = f"{manifest_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, manifest_path)
+            log(f"    {symbol} {label}: resampled {stale} month(s) from 1m")
+        rewritten += stale
+    return rewritten
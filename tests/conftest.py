@@ -0,0 +1,35 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# The backend, the downloader scripts and the offline fakes are plain modules, not a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'Backend'), os.path.join(ROOT, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# No background warm-up thread while the app module is imported under test
+os.environ.setdefault('STOCKSIGHT_WARMUP', 'off')
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """The Flask app module on offline stores (fake_market) with an empty prediction cache."""
+    import feature_store
+    import indicators
+    import ohlcv_store
+    from fake_market import install_offline_stores
+    from prediction_cache import PredictionCache
+
+    # Restored by monkeypatch once the test ends
+    monkeypatch.setattr(ohlcv_store, '_default_store', None)
+    monkeypatch.setattr(indicators, '_default_state_store', None)
+    monkeypatch.setattr(feature_store, '_default_feature_store', None)
+    install_offline_stores(tmpdir=str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    monkeypatch.setattr(app, 'prediction_cache', PredictionCache())
+    return app
@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def asgi(app_module):
+    import asgi
+    return asgi
+
+
+def post(application, path, payload):
+    """One HTTP POST through the ASGI app; returns (status, JSON body)."""
+    messages = [{'type': 'http.request', 'body': json.dumps(payload).encode(), 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'headers': [], 'query_string': b''}
+    asyncio.run(application(scope, receive, send))
+    body = b"".join(message.get('body', b"") for message in sent if message['type'] == 'http.response.body')
+    return sent[0]['status'], json.loads(body)
+
+
+def test_cached_result_echoes_each_callers_date(asgi, app_module):
+    status, first = post(asgi.application, '/predict', {'companySymbol': 'TCS', 'predictionDate': '2024-06-28'})
+    assert status == 200
+
+    status, second = post(asgi.application, '/predict', {'companySymbol': 'TCS.NS', 'predictionDate': '2024-6-28'})
+    assert status == 200 and app_module.prediction_cache.stats()['hits'] == 1
+    assert second['predictionDate'] == '2024-6-28' and second['companySymbol'] == 'TCS.NS'
+    assert second['estimatedPrice'] == first['estimatedPrice']
+
+
+def test_malformed_body_is_a_400(asgi):
+    status, body = post(asgi.application, '/predict', {'companySymbol': 'TCS'})
+    assert status == 400 and 'predictionDate' in body['error']
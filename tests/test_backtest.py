@@ -0,0 +1,51 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import ohlcv_store
+from fake_market import synthetic_ohlcv
+from ohlcv_store import OHLCVStore
+
+
+@pytest.fixture
+def offline_store(tmp_path):
+    previous = ohlcv_store.get_store()
+    # Bars up to 2024-06-28, as if the backtest ran before the next session's close is known
+    store = OHLCVStore(str(tmp_path / 'ohlcv.sqlite3'), today=lambda: date(2024, 7, 1),
+                       fetcher=lambda symbol, start, end: synthetic_ohlcv(symbol, start, min(end, date(2024, 7, 1))))
+    ohlcv_store.set_store(store)
+    yield store
+    ohlcv_store.set_store(previous)
+
+
+def test_rows_score_the_next_day(offline_store):
+    results = backtest.backtest_symbol('TCS', '2024-05-01', '2024-06-28')
+
+    assert len(results) == len(pd.bdate_range('2024-05-01', '2024-06-28'))
+    # Each day's forecast is compared with the following trading day's close
+    assert (results['next_close'].iloc[:-1].to_numpy() == results['close'].iloc[1:].to_numpy()).all()
+    np.testing.assert_allclose(results['forecast_price'], results['close'] * (1 + results['predicted_roc'] / 100))
+    # /predict parity: the price is built on the previous close
+    np.testing.assert_allclose(results['estimated_price'], results['prev_close'] * (1 + results['predicted_roc'] / 100))
+    # The last day's next close is not known yet
+    assert np.isnan(results['next_close'].iloc[-1])
+    assert backtest.summarize(results)['days'] == len(results) - 1
+
+
+def test_summarize_uses_the_next_close_only():
+    results = pd.DataFrame({
+        'prev_close': [90.0, 100.0, 100.0],
+        'close': [100.0, 100.0, 100.0],
+        'predicted_roc': [1.0, -2.0, 5.0],
+        'forecast_price': [101.0, 98.0, 105.0],
+        'next_close': [103.0, 99.0, np.nan],
+        'next_day_roc': [3.0, -1.0, np.nan],
+    })
+    summary = backtest.summarize(results)
+    assert summary['days'] == 2
+    assert summary['mae'] == pytest.approx(1.5)
+    assert summary['roc_mae'] == pytest.approx(1.5)
+    assert summary['hit_rate'] == 100.0
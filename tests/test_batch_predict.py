@@ -0,0 +1,32 @@
+def test_bad_items_get_their_own_error(app_module):
+    client = app_module.app.test_client()
+    response = client.post('/predict/batch', json={'requests': [
+        {'companySymbol': 'TCS', 'predictionDate': 20240628},
+        {'companySymbol': 'TCS', 'predictionDate': '2024-06-28'},
+        {'companySymbol': 'INFY', 'predictionDate': '2024-13-01'},
+        {'companySymbol': 'INFY', 'predictionDate': None},
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 4 and body['scored'] == 1
+    first, second, third, fourth = body['predictions']
+    assert first['predictionDate'] == 20240628 and first['error'].startswith('Invalid date')
+    assert second['estimatedPrice'] > 0
+    assert third['error'].startswith('Invalid date') and fourth['error'].startswith('Invalid date')
+
+
+def test_batch_matches_single_predictions(app_module):
+    client = app_module.app.test_client()
+    body = client.post('/predict/batch', json={'companySymbols': ['TCS', 'SBIN'], 'startDate': '2024-06-24',
+                                               'endDate': '2024-06-28'}).get_json()
+    assert body['count'] == 10 and body['scored'] == 10
+    for row in body['predictions']:
+        single = client.post('/predict', json={'companySymbol': row['companySymbol'],
+                                               'predictionDate': row['predictionDate']}).get_json()
+        assert abs(single['estimatedPrice'] - row['estimatedPrice']) < 1e-6
+
+
+def test_malformed_batch_is_a_400(app_module):
+    client = app_module.app.test_client()
+    assert client.post('/predict/batch', json={'requests': [{'companySymbol': 'TCS'}]}).status_code == 400
+    assert client.post('/predict/batch', json={'requests': []}).status_code == 400
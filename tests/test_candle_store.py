@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+
+from candle_store import CandleStore, convert_json_tree, to_arrays, to_candles
+
+# 2025-01-31 15:29 IST and the first minutes of February in IST (still January 31 in UTC)
+JAN_LAST = 1738317540
+FEB_FIRST = 1738348200
+
+
+def candles(timestamps, price=100.0):
+    return [[ts, price, price + 1, price - 1, price, 1000] for ts in timestamps]
+
+
+def test_to_arrays_sorts_and_keeps_the_last_duplicate():
+    timestamps, values = to_arrays(candles([120, 60]) + [[60, 5, 6, 4, 5, 7]])
+    assert timestamps.tolist() == [60, 120]
+    assert values[:, 0].tolist() == [5, 6, 4, 5, 7]
+    assert to_candles(timestamps, values)[0] == [60, 5.0, 6.0, 4.0, 5.0, 7.0]
+
+
+def test_empty_input(tmp_path):
+    store = CandleStore(str(tmp_path))
+    timestamps, values = to_arrays([])
+    assert timestamps.shape == (0,) and values.shape == (5, 0)
+    assert store.write('TCS', '1m', []) == 0
+    assert store.count('TCS', '1m') == 0 and store.newest_timestamp('TCS', '1m') is None
+
+
+def test_merge_deduplicates_and_newer_rows_win(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('TCS', '1m', candles([JAN_LAST - 60, JAN_LAST]))
+    store.write('TCS', '1m', candles([JAN_LAST, FEB_FIRST], price=200.0))
+
+    timestamps, values = store.read('TCS', '1m')
+    assert timestamps.tolist() == [JAN_LAST - 60, JAN_LAST, FEB_FIRST]
+    assert values[3].tolist() == [100.0, 200.0, 200.0]
+    # Months follow the IST calendar
+    assert store.months('TCS', '1m') == ['2025-01', '2025-02']
+    assert store.oldest_timestamp('TCS', '1m') == JAN_LAST - 60
+    assert store.newest_timestamp('TCS', '1m') == FEB_FIRST
+
+
+def test_replace_drops_the_stored_series(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('TCS', '1m', candles([JAN_LAST - 60, JAN_LAST, FEB_FIRST]))
+    store.write('TCS', '1m', candles([JAN_LAST]), replace=True)
+
+    assert store.read('TCS', '1m')[0].tolist() == [JAN_LAST]
+    assert store.months('TCS', '1m') == ['2025-01']
+
+
+def test_remove_drops_only_the_given_timestamps(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('TCS', '1m', candles([JAN_LAST - 60, JAN_LAST, FEB_FIRST]))
+    assert store.remove('TCS', '1m', [JAN_LAST, FEB_FIRST, FEB_FIRST + 60]) == 2
+    assert store.read('TCS', '1m')[0].tolist() == [JAN_LAST - 60]
+    assert store.remove('TCS', '1m', []) == 0
+
+
+def test_read_slices_are_half_open_views(tmp_path):
+    store = CandleStore(str(tmp_path))
+    minutes = list(range(JAN_LAST - 600, JAN_LAST + 1, 60))
+    store.write('TCS', '1m', candles(minutes))
+
+    timestamps, values = store.read('TCS', '1m', minutes[2], minutes[5])
+    assert timestamps.tolist() == minutes[2:5]
+    assert isinstance(timestamps.base, np.memmap) or isinstance(timestamps, np.memmap)
+    assert store.read('TCS', '1m', JAN_LAST + 1, FEB_FIRST)[0].size == 0
+    assert store.read('TCS', '1m', JAN_LAST, FEB_FIRST + 1)[0].tolist() == [JAN_LAST]
+
+
+def test_convert_json_tree(tmp_path):
+    (tmp_path / 'TCS').mkdir()
+    with open(tmp_path / 'TCS' / 'TCS_1m.json', 'w') as f:
+        json.dump(candles([JAN_LAST, JAN_LAST - 60, JAN_LAST]), f, indent=2)
+
+    assert convert_json_tree(str(tmp_path), remove_json=True, log=lambda *args: None) == 1
+    assert CandleStore(str(tmp_path)).count('TCS', '1m') == 2
+    assert not (tmp_path / 'TCS' / 'TCS_1m.json').exists()
@@ -0,0 +1,81 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import feature_pipeline
+from candle_store import CandleStore
+from fake_market import synthetic_groww_candles
+from feature_pipeline import build_dataset, build_symbol, load_dataset, load_symbol
+from features import build_feature_rows
+from groww_fixtures import IST
+
+
+def write_archive(root, symbols, days, minutes=False):
+    store = CandleStore(str(root))
+    end = datetime(2025, 6, 30, tzinfo=IST)
+    end_ms, start_ms = int(end.timestamp() * 1000), int((end - timedelta(days=days)).timestamp() * 1000)
+    for symbol in symbols:
+        store.write(symbol, '1d', synthetic_groww_candles(symbol, start_ms, end_ms, 1440))
+        if minutes:
+            store.write(symbol, '1m', synthetic_groww_candles(symbol, start_ms, end_ms, 1))
+    return store
+
+
+def test_rows_match_in_memory_features(tmp_path):
+    store = write_archive(tmp_path / 'archive', ['TCS'], 700)
+    rows = build_symbol(str(tmp_path / 'archive'), str(tmp_path / 'out'), 'TCS')
+    dates, features, target = load_symbol(str(tmp_path / 'out'), 'TCS')
+
+    ts, values = store.read('TCS', '1d')
+    ohlcv = pd.DataFrame(values.T, index=pd.to_datetime((ts + 19800) // 86400, unit='D'),
+                         columns=['open', 'high', 'low', 'close', 'volume'])
+    reference, _ = build_feature_rows(ohlcv, pd.DatetimeIndex(dates))
+    close = ohlcv['close']
+    expected_target = ((close.shift(-1) / close - 1) * 100).loc[pd.DatetimeIndex(dates)].to_numpy()
+
+    assert rows == len(dates) > 300
+    # The last bar has no next close yet
+    assert dates[-1] < np.datetime64(ohlcv.index[-1].date())
+    assert np.allclose(features, reference, rtol=1e-3, atol=1e-6)
+    assert np.allclose(target, expected_target)
+
+
+def test_minute_source_equals_daily_source(tmp_path):
+    write_archive(tmp_path / 'archive', ['TCS'], 200, minutes=True)
+    build_symbol(str(tmp_path / 'archive'), str(tmp_path / '1d'), 'TCS', source='1d')
+    build_symbol(str(tmp_path / 'archive'), str(tmp_path / '1m'), 'TCS', source='1m')
+    daily, minute = load_symbol(str(tmp_path / '1d'), 'TCS'), load_symbol(str(tmp_path / '1m'), 'TCS')
+
+    assert len(daily[0]) > 0 and np.array_equal(daily[0], minute[0])
+    assert np.allclose(daily[1], minute[1], rtol=1e-9) and np.allclose(daily[2], minute[2], rtol=1e-9)
+
+
+def test_failed_build_keeps_the_previous_dataset(tmp_path, monkeypatch):
+    write_archive(tmp_path / 'archive', ['TCS'], 700)
+    rows = build_symbol(str(tmp_path / 'archive'), str(tmp_path / 'out'), 'TCS')
+
+    daily_chunks = feature_pipeline.daily_chunks
+
+    def broken_chunks(store, symbol, source='1d'):
+        yield from list(daily_chunks(store, symbol, source))[:3]
+        raise OSError("archive unreadable")
+
+    monkeypatch.setattr(feature_pipeline, 'daily_chunks', broken_chunks)
+    with pytest.raises(OSError):
+        build_symbol(str(tmp_path / 'archive'), str(tmp_path / 'out'), 'TCS')
+
+    assert os.listdir(tmp_path / 'out') == ['TCS']
+    assert len(load_symbol(str(tmp_path / 'out'), 'TCS')[0]) == rows
+
+
+def test_dataset_concatenates_symbols(tmp_path):
+    write_archive(tmp_path / 'archive', ['TCS', 'SBIN'], 400)
+    counts = build_dataset(str(tmp_path / 'archive'), str(tmp_path / 'out'), workers=1)
+    X, y, dates, symbols = load_dataset(str(tmp_path / 'out'))
+
+    assert sorted(counts) == ['SBIN', 'TCS']
+    assert len(X) == len(y) == len(dates) == sum(counts.values())
+    assert (symbols == 'SBIN').sum() == counts['SBIN']
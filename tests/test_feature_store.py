@@ -0,0 +1,65 @@
+from datetime import date
+
+import pandas as pd
+
+from fake_market import synthetic_ohlcv
+from feature_store import FeatureStore
+from ohlcv_store import normalize_ohlcv
+
+TODAY = date(2025, 7, 2)  # a Wednesday
+
+
+class Bars:
+    """get_ohlcv over synthetic bars that only reach `published` (inclusive)."""
+
+    def __init__(self, published):
+        self.published = pd.Timestamp(published)
+
+    def __call__(self, symbol, start, end):
+        bars = normalize_ohlcv(synthetic_ohlcv(symbol, start, end))
+        return bars[bars.index <= self.published]
+
+
+def test_late_bar_is_picked_up_by_the_next_extend(tmp_path):
+    bars = Bars('2025-06-30')
+    store = FeatureStore(bars, str(tmp_path), history_days=200, today=lambda: TODAY)
+
+    assert store.get_features('TEST.NS', '2025-07-01') is None
+    assert store.get_features('TEST.NS', '2025-06-30')[1] == date(2025, 6, 30)
+
+    bars.published = pd.Timestamp('2025-07-01')
+    row, row_date = store.get_features('TEST.NS', '2025-07-01')
+    assert row_date == date(2025, 7, 1)
+
+    rebuilt = FeatureStore(bars, str(tmp_path / 'rebuilt'), history_days=200, today=lambda: TODAY)
+    assert (rebuilt.get_features('TEST.NS', '2025-07-01')[0] == row).all()
+
+
+def test_trailing_weekend_is_covered(tmp_path):
+    store = FeatureStore(Bars('2025-06-27'), str(tmp_path), history_days=200, today=lambda: date(2025, 6, 30))
+
+    store.build('TEST.NS')
+
+    assert store._read_state('TEST.NS')['complete_through'] == '2025-06-29'
+    assert store.lookup('TEST.NS', '2025-06-29')[1] == date(2025, 6, 27)
+
+
+def test_trailing_holidays_are_covered(tmp_path):
+    bars = Bars('2025-07-01')
+    store = FeatureStore(bars, str(tmp_path), history_days=200, today=lambda: date(2025, 7, 4),
+                         holidays={date(2025, 7, 2), date(2025, 7, 3)})
+
+    store.build('TEST.NS')
+
+    assert store._read_state('TEST.NS')['complete_through'] == '2025-07-03'
+    assert store.get_features('TEST.NS', '2025-07-03')[1] == date(2025, 7, 1)
+
+
+def test_build_without_bars_is_redone(tmp_path):
+    bars = Bars('2000-01-01')
+    store = FeatureStore(bars, str(tmp_path), history_days=200, today=lambda: TODAY)
+    assert store.build('TEST.NS') == 0
+
+    bars.published = pd.Timestamp(TODAY)
+    assert store.extend('TEST.NS') > 100
+    assert store.lookup('TEST.NS', '2025-07-01')[1] == date(2025, 7, 1)
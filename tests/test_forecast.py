@@ -0,0 +1,72 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ohlcv_store
+from fake_market import synthetic_ohlcv
+from forecast import next_trading_day, roll_forward
+from indicators import IndicatorEngine
+
+LAST_BAR = pd.Timestamp('2024-05-31')  # a Friday
+
+
+def engine_through(last_bar):
+    engine = IndicatorEngine()
+    bars = ohlcv_store.normalize_ohlcv(synthetic_ohlcv('TEST.NS', last_bar - pd.Timedelta(days=400), last_bar + pd.Timedelta(days=1)))
+    engine.update_frame(bars)
+    return engine
+
+
+def test_next_trading_day_skips_weekends_and_holidays():
+    assert next_trading_day(date(2024, 5, 31)) == date(2024, 6, 3)
+    assert next_trading_day(date(2024, 5, 31), {date(2024, 6, 3)}) == date(2024, 6, 4)
+
+
+def test_path_length_and_days():
+    engine = engine_through(LAST_BAR)
+    count = engine.count
+    path = roll_forward(engine, lambda rows: np.full(len(rows), 1.0), date(2024, 6, 1), 5, {date(2024, 6, 5)})
+
+    # Starts on the Monday after a Saturday, skips the holiday, and leaves the engine as it was
+    assert [day for day, _, _ in path] == [date(2024, 6, 3), date(2024, 6, 4), date(2024, 6, 6),
+                                           date(2024, 6, 7), date(2024, 6, 10)]
+    assert engine.count == count
+    closes = [close for _, _, close in path]
+    assert np.allclose(closes, engine.closes[-1] * 1.01 ** np.arange(1, 6))
+
+
+@pytest.fixture
+def client(app_module):
+    cutoff = LAST_BAR + pd.Timedelta(days=1)
+
+    def fetcher(symbol, start, end):
+        if symbol.startswith('UNKNOWN'):
+            return pd.DataFrame()
+        return synthetic_ohlcv(symbol, start, min(pd.Timestamp(end), cutoff))
+
+    ohlcv_store.get_store().fetcher = fetcher
+    return app_module.app.test_client()
+
+
+def test_first_step_equals_predict(client):
+    body = client.post('/predict/horizon', json={'companySymbol': 'TCS', 'predictionDate': '2024-06-03',
+                                                 'horizon': 10}).get_json()
+    single = client.post('/predict', json={'companySymbol': 'TCS', 'predictionDate': '2024-06-03'}).get_json()
+
+    assert body['horizon'] == 10 and len(body['path']) == 10
+    assert body['path'][0]['date'] == '2024-06-03'
+    assert body['path'][0]['estimatedPrice'] == pytest.approx(single['estimatedPrice'], rel=1e-12)
+
+
+@pytest.mark.parametrize('payload', [
+    {'companySymbol': 'TCS', 'predictionDate': '2024-06-03', 'horizon': 0},
+    {'companySymbol': 'TCS', 'predictionDate': '2024-06-03', 'horizon': 61},
+    {'companySymbol': 'TCS', 'predictionDate': '2024-06-03', 'horizon': 'five'},
+    {'companySymbol': 'TCS', 'predictionDate': '3 June'},
+    {'companySymbol': 'UNKNOWN', 'predictionDate': '2024-06-03'},
+])
+def test_bad_requests_are_400(client, payload):
+    response = client.post('/predict/horizon', json=payload)
+    assert response.status_code == 400 and 'error' in response.get_json()
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from candle_store import to_arrays
+from fake_groww_server import start_server
+from fake_market import synthetic_groww_candles
+from groww_fetch import ChunkLedger, FetchEngine, GrowwClient, TokenBucket, plan_chunks_ms
+
+DAY_MS = 86400 * 1000
+
+
+@pytest.fixture
+def server():
+    server, base_url = start_server()
+    server.base_url = base_url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def recent_chunks(days=12, chunk_days=3):
+    end_ms = int(time.time() * 1000) // DAY_MS * DAY_MS
+    return end_ms - days * DAY_MS, end_ms, plan_chunks_ms(end_ms - days * DAY_MS, end_ms, chunk_days)
+
+
+def make_engine(server, ledger=None, **client_kwargs):
+    client_kwargs = dict(dict(rate=200, max_retries=0, backoff=0.01), **client_kwargs)
+    return FetchEngine(GrowwClient(server.base_url, **client_kwargs), ledger, max_workers=4, max_empty=None,
+                       log=lambda *args: None)
+
+
+def test_plan_chunks_cover_the_range_newest_first():
+    chunks = plan_chunks_ms(0, 10 * DAY_MS + 5, 3)
+    assert chunks[0] == (7 * DAY_MS + 5, 10 * DAY_MS + 5)
+    assert chunks[-1][0] == 0
+    assert all(newer[0] == older[1] for newer, older in zip(chunks, chunks[1:]))
+
+
+def test_fetch_all_returns_every_candle(server):
+    start_ms, end_ms, chunks = recent_chunks()
+    engine = make_engine(server)
+    try:
+        results = engine.fetch_all([('TCS', '1m', 1, chunks)])
+    finally:
+        engine.close()
+
+    fetched, _ = to_arrays(results[('TCS', '1m')])
+    expected, _ = to_arrays(synthetic_groww_candles('TCS', start_ms, end_ms, 1))
+    assert len(fetched) > 0 and (fetched == expected).all()
+    assert {engine.ledger.status('TCS', '1m', *chunk) for chunk in chunks} <= {'ok', 'empty'}
+    assert server.request_count == len(chunks)
+
+
+def test_failed_chunks_are_recorded_and_retried(server, tmp_path):
+    _, _, chunks = recent_chunks()
+    ledger = ChunkLedger(str(tmp_path / 'ledger.json'))
+    server.fail_rate = 1.0
+    engine = make_engine(server, ledger)
+    try:
+        assert engine.fetch_all([('TCS', '1m', 1, chunks)])[('TCS', '1m')] == []
+        assert sorted(ChunkLedger(ledger.path).failed()) == sorted(('TCS', '1m', *chunk) for chunk in chunks)
+
+        server.fail_rate = 0.0
+        recovered = engine.retry_failed({'1m': 1})
+    finally:
+        engine.close()
+    assert len(recovered[('TCS', '1m')]) > 0
+    assert ledger.failed() == []
+
+
+def test_throttled_requests_are_retried(server):
+    _, _, chunks = recent_chunks(days=24)
+    server.max_rate = 3
+    engine = make_engine(server, max_retries=8, backoff=0.1)
+    try:
+        engine.fetch_all([('TCS', '1m', 1, chunks)])
+    finally:
+        engine.close()
+    assert server.throttled > 0
+    assert engine.ledger.failed() == []
+
+
+def test_forget_keeps_only_the_requested_failures():
+    ledger = ChunkLedger()
+    ledger.record('TCS', '1m', 0, 1, 'failed')
+    ledger.record('TCS', '1m', 1, 2, 'failed')
+    ledger.record('TCS', '1m', 2, 3, 'ok', count=5)
+    ledger.record('INFY', '1m', 0, 1, 'failed')
+
+    ledger.forget('TCS', '1m')
+    assert sorted(ledger.failed()) == [('INFY', '1m', 0, 1), ('TCS', '1m', 0, 1), ('TCS', '1m', 1, 2)]
+    assert ledger.status('TCS', '1m', 2, 3) is None
+
+    # A replaced series keeps only the failures of the run that replaced it
+    ledger.forget('TCS', '1m', keep_failed=[(1, 2)])
+    assert sorted(ledger.failed()) == [('INFY', '1m', 0, 1), ('TCS', '1m', 1, 2)]
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.19
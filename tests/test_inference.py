@@ -0,0 +1,64 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from fake_market import synthetic_ohlcv
+from features import build_feature_rows, required_features
+from inference import load_model
+from ohlcv_store import normalize_ohlcv
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Backend', 'roc_model3.pkl')
+
+
+@pytest.fixture(scope='module')
+def sklearn_model():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope='module')
+def rows():
+    ohlcv = normalize_ohlcv(synthetic_ohlcv('RELIANCE.NS', '2022-01-01', '2024-12-31'))
+    X, _ = build_feature_rows(ohlcv, ohlcv.index[300:])
+    X = X[~np.isnan(X).any(axis=1)]
+    # Missing values in every column, routed by each split's own missing rule
+    X[np.random.default_rng(0).random(X.shape) < 0.05] = np.nan
+    X[::7, 0] = 0.0
+    return X
+
+
+def test_compiled_trees_match_the_booster_exactly(tmp_path, sklearn_model, rows):
+    model = load_model(MODEL_PATH, 'v1', str(tmp_path))
+    expected = sklearn_model.predict(pd.DataFrame(rows, columns=required_features))
+
+    assert np.array_equal(model.compiled.predict(rows), expected)
+    assert np.array_equal(model.compiled.predict(rows[0]), expected[:1])
+    assert np.array_equal(model.compiled.predict(rows.astype(np.float32)),
+                          sklearn_model.predict(pd.DataFrame(rows.astype(np.float32), columns=required_features)))
+
+
+def test_cached_arrays_round_trip(tmp_path, sklearn_model, rows):
+    first = load_model(MODEL_PATH, 'v1', str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ['v1.npz', 'v1.txt']
+
+    cached = load_model(MODEL_PATH, 'v1', str(tmp_path))
+    # Served from the .npz without unpickling; the booster is only loaded on demand
+    assert not cached.native_loaded
+    assert np.array_equal(cached.predict(rows[:3]), first.compiled.predict(rows[:3]))
+    assert np.array_equal(cached.predict(rows), sklearn_model.predict(pd.DataFrame(rows, columns=required_features)))
+    assert cached.native_loaded
+
+
+def test_new_version_rebuilds_the_cache(tmp_path, rows):
+    load_model(MODEL_PATH, 'v1', str(tmp_path))
+    os.remove(tmp_path / 'v1.txt')
+
+    # A changed model hash, or a half-written cache, goes back to the pickle
+    rebuilt = load_model(MODEL_PATH, 'v2', str(tmp_path))
+    assert rebuilt.version == 'v2' and rebuilt.native_loaded
+    assert {'v2.npz', 'v2.txt'} <= set(os.listdir(tmp_path))
+    assert load_model(MODEL_PATH, 'v1', str(tmp_path)).native_loaded
+    assert np.array_equal(load_model(MODEL_PATH, 'v2', str(tmp_path)).compiled.predict(rows),
+                          rebuilt.compiled.predict(rows))
@@ -0,0 +1,55 @@
+import functools
+import sys
+
+import pytest
+
+import NseDatafetcher
+from candle_store import CandleStore
+from fake_groww_server import start_server
+from groww_fetch import GrowwClient
+
+
+@pytest.fixture
+def server():
+    server, base_url = start_server(history_days={1: 30})
+    server.base_url = base_url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def run(server, tmp_path, monkeypatch, capsys):
+    # Fail fast instead of backing off for seconds per chunk
+    monkeypatch.setattr(NseDatafetcher, 'GrowwClient', functools.partial(GrowwClient, max_retries=0))
+
+    def run(*args):
+        monkeypatch.setattr(sys, 'argv', ['NseDatafetcher.py', '--symbols', 'TCS', '--intervals', '1m',
+                                          '--output', str(tmp_path), '--base-url', server.base_url,
+                                          '--rate', '1000', *args])
+        NseDatafetcher.main()
+        capsys.readouterr()
+        return CandleStore(str(tmp_path)).count('TCS', '1m')
+
+    return run
+
+
+def test_failed_full_run_keeps_stored_candles(server, run):
+    stored = run()
+    assert stored > 0
+
+    server.fail_rate = 1.0
+    assert run() == stored
+
+    server.fail_rate = 0.0
+    assert run('--retry-failed') == stored
+
+
+def test_complete_full_run_replaces_and_clears_old_failures(server, run, tmp_path):
+    server.fail_rate = 1.0
+    run()
+    server.fail_rate = 0.0
+    stored = run()
+
+    ledger = NseDatafetcher.ChunkLedger(str(tmp_path / '_chunk_ledger.json'))
+    assert stored > 0 and ledger.entries == {}
@@ -0,0 +1,113 @@
+from datetime import date
+
+import pandas as pd
+
+from fake_market import synthetic_ohlcv
+from ohlcv_store import OHLCVStore
+
+TODAY = date(2025, 7, 2)  # a Wednesday
+
+
+class StubFetcher:
+    """Answers each call with the next frame in `responses` (None: the synthetic bars for the range)."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((start, end))
+        response = self.responses.pop(0) if self.responses else None
+        return synthetic_ohlcv(symbol, start, end) if response is None else response
+
+
+def make_store(tmp_path, fetcher, today=TODAY, **kwargs):
+    return OHLCVStore(str(tmp_path / 'ohlcv.sqlite3'), fetcher=fetcher, today=lambda: today, **kwargs)
+
+
+def test_empty_fetch_is_fetched_again(tmp_path):
+    fetcher = StubFetcher(pd.DataFrame())
+    store = make_store(tmp_path, fetcher)
+
+    assert store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-01').empty
+    bars = store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-01')
+
+    assert len(fetcher.calls) == 2
+    assert len(bars) == 21
+    assert bars.index[-1] == pd.Timestamp('2025-06-30')
+
+
+def test_late_bar_is_fetched_once_published(tmp_path):
+    # Yesterday's bar is missing from the first answer, as before it is published
+    fetcher = StubFetcher(synthetic_ohlcv('TEST.NS', '2025-06-02', '2025-07-01'))
+    store = make_store(tmp_path, fetcher)
+
+    first = store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-02')
+    second = store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-02')
+
+    assert first.index[-1] == pd.Timestamp('2025-06-30')
+    assert fetcher.calls[1] == (date(2025, 7, 1), date(2025, 7, 2))
+    assert second.index[-1] == pd.Timestamp('2025-07-01')
+
+
+def test_covered_range_is_served_from_disk(tmp_path):
+    fetcher = StubFetcher()
+    store = make_store(tmp_path, fetcher)
+
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-02')
+    bars = store.get_ohlcv('TEST.NS', '2025-06-09', '2025-06-21')
+
+    assert len(fetcher.calls) == 1
+    assert bars.index[0] == pd.Timestamp('2025-06-09') and bars.index[-1] == pd.Timestamp('2025-06-20')
+
+
+def test_weekend_only_gap_is_not_fetched(tmp_path):
+    fetcher = StubFetcher()
+    store = make_store(tmp_path, fetcher, today=date(2025, 6, 30))  # a Monday
+
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-06-28')
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-06-30')
+
+    assert len(fetcher.calls) == 1
+
+
+def test_holiday_only_gap_is_not_fetched(tmp_path):
+    fetcher = StubFetcher()
+    holidays = {date(2025, 7, 2), date(2025, 7, 3)}
+    store = make_store(tmp_path, fetcher, today=date(2025, 7, 4), holidays=holidays)
+
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-02')
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-04')
+
+    assert len(fetcher.calls) == 1
+
+
+def test_settled_empty_range_is_covered(tmp_path):
+    # Listed on 2025-01-01: earlier ranges come back empty for good
+    fetcher = StubFetcher(None, pd.DataFrame(), pd.DataFrame())
+    store = make_store(tmp_path, fetcher)
+
+    store.get_ohlcv('TEST.NS', '2025-01-01', '2025-07-01')
+    assert store.get_ohlcv('TEST.NS', '2024-06-03', '2025-07-01').index[0] == pd.Timestamp('2025-01-01')
+    store.get_ohlcv('TEST.NS', '2024-06-03', '2025-07-01')
+    assert fetcher.calls[1] == (date(2024, 6, 3), date(2025, 1, 1)) and len(fetcher.calls) == 2
+
+
+def test_recent_empty_range_stays_missing(tmp_path):
+    fetcher = StubFetcher(None, pd.DataFrame())
+    store = make_store(tmp_path, fetcher)
+
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-06-27')
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-02')
+    store.get_ohlcv('TEST.NS', '2025-06-02', '2025-07-02')
+
+    assert fetcher.calls[1:] == [(date(2025, 6, 27), date(2025, 7, 2))] * 2
+
+
+def test_unshared_store_matches_segments(tmp_path):
+    shared = make_store(tmp_path, StubFetcher())
+    plain = OHLCVStore(str(tmp_path / 'plain.sqlite3'), fetcher=StubFetcher(), today=lambda: TODAY,
+                       shared_segments=False)
+
+    pd.testing.assert_frame_equal(shared.get_ohlcv('TEST.NS', '2025-01-01', '2025-07-02'),
+                                  plain.get_ohlcv('TEST.NS', '2025-01-01', '2025-07-02'), check_freq=False)
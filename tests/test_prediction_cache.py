@@ -0,0 +1,73 @@
+import os
+from datetime import date, datetime
+
+from prediction_cache import IST, PredictionCache, expires_at, next_session_close, parse_holidays
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=IST).timestamp()
+
+
+def test_past_dates_never_expire_and_today_expires_at_the_close():
+    now = ist(2025, 7, 2, 10, 0)  # Wednesday
+    assert expires_at('2025-07-01', now) is None
+    assert expires_at('2025-07-02', now) == ist(2025, 7, 2, 15, 30)
+    # After the close the next session is Thursday's; Friday evening rolls over the weekend
+    assert next_session_close(ist(2025, 7, 2, 16, 0)) == ist(2025, 7, 3, 15, 30)
+    assert next_session_close(ist(2025, 7, 4, 16, 0)) == ist(2025, 7, 7, 15, 30)
+
+
+def test_holidays_are_skipped():
+    holidays = parse_holidays('2025-07-03, 2025-07-04')
+    assert holidays == {date(2025, 7, 3), date(2025, 7, 4)}
+    assert next_session_close(ist(2025, 7, 2, 16, 0), holidays) == ist(2025, 7, 7, 15, 30)
+
+
+def test_key_normalizes_the_date():
+    assert PredictionCache.key('TCS.NS', '2025-7-1', 'v1') == PredictionCache.key('TCS.NS', '2025-07-01', 'v1')
+    # Unparseable dates are left for the prediction route to reject
+    assert PredictionCache.key('TCS.NS', 'soon', 'v1') == ('TCS.NS', 'soon', 'v1')
+
+
+def test_entries_expire_at_the_session_close():
+    clock = [ist(2025, 7, 2, 10, 0)]
+    cache = PredictionCache(max_entries=10, clock=lambda: clock[0])
+    key = cache.key('TCS.NS', '2025-07-02', 'v1')
+    cache.put(key, {'estimatedPrice': 1.0}, '2025-07-02')
+    assert cache.get(key) == {'estimatedPrice': 1.0}
+
+    clock[0] = ist(2025, 7, 2, 15, 31)
+    assert cache.get(key) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2, clock=lambda: ist(2025, 7, 2, 10, 0))
+    keys = [cache.key(symbol, '2025-07-01', 'v1') for symbol in ('A', 'B', 'C')]
+    cache.put(keys[0], 0, '2025-07-01')
+    cache.put(keys[1], 1, '2025-07-01')
+    cache.get(keys[0])
+    cache.put(keys[2], 2, '2025-07-01')
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == 0 and cache.get(keys[2]) == 2
+
+
+def test_disk_tier_is_shared_and_bounded(tmp_path):
+    now = lambda: ist(2025, 7, 2, 10, 0)
+    writer = PredictionCache(max_entries=0, directory=str(tmp_path), clock=now, max_disk_entries=10)
+    reader = PredictionCache(max_entries=10, directory=str(tmp_path), clock=now)
+
+    first = writer.key('KEEP', '2025-07-01', 'v1')
+    writer.put(first, 'kept', '2025-07-01')
+    for i in range(30):
+        key = writer.key(f'S{i}', '2025-07-01', 'v1')
+        writer.put(key, i, '2025-07-01')
+        # A hit refreshes the file's mtime, so the first entry stays the most recently used
+        os.utime(writer._disk_path(key), (now() - 1000 + i, now() - 1000 + i))
+        assert reader.get(first) == 'kept'
+        reader.clear()
+
+    assert len(os.listdir(tmp_path)) <= 10
+    assert writer.stats()['disk_evictions'] >= 21
+    assert reader.get(first) == 'kept'
@@ -0,0 +1,109 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from candle_store import CandleStore, to_arrays
+from check_resample_parity import pandas_reference
+from fake_market import synthetic_groww_candles, synthetic_minute_candles
+from groww_fixtures import IST, compare_resampled, default_first_day, fixture_paths, load_fixture, record
+from resample import DERIVED_INTERVALS, read_resampled, refresh_derived, resample, session_day_end
+
+
+def ist_ms(*args):
+    return int(datetime(*args, tzinfo=IST).timestamp() * 1000)
+
+
+@pytest.fixture(scope='module')
+def recorded_paths(tmp_path_factory):
+    paths = fixture_paths()
+    if not paths and os.environ.get('STOCKSIGHT_RECORD_GROWW'):
+        directory = str(tmp_path_factory.mktemp('groww'))
+        record(['TCS'], default_first_day(), 7, directory=directory)
+        paths = fixture_paths(directory)
+    if not paths:
+        pytest.skip("no recorded Groww candles; run `python benchmarks/groww_fixtures.py` "
+                    "or set STOCKSIGHT_RECORD_GROWW=1 with network access")
+    return paths
+
+
+def test_matches_recorded_api_candles(recorded_paths):
+    for path in recorded_paths:
+        fixture = load_fixture(path)
+        for label, report in compare_resampled(fixture).items():
+            name = f"{os.path.basename(path)} {label}"
+            assert report['missing'] == [] and report['extra'] == [], f"{name} bucket alignment"
+            for column, diff in report['max_diff'].items():
+                assert diff < 0.005, f"{name} {column} differs by up to {diff}"
+
+
+@pytest.mark.parametrize('label', list(DERIVED_INTERVALS))
+def test_matches_pandas_with_gaps(label):
+    # Starts mid-session and mid-bucket, with a fifth of the minutes missing
+    candles = synthetic_minute_candles('TCS', ist_ms(2024, 5, 27, 11, 2), ist_ms(2024, 7, 3, 16, 0))
+    ts, values = to_arrays(candles[np.random.default_rng(0).random(len(candles)) > 0.2])
+
+    got_ts, got_values = resample(ts, values, DERIVED_INTERVALS[label])
+    ref_ts, ref_values = pandas_reference(ts, values, DERIVED_INTERVALS[label])
+    assert np.array_equal(got_ts, ref_ts)
+    assert np.array_equal(got_values, ref_values)
+
+
+def test_out_of_session_minutes_are_ignored():
+    candles = synthetic_minute_candles('TCS', ist_ms(2024, 7, 1, 9, 15), ist_ms(2024, 7, 1, 15, 29))
+    pre_open = [[int(candles[0][0]) - 600, 1.0, 1e6, 0.0, 1.0, 1e9]]
+    ts, values = to_arrays(np.vstack([pre_open, candles]))
+
+    daily_ts, daily = resample(ts, values, 1440)
+    assert daily_ts.tolist() == [ist_ms(2024, 7, 1, 9, 15) // 1000]
+    assert daily[4, 0] == candles[:, 5].sum() and daily[1, 0] == candles[:, 2].max()
+
+
+def test_read_resampled_reads_whole_buckets(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write('TCS', '1m', synthetic_minute_candles('TCS', ist_ms(2024, 7, 1, 0, 0), ist_ms(2024, 7, 2, 23, 59)))
+
+    ts, values = read_resampled(store, 'TCS', 15, ist_ms(2024, 7, 1, 9, 40) // 1000)
+    assert ts[0] == ist_ms(2024, 7, 1, 9, 30) // 1000
+    full_ts, full_values = resample(*store.read('TCS', '1m'), 15)
+    assert np.array_equal(values, full_values[:, full_ts >= ts[0]])
+    assert session_day_end(ts[0]) == ist_ms(2024, 7, 2, 0, 0) // 1000
+
+
+@pytest.mark.parametrize('stamp_hours', [0, 9.25])
+def test_daily_junction_has_one_candle_per_day(tmp_path, stamp_hours):
+    # Downloaded 1d through the first 1m day, which starts mid-session; the API's
+    # own daily stamp is taken to be midnight or the session open
+    store = CandleStore(str(tmp_path))
+    downloaded = np.array(synthetic_groww_candles('TCS', ist_ms(2024, 6, 3), ist_ms(2024, 7, 2, 23, 59), 1440))
+    downloaded[:, 0] += int((stamp_hours - 9.25) * 3600)
+    store.write('TCS', '1d', downloaded)
+    store.write('TCS', '1m', synthetic_minute_candles('TCS', ist_ms(2024, 7, 2, 11, 0), ist_ms(2024, 7, 12, 23, 59)))
+
+    refresh_derived(store, 'TCS', ['1d'], log=lambda *_: None)
+    store.write('TCS', '1m', synthetic_minute_candles('TCS', ist_ms(2024, 7, 15), ist_ms(2024, 7, 16, 23, 59)))
+    refresh_derived(store, 'TCS', ['1d'], log=lambda *_: None)
+
+    ts, values = store.read('TCS', '1d')
+    local = (ts + 19800) % 86400
+    assert np.all(local == int(stamp_hours * 3600))
+    assert len(np.unique((ts + 19800) // 86400)) == len(ts)
+    # The partial first 1m day keeps its downloaded candle; later days are derived
+    junction = ist_ms(2024, 7, 2) // 1000 + int(stamp_hours * 3600)
+    assert np.array_equal(values[:, ts == junction].ravel(), downloaded[downloaded[:, 0] == junction, 1:].ravel())
+    derived_ts, derived = resample(*store.read('TCS', '1m', ist_ms(2024, 7, 3) // 1000), 1440)
+    assert np.array_equal(values[:, ts > junction], derived)
+    assert len(derived_ts) == 10
+
+
+def test_pre_open_minutes_do_not_drop_the_first_bucket(tmp_path):
+    store = CandleStore(str(tmp_path))
+    candles = synthetic_minute_candles('TCS', ist_ms(2024, 7, 1), ist_ms(2024, 7, 2, 23, 59))
+    pre_open = candles[:3].copy()
+    pre_open[:, 0] -= 7 * 60
+    store.write('TCS', '1m', np.vstack([pre_open, candles]))
+
+    refresh_derived(store, 'TCS', ['5m', '1d'], log=lambda *_: None)
+    assert store.oldest_timestamp('TCS', '5m') == ist_ms(2024, 7, 1, 9, 15) // 1000
+    assert store.count('TCS', '1d') == 2
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import screener
+from features import required_features
+
+
+@pytest.fixture
+def universe(monkeypatch):
+    """Symbols S0..Sn whose model output is given per symbol (NaN: features unavailable)."""
+    def make(rocs):
+        rocs = np.asarray(rocs, dtype=float)
+
+        def featurize_chunk(symbols, date_str):
+            positions = [int(symbol[1:]) for symbol in symbols]
+            features = np.repeat(rocs[positions, None], len(required_features), axis=1)
+            return features, np.full(len(symbols), 100.0), {}
+
+        monkeypatch.setattr(screener, 'featurize_chunk', featurize_chunk)
+        return [f"S{i}" for i in range(len(rocs))]
+    return make
+
+
+def ranked(universe_symbols, top_k, rank='gain'):
+    result = screener.screen(universe_symbols, '2024-06-28', lambda X: X[:, 0], top_k=top_k, rank=rank, workers=1)
+    assert [row['rank'] for row in result['top']] == list(range(1, len(result['top']) + 1))
+    return [row['companySymbol'] for row in result['top']]
+
+
+def stable_sort(rocs, key, top_k):
+    """The order of a stable full sort by descending key, NaN rows left out."""
+    order = sorted((i for i in range(len(rocs)) if not np.isnan(rocs[i])), key=lambda i: -key(rocs[i]))
+    return [f"S{i}" for i in order[:top_k]]
+
+
+def test_ties_keep_universe_order(universe):
+    symbols = universe([1.0, 2.0, 2.0, 0.5, 2.0, 1.0, 2.0])
+    assert ranked(symbols, 3) == ['S1', 'S2', 'S4']
+    assert ranked(symbols, 5) == ['S1', 'S2', 'S4', 'S6', 'S0']
+
+
+def test_abs_rank_ties_between_gains_and_losses(universe):
+    symbols = universe([-2.0, 1.0, 2.0, -1.0])
+    assert ranked(symbols, 3, 'abs') == ['S0', 'S2', 'S1']
+    assert ranked(symbols, 2, 'loss') == ['S0', 'S3']
+
+
+def test_k_at_least_the_candidates(universe):
+    symbols = universe([1.0, np.nan, 3.0, 1.0])
+    assert ranked(symbols, 3) == ['S2', 'S0', 'S3']
+    assert ranked(symbols, 50) == ['S2', 'S0', 'S3']
+    assert ranked(symbols, 0) == []
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('rank', list(screener.RANK_KEYS))
+def test_matches_a_stable_full_sort(universe, seed, rank):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so most positions tie
+    rocs = rng.integers(-3, 4, size=60).astype(float)
+    rocs[rng.random(60) < 0.1] = np.nan
+    symbols = universe(rocs)
+    key = {'gain': lambda v: v, 'loss': lambda v: -v, 'abs': abs}[rank]
+    for top_k in (1, 7, 30, 60):
+        assert ranked(symbols, top_k, rank) == stable_sort(rocs, key, top_k)
@@ -0,0 +1,107 @@
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pytest
+
+from shared_cache import SegmentCache, file_lock
+
+# fork keeps the test's sys.path in the children
+fork = multiprocessing.get_context('fork')
+
+
+def publish(directory, value):
+    SegmentCache(directory).put('ohlcv.TCS.NS', {'close': np.full(4, value)}, version='v1')
+
+
+def build_once(directory, log_path, results):
+    def build():
+        with open(log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return {'close': np.arange(5.0)}
+
+    results.put(SegmentCache(directory).get_or_build('ohlcv.TCS.NS', build, 'v1')['close'].tolist())
+
+
+def hold_lock(path, log_path, seconds):
+    with file_lock(path):
+        with open(log_path, "a") as f:
+            f.write(f"start {time.time()}\n")
+        time.sleep(seconds)
+        with open(log_path, "a") as f:
+            f.write(f"end {time.time()}\n")
+
+
+def run(target, *args):
+    process = fork.Process(target=target, args=args)
+    process.start()
+    return process
+
+
+def test_reader_sees_a_segment_written_by_another_process(tmp_path):
+    cache = SegmentCache(str(tmp_path))
+    assert cache.get('ohlcv.TCS.NS', 'v1') is None
+
+    run(publish, str(tmp_path), 1.0).join()
+    assert cache.get('ohlcv.TCS.NS', 'v1')['close'].tolist() == [1.0] * 4
+
+    # A newer generation replaces the mapped one, and its old files are gone
+    run(publish, str(tmp_path), 2.0).join()
+    assert cache.get('ohlcv.TCS.NS', 'v1')['close'].tolist() == [2.0] * 4
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.npy')]) == 1
+    assert cache.get('ohlcv.TCS.NS', 'v2') is None
+
+
+def test_concurrent_misses_build_once(tmp_path):
+    log_path = str(tmp_path / 'builds.log')
+    results = fork.Queue()
+    processes = [run(build_once, str(tmp_path / 'segments'), log_path, results) for _ in range(2)]
+    for process in processes:
+        process.join(timeout=30)
+
+    assert [results.get(timeout=5) for _ in processes] == [[0.0, 1.0, 2.0, 3.0, 4.0]] * 2
+    with open(log_path) as f:
+        assert len(f.read().split()) == 1
+
+
+def test_file_lock_serializes_processes(tmp_path):
+    lock_path, log_path = str(tmp_path / 'x.lock'), str(tmp_path / 'lock.log')
+    processes = [run(hold_lock, lock_path, log_path, 0.2) for _ in range(2)]
+    for process in processes:
+        process.join(timeout=30)
+
+    with open(log_path) as f:
+        events = [line.split() for line in f]
+    assert [kind for kind, _ in events] == ['start', 'end', 'start', 'end']
+    assert float(events[2][1]) >= float(events[1][1])
+
+
+@pytest.mark.parametrize('damage', ['truncated', 'missing', 'index', 'tmp'])
+def test_damaged_segment_is_rebuilt(tmp_path, damage):
+    cache = SegmentCache(str(tmp_path))
+    cache.put('ohlcv.TCS.NS', {'close': np.arange(1000.0)}, version='v1')
+    path = next(str(tmp_path / name) for name in os.listdir(tmp_path) if name.endswith('.npy'))
+    if damage == 'truncated':
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+    elif damage == 'missing':
+        os.remove(path)
+    elif damage == 'index':
+        with open(tmp_path / 'index.json', "w") as f:
+            f.write('{"ohlcv.TCS.NS": {"vers')
+    else:
+        # A writer that died before its rename leaves only a .tmp file and no index entry
+        os.remove(path)
+        with open(tmp_path / 'index.json', "w") as f:
+            json.dump({}, f)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(b"\x93NUMPY")
+
+    fresh = SegmentCache(str(tmp_path))
+    assert fresh.get('ohlcv.TCS.NS', 'v1') is None
+    arrays = fresh.get_or_build('ohlcv.TCS.NS', lambda: {'close': np.arange(3.0)}, 'v1')
+    assert arrays['close'].tolist() == [0.0, 1.0, 2.0] and fresh.builds == 1
+    assert SegmentCache(str(tmp_path)).get('ohlcv.TCS.NS', 'v1')['close'].tolist() == [0.0, 1.0, 2.0]
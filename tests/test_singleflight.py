@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+CALLERS = 8
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_threads(flight, fn):
+    """CALLERS threads call flight.do('k', fn) at once; returns what each got (result or exception)."""
+    outcomes = [None] * CALLERS
+
+    def caller(i):
+        try:
+            outcomes[i] = flight.do('k', fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return outcomes
+
+
+def test_concurrent_callers_share_one_call():
+    flight, calls = SingleFlight(), []
+
+    def compute():
+        calls.append(1)
+        # Hold the call open until every other caller has joined it
+        wait_for(lambda: flight.coalesced == CALLERS - 1)
+        return {'estimatedPrice': 1.0}
+
+    outcomes = run_threads(flight, compute)
+    assert len(calls) == 1 and flight.executed == 1
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    flight, calls = SingleFlight(), []
+
+    def fail():
+        calls.append(1)
+        wait_for(lambda: flight.coalesced == CALLERS - 1)
+        raise RuntimeError("download failed")
+
+    outcomes = run_threads(flight, fail)
+    assert len(calls) == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+    assert flight.do('k', lambda: 'recovered') == 'recovered'
+    assert flight.executed == 2
+
+
+def test_async_concurrent_callers_share_one_call():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'estimatedPrice': 1.0}
+
+    async def main():
+        return await asyncio.gather(*(flight.do('k', compute) for _ in range(CALLERS)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1 and flight.coalesced == CALLERS - 1
+    assert all(result is results[0] for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_async_error_reaches_every_caller_and_is_not_kept():
+    flight, calls = AsyncSingleFlight(), []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("download failed")
+
+    async def recovered():
+        return 'recovered'
+
+    async def main():
+        outcomes = await asyncio.gather(*(flight.do('k', fail) for _ in range(CALLERS)), return_exceptions=True)
+        return outcomes, await flight.do('k', recovered)
+
+    outcomes, after = asyncio.run(main())
+    assert len(calls) == 1 and all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert after == 'recovered' and flight.executed == 2
+
+
+def test_async_cancelled_caller_does_not_cancel_the_others():
+    flight = AsyncSingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(flight.do('k', compute))
+        second = asyncio.ensure_future(flight.do('k', compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 42